@@ -0,0 +1,4 @@
+"""Offline analysis of the IMC data and of our results.
+
+Nothing in this package is imported by the traders.
+"""
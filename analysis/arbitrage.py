@@ -0,0 +1,187 @@
+"""Best routes through an exchange matrix of the manual trading rounds.
+
+``matrix[i][j]`` is the amount of asset ``j`` received for one unit of
+asset ``i``. The amount after a route is the product of its rates, so in
+log space the best route of ``h`` trades is a max-plus matrix product:
+
+    best[h][j] = max_i best[h - 1][i] + log(matrix[i][j])
+
+Each trade is one broadcasted NumPy operation over all the assets, keeping
+the ``top`` best partial routes to every asset and their predecessors to
+rebuild the routes. Routes of at most ``hops`` trades are returned. Trading
+an asset into itself is ignored, so routes of different lengths are
+distinct. The best route through 150 assets in 50 trades takes a few
+milliseconds, the 10 best a few tens of milliseconds.
+
+Usage:
+    python -m analysis.arbitrage --hops 5 --top 5 --capital 2000000
+    python -m analysis.arbitrage --matrix rates.csv --start 0 --hops 20
+"""
+import argparse
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Exchange matrix of the manual trade of round 1, starting from and ending
+# in the last asset
+EXCHANGE_MATRIX = [
+    [1, 0.5, 1.45, 0.75],
+    [1.95, 1, 3.1, 1.49],
+    [0.67, 0.31, 1, 0.48],
+    [1.34, 0.64, 1.98, 1],
+]
+START = 3
+HOPS = 5
+CAPITAL = 2_000_000
+
+
+class Route:
+    """Assets visited by a route, from the start to the end asset.
+
+    Attributes:
+        assets (List[int]): index of every asset held, the first being the
+            start asset
+        rate (float): amount of the end asset received per unit of the start
+            asset
+    """
+
+    __slots__ = ("assets", "rate")
+
+    def __init__(self, assets: List[int], rate: float) -> None:
+        self.assets = assets
+        self.rate = rate
+
+    @property
+    def trades(self) -> List[Tuple[int, int]]:
+        """(origin, target) asset of every trade."""
+        return list(zip(self.assets[:-1], self.assets[1:]))
+
+    def amount(self, capital: float) -> float:
+        return capital * self.rate
+
+    def format(self, names: Optional[Sequence[str]] = None) -> str:
+        return " -> ".join(str(names[asset]) if names else str(asset) for asset in self.assets)
+
+    def __repr__(self) -> str:
+        return f"Route({self.format()}, rate={self.rate:.6f})"
+
+
+def log_rates(matrix) -> np.ndarray:
+    """Log of the rates, -inf where an exchange is not possible or is of an
+    asset into itself."""
+    rates = np.asarray(matrix, dtype=float)
+    if rates.ndim != 2 or rates.shape[0] != rates.shape[1]:
+        raise ValueError(f"Exchange matrix must be square, got shape {rates.shape}")
+    weights = np.full(rates.shape, -np.inf)
+    np.log(rates, out=weights, where=rates > 0)
+    np.fill_diagonal(weights, -np.inf)
+    return weights
+
+
+def solve(
+        matrix,
+        start: int,
+        end: Optional[int] = None,
+        hops: int = HOPS,
+        top: int = 1
+    ) -> List[Route]:
+    """Best routes from ``start`` to ``end`` in at most ``hops`` trades.
+
+    Args:
+        matrix: (assets, assets) exchange rates, ``matrix[i][j]`` units of
+            ``j`` per unit of ``i``
+        start (int): asset held at the start
+        end (Optional[int]): asset to hold at the end, the start asset by
+            default
+        hops (int): maximum number of trades
+        top (int): number of routes to return
+
+    Returns:
+        List[Route]: up to ``top`` routes, best first
+    """
+    weights = log_rates(matrix)
+    assets = weights.shape[0]
+    end = start if end is None else end
+
+    # values[j, r]: log rate of the r-th best route to j of the current length
+    values = np.full((assets, top), -np.inf)
+    values[start, 0] = 0.0
+    nodes = np.empty((hops, assets, top), dtype=np.int64)
+    ranks = np.empty((hops, assets, top), dtype=np.int64)
+    endings = np.empty((hops + 1, top))
+    endings[0] = values[end]
+
+    incoming = np.ascontiguousarray(weights.T)
+    for hop in range(hops):
+        # scores[j, i]: best route to i followed by i -> j
+        scores = incoming + values[:, 0]
+        if top == 1:
+            nodes[hop] = scores.argmax(axis=1)[:, None]
+            ranks[hop] = 0
+            values = np.take_along_axis(scores, nodes[hop], axis=1)
+            endings[hop + 1] = values[end]
+            continue
+
+        # Routes to i are sorted, so the top routes to j only go through the
+        # top predecessors by their best route
+        predecessors = np.argpartition(scores, -top, axis=1)[:, -top:] if assets > top else \
+            np.broadcast_to(np.arange(assets), (assets, assets))
+        # candidates[j, p * top + r]: r-th route to the p-th predecessor of j
+        candidates = (
+            np.take_along_axis(incoming, predecessors, axis=1)[:, :, None] + values[predecessors]
+        ).reshape(assets, -1)
+        best = np.argpartition(candidates, -top, axis=1)[:, -top:] if candidates.shape[1] > top else \
+            np.broadcast_to(np.arange(candidates.shape[1]), candidates.shape)
+        order = np.argsort(-np.take_along_axis(candidates, best, axis=1), axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+
+        values = np.full((assets, top), -np.inf)
+        values[:, :best.shape[1]] = np.take_along_axis(candidates, best, axis=1)
+        nodes[hop] = 0
+        ranks[hop] = 0
+        nodes[hop, :, :best.shape[1]] = np.take_along_axis(predecessors, best // top, axis=1)
+        ranks[hop, :, :best.shape[1]] = best % top
+        endings[hop + 1] = values[end]
+
+    rates = np.asarray(matrix, dtype=float)
+    routes = []
+    flat = endings.ravel()
+    for index in np.argsort(-flat, kind="stable")[:top]:
+        if not np.isfinite(flat[index]):
+            break
+        length, rank = divmod(int(index), top)
+        path = [end]
+        node = end
+        for hop in range(length - 1, -1, -1):
+            node, rank = int(nodes[hop, node, rank]), int(ranks[hop, node, rank])
+            path.append(node)
+        path.reverse()
+        routes.append(Route(path, float(np.prod(rates[path[:-1], path[1:]]))))
+    return routes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matrix", help="CSV of the exchange rates, the round 1 matrix by default")
+    parser.add_argument("--names", nargs="+", help="name of every asset")
+    parser.add_argument("--start", type=int, default=START, help="asset held at the start")
+    parser.add_argument("--end", type=int, help="asset held at the end, the start asset by default")
+    parser.add_argument("--hops", type=int, default=HOPS, help="maximum number of trades")
+    parser.add_argument("--top", type=int, default=1, help="number of routes")
+    parser.add_argument("--capital", type=float, default=CAPITAL, help="amount of the start asset")
+    args = parser.parse_args()
+
+    matrix = np.loadtxt(args.matrix, delimiter=",", ndmin=2) if args.matrix else EXCHANGE_MATRIX
+
+    start = time.perf_counter()
+    routes = solve(matrix, args.start, args.end, args.hops, args.top)
+    elapsed = time.perf_counter() - start
+
+    for route in routes:
+        print(f"{route.amount(args.capital):>18.2f}  x{route.rate:.6f}  {route.format(args.names)}")
+    print(f"Solved in {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Fingerprints of the bots trading in the market, from the trade history.
+
+Every trade of a day gives one observation to its buyer and one to its
+seller. For every (trader, symbol) pair:
+
+* markouts: the move of the mid price after their trades, from the trade
+  price and in their direction, at several horizons. A positive markout
+  means the trader is informed and worth copying, a negative one that
+  fading them pays.
+* timing around the daily extrema: where in the day's range they buy and
+  sell (1 when buying the low or selling the high), and the share of their
+  trades within a few ticks of the matching extremum
+* size distribution: mean, median and largest quantity, and the most common
+  size with its share
+
+The mid prices of a day are stored as a (products, ticks) matrix, from
+which the mid prices of every horizon ahead are precomputed once. Trades are
+aligned on it with ``searchsorted`` and all metrics are group sums over
+(trader, symbol) with ``bincount``.
+
+Usage:
+    python -m analysis.bots data/round5/trades_round_5_day_*.csv
+    python -m analysis.bots data/round5/trades_round_5_day_*.csv --horizon 1000 --symbols BERRIES
+"""
+import argparse
+import csv
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analysis.logs import TRADE_DTYPE
+from analysis.prices import load_mid_prices
+from prosperity.products import SUBMISSION
+
+# Ticks after the trade at which markouts are measured
+HORIZONS = (1, 10, 100, 1000)
+
+# Horizon of the ranking
+HORIZON = 100
+
+# Ticks around a daily extremum counted as trading at it
+EXTREMA_WINDOW = 100
+
+# t statistic of the markout above which a trader is worth following. The
+# markouts of close trades overlap, which inflates the statistic at long
+# horizons, hence a high level
+T_STATISTIC = 3.0
+
+
+class Profile:
+    """Fingerprint of one trader on one symbol.
+
+    Attributes:
+        trader (str): name of the counterparty
+        symbol (str): product traded
+        trades (int): trades as buyer or seller
+        volume (int): total quantity
+        buy_share (float): share of the volume bought
+        markouts (Dict[int, float]): volume weighted mean markout per horizon
+        t_statistics (Dict[int, float]): t statistic of the markouts per
+            horizon
+        hit_rate (float): share of trades with a positive markout at the
+            ranking horizon
+        range_position (float): mean position of the trade price in the day's
+            range, 1 when buying the low or selling the high
+        at_extrema (float): share of trades near the matching daily extremum
+        mean_size (float): mean quantity
+        median_size (float): median quantity
+        max_size (int): largest quantity
+        common_size (int): most common quantity
+        common_size_share (float): share of the trades of the most common size
+        action (str): ``copy``, ``fade`` or ``-``
+    """
+
+    __slots__ = (
+        "trader", "symbol", "trades", "volume", "buy_share", "markouts", "t_statistics", "hit_rate",
+        "range_position", "at_extrema", "mean_size", "median_size", "max_size", "common_size",
+        "common_size_share", "action",
+    )
+
+    def __init__(self, trader: str, symbol: str) -> None:
+        self.trader = trader
+        self.symbol = symbol
+        self.markouts: Dict[int, float] = {}
+        self.t_statistics: Dict[int, float] = {}
+        self.action = "-"
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Profile({self.trader}, {self.symbol}, {self.action})"
+
+
+def load_trades(path: str) -> np.ndarray:
+    """Trades of a ``trades_round_*`` file as a ``TRADE_DTYPE`` array."""
+    with open(path, newline="") as file:
+        rows = [
+            (
+                int(row["timestamp"]),
+                row["symbol"],
+                float(row["price"]),
+                int(row["quantity"]),
+                row.get("buyer") or "",
+                row.get("seller") or "",
+            )
+            for row in csv.DictReader(file, delimiter=";")
+        ]
+    return np.array(rows, dtype=TRADE_DTYPE)
+
+
+def prices_path_for(trades_path: str) -> str:
+    return trades_path.replace("trades_", "prices_")
+
+
+def mid_price_matrix(path: str, products: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Timestamps and (products, ticks) mid prices of a day, NaN where a
+    product is missing."""
+    series = load_mid_prices(path)
+    timestamps = np.unique(np.concatenate([series[product][0] for product in products if product in series]))
+    mid_prices = np.full((len(products), len(timestamps)), np.nan)
+    for row, product in enumerate(products):
+        if product in series:
+            product_timestamps, values = series[product]
+            mid_prices[row, np.searchsorted(timestamps, product_timestamps)] = np.where(values > 0, values, np.nan)
+    return timestamps, mid_prices
+
+
+def future_mid_prices(mid_prices: np.ndarray, horizons: Sequence[int]) -> np.ndarray:
+    """(horizons, products, ticks) mid price ``horizon`` ticks ahead, NaN
+    past the end of the day."""
+    moves = np.full((len(horizons),) + mid_prices.shape, np.nan)
+    for index, horizon in enumerate(horizons):
+        moves[index, :, :mid_prices.shape[1] - horizon] = mid_prices[:, horizon:]
+    return moves
+
+
+def _observations(
+        trades_path: str,
+        horizons: Sequence[int],
+        window: int,
+        symbols: Optional[Sequence[str]]
+    ) -> Dict[str, np.ndarray]:
+    """One row per trade and side of a day: trader, symbol, side, quantity,
+    markouts, position in the day's range and nearness to the extremum."""
+    trades = load_trades(trades_path)
+    if symbols is not None:
+        trades = trades[np.isin(trades["symbol"], symbols)]
+    products = sorted(set(trades["symbol"].tolist()))
+    timestamps, mid_prices = mid_price_matrix(prices_path_for(trades_path), products)
+    ahead = future_mid_prices(mid_prices, horizons)
+
+    rows = np.searchsorted(products, trades["symbol"])
+    ticks = np.minimum(np.searchsorted(timestamps, trades["timestamp"]), len(timestamps) - 1)
+
+    with np.errstate(invalid="ignore"):
+        low, high = np.nanmin(mid_prices, axis=1), np.nanmax(mid_prices, axis=1)
+    low_tick = np.argmin(np.nan_to_num(mid_prices, nan=np.inf), axis=1)
+    high_tick = np.argmax(np.nan_to_num(mid_prices, nan=-np.inf), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        range_position = (trades["price"] - low[rows]) / (high[rows] - low[rows])
+
+    sides = []
+    for side, names in ((1, trades["buyer"]), (-1, trades["seller"])):
+        named = (names != "") & (names != SUBMISSION)
+        extremum = (low_tick if side > 0 else high_tick)[rows]
+        sides.append({
+            "trader": names[named],
+            "symbol": trades["symbol"][named],
+            "side": np.full(named.sum(), side),
+            "quantity": trades["quantity"][named],
+            # markouts[h, trade]
+            "markouts": side * (ahead[:, rows[named], ticks[named]] - trades["price"][named]),
+            "range_position": (1 - range_position[named]) if side > 0 else range_position[named],
+            "at_extrema": np.abs(ticks[named] - extremum[named]) <= window,
+        })
+
+    return {
+        key: np.concatenate([side[key] for side in sides], axis=-1)
+        for key in sides[0]
+    }
+
+
+def fingerprint(
+        paths: Sequence[str],
+        horizons: Sequence[int] = HORIZONS,
+        horizon: int = HORIZON,
+        window: int = EXTREMA_WINDOW,
+        symbols: Optional[Sequence[str]] = None,
+        t_statistic: float = T_STATISTIC
+    ) -> List[Profile]:
+    """Profiles of every (trader, symbol) of the given days, ranked by the
+    absolute t statistic of their markouts at ``horizon``.
+
+    Args:
+        paths (Sequence[str]): ``trades_round_*`` files, next to their
+            ``prices_round_*`` files
+        horizons (Sequence[int]): markout horizons in ticks
+        horizon (int): horizon of the ranking, one of ``horizons``
+        window (int): ticks around a daily extremum counted as at it
+        symbols (Optional[Sequence[str]]): symbols to analyse, all by default
+        t_statistic (float): level above which a trader is copied or faded
+
+    Returns:
+        List[Profile]: one profile per (trader, symbol), ranked
+    """
+    days = [_observations(path, horizons, window, symbols) for path in paths]
+    data = {key: np.concatenate([day[key] for day in days], axis=-1) for key in days[0]} if days else {}
+    if not days or not len(data["trader"]):
+        return []
+
+    traders, trader_codes = np.unique(data["trader"], return_inverse=True)
+    symbols_, symbol_codes = np.unique(data["symbol"], return_inverse=True)
+    keys, groups = np.unique(trader_codes * len(symbols_) + symbol_codes, return_inverse=True)
+    count = len(keys)
+
+    quantity = data["quantity"].astype(float)
+    trades = np.bincount(groups, minlength=count)
+    volume = np.bincount(groups, quantity, minlength=count)
+    bought = np.bincount(groups, quantity * (data["side"] > 0), minlength=count)
+
+    # Volume weighted markouts, ignoring trades too close to the end of the day
+    markouts = data["markouts"]
+    valid = ~np.isnan(markouts)
+    weights = np.where(valid, quantity, 0.0)
+    values = np.where(valid, markouts, 0.0)
+    mean = np.empty((len(horizons), count))
+    t_values = np.empty((len(horizons), count))
+    for index in range(len(horizons)):
+        total = np.bincount(groups, weights[index], minlength=count)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean[index] = np.bincount(groups, weights[index] * values[index], minlength=count) / total
+            second = np.bincount(groups, weights[index] * values[index] ** 2, minlength=count) / total
+            samples = np.bincount(groups, valid[index], minlength=count)
+            t_values[index] = mean[index] / np.sqrt(np.maximum(second - mean[index] ** 2, 0) / samples)
+    ranked = list(horizons).index(horizon)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = np.bincount(groups, valid[ranked] & (values[ranked] > 0), minlength=count) \
+            / np.bincount(groups, valid[ranked], minlength=count)
+        finite = np.isfinite(data["range_position"])
+        range_position = np.bincount(groups, np.where(finite, data["range_position"], 0), minlength=count) \
+            / np.bincount(groups, finite, minlength=count)
+    at_extrema = np.bincount(groups, data["at_extrema"], minlength=count) / trades
+
+    # Sizes, by group after one sort
+    order = np.lexsort((data["quantity"], groups))
+    bounds = np.searchsorted(groups[order], np.arange(count + 1))
+
+    profiles = []
+    for group, key in enumerate(keys):
+        profile = Profile(str(traders[key // len(symbols_)]), str(symbols_[key % len(symbols_)]))
+        profile.trades = int(trades[group])
+        profile.volume = int(volume[group])
+        profile.buy_share = float(bought[group] / volume[group]) if volume[group] else float("nan")
+        profile.markouts = {h: float(mean[index, group]) for index, h in enumerate(horizons)}
+        profile.t_statistics = {h: float(t_values[index, group]) for index, h in enumerate(horizons)}
+        profile.hit_rate = float(hit_rate[group])
+        profile.range_position = float(range_position[group])
+        profile.at_extrema = float(at_extrema[group])
+
+        sizes = data["quantity"][order[bounds[group]:bounds[group + 1]]]
+        unique_sizes, counts = np.unique(sizes, return_counts=True)
+        profile.mean_size = float(sizes.mean())
+        profile.median_size = float(np.median(sizes))
+        profile.max_size = int(sizes[-1])
+        profile.common_size = int(unique_sizes[np.argmax(counts)])
+        profile.common_size_share = float(counts.max() / len(sizes))
+
+        score = profile.t_statistics[horizon]
+        if score > t_statistic:
+            profile.action = "copy"
+        elif score < -t_statistic:
+            profile.action = "fade"
+        profiles.append(profile)
+
+    profiles.sort(key=lambda profile: -abs(np.nan_to_num(profile.t_statistics[horizon])))
+    return profiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trades", nargs="+", help="trades_round_*.csv files, next to their prices files")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS), help="markout horizons in ticks")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="horizon of the ranking")
+    parser.add_argument("--window", type=int, default=EXTREMA_WINDOW, help="ticks around a daily extremum")
+    parser.add_argument("--symbols", nargs="+", help="symbols to analyse")
+    parser.add_argument("--top", type=int, default=20, help="profiles to print")
+    parser.add_argument("-o", "--output", help="JSON file of all profiles")
+    args = parser.parse_args()
+    if args.horizon not in args.horizons:
+        args.horizons.append(args.horizon)
+
+    profiles = fingerprint(args.trades, args.horizons, args.horizon, args.window, args.symbols)
+
+    print(
+        f"{'trader':<12}{'symbol':<15}{'trades':>7}{'buys':>6}"
+        + "".join(f"{f'mo{h}':>9}" for h in args.horizons)
+        + f"{'t':>7}{'hit':>6}{'range':>7}{'extr':>6}{'size':>6}{'mode':>6}  action"
+    )
+    for profile in profiles[:args.top]:
+        print(
+            f"{profile.trader:<12}{profile.symbol:<15}{profile.trades:>7}{profile.buy_share:>6.2f}"
+            + "".join(f"{profile.markouts[h]:>9.2f}" for h in args.horizons)
+            + f"{profile.t_statistics[args.horizon]:>7.1f}{profile.hit_rate:>6.2f}{profile.range_position:>7.2f}"
+            + f"{profile.at_extrema:>6.2f}{profile.mean_size:>6.1f}{profile.common_size:>6}  {profile.action}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([profile.as_dict() for profile in profiles], file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Finds observations (or products) whose changes lead product returns.
+
+For every leader series (the observations by default, such as
+DOLPHIN_SIGHTINGS) and every product, the cross-correlation of the leader's
+percentage changes with the product's returns is computed for lags of
+``1..max_lag`` ticks at once, with FFTs over all the pairs of a day. Days
+are processed in parallel by a process pool.
+
+Correlations are averaged over days, weighted by their length, and a pair
+is flagged when one lag exceeds the Bonferroni corrected significance level
+of a zero correlation. For every flagged pair the signal is turned into a
+trade as in ``diving_gear_strategy``: when the leader changes by more than a
+threshold, follow the product for the horizon over which the cumulated
+correlation peaks. Thresholds are scanned over quantiles of the leader's
+changes and the one with the highest t statistic of the forward moves is
+printed, to be used as ``PCT_CHANGE_SIGNAL``.
+
+Usage:
+    python -m analysis.leadlag data/round3/prices_round_3_day_*.csv
+    python -m analysis.leadlag data/round*/prices_round_*_day_*.csv --leaders DOLPHIN_SIGHTINGS BERRIES --max-lag 200
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analysis.prices import load_mid_prices
+from backtest.data import OBSERVATIONS
+from prosperity.products import PRODUCTS
+
+MAX_LAG = 100
+
+# Family-wise significance of the lags and pairs tested
+SIGNIFICANCE = 0.01
+
+# Quantiles of the absolute leader changes tried as thresholds
+THRESHOLD_QUANTILES = (0.9, 0.95, 0.98, 0.99, 0.995, 0.998, 0.999)
+
+# Fewest events for a threshold to be considered
+MIN_EVENTS = 10
+
+
+class LeadLag:
+    """A leader whose changes predict the returns of a product.
+
+    Attributes:
+        leader (str): leading series
+        target (str): product following it
+        lag (int): lag in ticks of the largest correlation
+        correlation (float): correlation at that lag
+        horizon (int): ticks over which the cumulated correlation peaks
+        cumulative_correlation (float): cumulated correlation up to horizon
+        threshold (Optional[float]): best absolute percentage change of the
+            leader to trade on
+        events (int): changes above the threshold over all days
+        mean_move (float): mean move of the target over the horizon after an
+            event, in the direction of the signal
+        hit_rate (float): share of events followed by a move in that direction
+    """
+
+    __slots__ = (
+        "leader", "target", "lag", "correlation", "horizon", "cumulative_correlation",
+        "threshold", "events", "mean_move", "hit_rate",
+    )
+
+    def __init__(self, leader: str, target: str, lag: int, correlation: float, horizon: int, cumulative_correlation: float) -> None:
+        self.leader = leader
+        self.target = target
+        self.lag = lag
+        self.correlation = correlation
+        self.horizon = horizon
+        self.cumulative_correlation = cumulative_correlation
+        self.threshold: Optional[float] = None
+        self.events = 0
+        self.mean_move = float("nan")
+        self.hit_rate = float("nan")
+
+    @property
+    def direction(self) -> int:
+        """1 when the target follows the leader, -1 when it moves against it."""
+        return 1 if self.cumulative_correlation >= 0 else -1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"LeadLag({self.leader} -> {self.target}, lag={self.lag}, correlation={self.correlation:.3f})"
+
+
+def pct_changes(values: np.ndarray) -> np.ndarray:
+    """Percentage change of every row from one tick to the next, zero where
+    the previous value is zero."""
+    previous = values[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous != 0, np.diff(values, axis=1) / previous, 0.0)
+
+
+def cross_correlation(leaders: np.ndarray, targets: np.ndarray, max_lag: int) -> np.ndarray:
+    """Correlation of ``leaders[i, t]`` with ``targets[j, t + k]`` for every
+    pair and lag ``k`` in ``0..max_lag``.
+
+    Args:
+        leaders (np.ndarray): (leaders, ticks) series
+        targets (np.ndarray): (targets, ticks) series
+        max_lag (int): largest lag
+
+    Returns:
+        np.ndarray: (leaders, targets, max_lag + 1) correlations
+    """
+    ticks = leaders.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leaders = (leaders - leaders.mean(axis=1, keepdims=True)) / leaders.std(axis=1, keepdims=True)
+        targets = (targets - targets.mean(axis=1, keepdims=True)) / targets.std(axis=1, keepdims=True)
+    leaders = np.nan_to_num(leaders)
+    targets = np.nan_to_num(targets)
+
+    # Zero padding to avoid the circular wrap around of the lags
+    size = 1 << int(np.ceil(np.log2(ticks + max_lag)))
+    spectra = np.conj(np.fft.rfft(leaders, size))[:, None, :] * np.fft.rfft(targets, size)[None, :, :]
+    return np.fft.irfft(spectra, size)[:, :, :max_lag + 1] / ticks
+
+
+def _aligned(series: Dict[str, Tuple[np.ndarray, np.ndarray]], names: Sequence[str], length: int) -> np.ndarray:
+    return np.vstack([series[name][1][:length] for name in names]).astype(float)
+
+
+def _day(arguments: Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Sequence[str], Sequence[str], int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Leader changes, target mid prices and cross-correlations of one day,
+    truncated to its shortest series."""
+    series, leaders, targets, max_lag = arguments
+    length = min(len(series[name][1]) for name in list(leaders) + list(targets))
+    changes = pct_changes(_aligned(series, leaders, length))
+    target_values = _aligned(series, targets, length)
+    return changes, target_values, cross_correlation(changes, pct_changes(target_values), max_lag)
+
+
+def best_threshold(
+        changes: np.ndarray,
+        forward_moves: np.ndarray,
+        direction: int,
+        quantiles: Sequence[float] = THRESHOLD_QUANTILES,
+        min_events: int = MIN_EVENTS
+    ) -> Tuple[Optional[float], int, float, float]:
+    """Threshold on the absolute leader change with the highest t statistic
+    of the moves following the changes above it.
+
+    Args:
+        changes (np.ndarray): leader changes of all days
+        forward_moves (np.ndarray): target move over the horizon after each
+            change
+        direction (int): 1 to follow the sign of the change, -1 to fade it
+        quantiles (Sequence[float]): quantiles of the absolute changes tried
+        min_events (int): fewest events for a threshold
+
+    Returns:
+        Tuple[Optional[float], int, float, float]: threshold, events, mean
+        move and hit rate
+    """
+    magnitude = np.abs(changes)
+    thresholds = np.unique(np.quantile(magnitude, quantiles)) if len(magnitude) else np.empty(0)
+    signed = np.sign(changes) * direction * forward_moves
+
+    # events[q, t]: change t is above threshold q
+    events = magnitude[None, :] > thresholds[:, None]
+    counts = events.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (events * signed).sum(axis=1) / counts
+        variances = (events * signed ** 2).sum(axis=1) / counts - means ** 2
+        scores = np.where(counts >= min_events, means / np.sqrt(variances / counts), -np.inf)
+        hits = (events & (signed > 0)).sum(axis=1) / counts
+
+    if not len(thresholds) or not np.isfinite(scores).any():
+        return None, 0, float("nan"), float("nan")
+    best = int(np.nanargmax(np.where(np.isnan(scores), -np.inf, scores)))
+    return float(thresholds[best]), int(counts[best]), float(means[best]), float(hits[best])
+
+
+def scan(
+        paths: Sequence[str],
+        leaders: Optional[Sequence[str]] = None,
+        targets: Optional[Sequence[str]] = None,
+        max_lag: int = MAX_LAG,
+        significance: float = SIGNIFICANCE,
+        workers: Optional[int] = None
+    ) -> List[LeadLag]:
+    """Significant lead-lag pairs of the given days.
+
+    Args:
+        paths (Sequence[str]): ``prices_round_*`` files, one per day
+        leaders (Optional[Sequence[str]]): leading series, the observations
+            of the files by default
+        targets (Optional[Sequence[str]]): products, all the tradable
+            products of the files by default
+        max_lag (int): largest lag tested, in ticks
+        significance (float): family-wise significance level
+        workers (Optional[int]): processes of the pool, all cores by default
+
+    Returns:
+        List[LeadLag]: flagged pairs, strongest correlation first
+    """
+    with ProcessPoolExecutor(workers) as pool:
+        series = list(pool.map(load_mid_prices, paths))
+        available = set.intersection(*(set(day) for day in series)) if series else set()
+        if leaders is None:
+            leaders = [name for name in OBSERVATIONS if name in available]
+        if targets is None:
+            targets = [product for product in PRODUCTS if product in available and product not in leaders]
+        if not leaders or not targets:
+            return []
+        days = list(pool.map(_day, [(day, leaders, targets, max_lag) for day in series]))
+
+    # Average of the days weighted by their length, and the level a zero
+    # correlation exceeds with the family-wise significance
+    lengths = np.array([changes.shape[1] for changes, _, _ in days], dtype=float)
+    correlations = sum(length * correlation for length, (_, _, correlation) in zip(lengths, days)) / lengths.sum()
+    tests = max_lag * len(leaders) * len(targets)
+    level = NormalDist().inv_cdf(1 - significance / tests / 2) / np.sqrt(lengths.sum())
+
+    found = []
+    for i, leader in enumerate(leaders):
+        for j, target in enumerate(targets):
+            lagged = correlations[i, j, 1:]
+            lag = int(np.argmax(np.abs(lagged))) + 1
+            if abs(lagged[lag - 1]) <= level:
+                continue
+
+            cumulative = np.cumsum(lagged)
+            horizon = int(np.argmax(np.abs(cumulative))) + 1
+            candidate = LeadLag(leader, target, lag, float(lagged[lag - 1]), horizon, float(cumulative[horizon - 1]))
+
+            # Change at tick t, move of the target from t to t + horizon
+            changes, moves = [], []
+            for leader_changes, target_values, _ in days:
+                prices = target_values[j]
+                usable = len(prices) - 1 - horizon
+                if usable <= 0:
+                    continue
+                changes.append(leader_changes[i, :usable])
+                moves.append(prices[1 + horizon:1 + horizon + usable] - prices[1:1 + usable])
+            if changes:
+                (candidate.threshold, candidate.events, candidate.mean_move, candidate.hit_rate) = best_threshold(
+                    np.concatenate(changes), np.concatenate(moves), candidate.direction
+                )
+            found.append(candidate)
+
+    found.sort(key=lambda candidate: -abs(candidate.correlation))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files, one per day")
+    parser.add_argument("--leaders", nargs="+", help="leading series, the observations by default")
+    parser.add_argument("--targets", nargs="+", help="products, all tradable products by default")
+    parser.add_argument("--max-lag", type=int, default=MAX_LAG, help="largest lag in ticks")
+    parser.add_argument("--significance", type=float, default=SIGNIFICANCE)
+    parser.add_argument("--workers", type=int, help="processes, all cores by default")
+    parser.add_argument("-o", "--output", help="JSON file of the flagged pairs")
+    args = parser.parse_args()
+
+    found = scan(args.prices, args.leaders, args.targets, args.max_lag, args.significance, args.workers)
+    if not found:
+        print("No significant lead-lag pair")
+    for candidate in found:
+        threshold = f"{candidate.threshold:.5f}" if candidate.threshold is not None else "-"
+        print(
+            f"{candidate.leader:>18} -> {candidate.target:<14} lag {candidate.lag:>4}  corr {candidate.correlation:>7.3f}  "
+            f"horizon {candidate.horizon:>4}  cum {candidate.cumulative_correlation:>7.3f}  "
+            f"threshold {threshold:>8}  events {candidate.events:>5}  "
+            f"move {candidate.mean_move:>8.2f}  hit rate {candidate.hit_rate:>5.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([candidate.as_dict() for candidate in found], file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Streaming parser of the result logs of the exchange.
+
+A result log has up to four sections:
+
+* ``Sandbox logs:`` the output of ``Trader.run``, the first line of each tick
+  prefixed by its timestamp. The lines printed by the traders (``Cash``,
+  ``Product X, Position p, Midprice m, Value v, EMA e``,
+  ``Dolphing observations: d`` and ``PnL x``) are extracted.
+* ``Submission logs:`` ignored.
+* ``Activities log:`` the ``;`` separated prices of every tick, with the PnL
+  computed by the exchange.
+* ``Trade History:`` a JSON list of the trades of the day.
+
+The file is read line by line, in a single pass, into typed buffers that
+become NumPy arrays at the end, so memory does not depend on the size of
+the log beyond the extracted values.
+
+Usage:
+    python -m analysis.logs data/results/<id>.log
+"""
+import argparse
+import time
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SANDBOX = "Sandbox logs:"
+SUBMISSION = "Submission logs:"
+ACTIVITIES = "Activities log:"
+TRADE_HISTORY = "Trade History:"
+SECTIONS = frozenset((SANDBOX, SUBMISSION, ACTIVITIES, TRADE_HISTORY))
+
+PRODUCT_FIELDS = ("position", "mid_price", "value", "ema")
+
+TRADE_DTYPE = np.dtype([
+    ("timestamp", np.int64),
+    ("symbol", "U16"),
+    ("price", np.float64),
+    ("quantity", np.int64),
+    ("buyer", "U16"),
+    ("seller", "U16"),
+])
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        # None, or a missing value
+        return float("nan")
+
+
+class ResultLog:
+    """Series extracted from a result log.
+
+    Attributes:
+        timestamps (np.ndarray): timestamp of every sandbox tick
+        rounds (np.ndarray): ``Log round`` counter of every tick
+        cash (np.ndarray): cash printed by the trader
+        pnl (np.ndarray): PnL printed by the trader
+        products (Dict[str, Dict[str, np.ndarray]]): position, mid price,
+            value and EMA of each product, one value per tick (NaN when the
+            product was not printed on that tick)
+        observations (Dict[str, np.ndarray]): printed observations per tick
+        activities (Dict[str, Dict[str, np.ndarray]]): timestamp, mid price
+            and PnL of each product in the activities log
+        trades (np.ndarray): structured array of the trade history
+    """
+
+    def __init__(self) -> None:
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.rounds = np.empty(0, dtype=np.int64)
+        self.cash = np.empty(0)
+        self.pnl = np.empty(0)
+        self.products: Dict[str, Dict[str, np.ndarray]] = {}
+        self.observations: Dict[str, np.ndarray] = {}
+        self.activities: Dict[str, Dict[str, np.ndarray]] = {}
+        self.trades = np.empty(0, dtype=TRADE_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class _Series:
+    """Values of one series, with the tick each value was printed on."""
+
+    __slots__ = ("ticks", "values")
+
+    def __init__(self, fields: int = 1) -> None:
+        self.ticks = array("q")
+        self.values = [array("d") for _ in range(fields)]
+
+    def aligned(self, ticks: int, field: int = 0) -> np.ndarray:
+        values = np.full(ticks, np.nan)
+        values[np.frombuffer(self.ticks, dtype=np.int64)] = np.frombuffer(self.values[field], dtype=np.float64)
+        return values
+
+
+def parse_log(path: str) -> ResultLog:
+    """Parses a result log in a single pass.
+
+    Args:
+        path (str): path of the ``.log`` file
+
+    Returns:
+        ResultLog: series of the sandbox logs, activities and trades
+    """
+    timestamps = array("q")
+    rounds = array("q")
+    cash = _Series()
+    pnl = _Series()
+    products: Dict[str, _Series] = {}
+    observations: Dict[str, _Series] = {}
+
+    activity_columns: Optional[Dict[str, int]] = None
+    activities: Dict[str, List[array]] = {}
+
+    trades: List[tuple] = []
+    trade: Dict[str, str] = {}
+
+    section = SANDBOX
+    tick = -1
+
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+
+            if line[-1] == ":" and line in SECTIONS:
+                section = line
+                continue
+
+            if section == SANDBOX:
+                if tick >= 0 and line.startswith("Product "):
+                    # Product X, Position p, Midprice m, Value v, EMA e
+                    fields = line.split(" ")
+                    product = fields[1][:-1]
+                    series = products.get(product)
+                    if series is None:
+                        series = products[product] = _Series(len(PRODUCT_FIELDS))
+                    series.ticks.append(tick)
+                    position, mid_price, value, ema = series.values
+                    try:
+                        row = (float(fields[3][:-1]), float(fields[5][:-1]), float(fields[7][:-1]), float(fields[9]))
+                    except ValueError:
+                        # EMA is None on the first tick
+                        row = tuple(_to_float(field.rstrip(",")) for field in fields[3:10:2])
+                    position.append(row[0])
+                    mid_price.append(row[1])
+                    value.append(row[2])
+                    ema.append(row[3])
+                    continue
+
+                timestamp = -1
+                if line[0].isdigit():
+                    head, _, rest = line.partition(" ")
+                    if head.isdigit() and rest:
+                        # First line of a tick, prefixed by its timestamp
+                        timestamp = int(head)
+                        line = rest
+
+                if line.startswith("Log round"):
+                    tick += 1
+                    timestamps.append(timestamp)
+                    rounds.append(int(line[10:]))
+                elif tick < 0:
+                    continue
+                elif line.startswith("PnL "):
+                    pnl.ticks.append(tick)
+                    pnl.values[0].append(_to_float(line[4:]))
+                elif line.startswith("Cash "):
+                    cash.ticks.append(tick)
+                    cash.values[0].append(_to_float(line[5:]))
+                elif line.startswith("Dolphing observations: "):
+                    series = observations.get("DOLPHIN_SIGHTINGS")
+                    if series is None:
+                        series = observations["DOLPHIN_SIGHTINGS"] = _Series()
+                    series.ticks.append(tick)
+                    series.values[0].append(_to_float(line[23:]))
+
+            elif section == ACTIVITIES:
+                fields = line.split(";")
+                if activity_columns is None:
+                    activity_columns = {name: column for column, name in enumerate(fields)}
+                    timestamp_column = activity_columns["timestamp"]
+                    product_column = activity_columns["product"]
+                    mid_column = activity_columns["mid_price"]
+                    pnl_column = activity_columns["profit_and_loss"]
+                    continue
+                product = fields[product_column]
+                columns = activities.get(product)
+                if columns is None:
+                    columns = activities[product] = [array("q"), array("d"), array("d")]
+                columns[0].append(int(fields[timestamp_column]))
+                columns[1].append(_to_float(fields[mid_column]))
+                columns[2].append(_to_float(fields[pnl_column]))
+
+            elif section == TRADE_HISTORY:
+                if line.startswith('"'):
+                    key, _, value = line.partition(":")
+                    trade[key.strip('"')] = value.strip().rstrip(",").strip('"')
+                elif line.startswith("}"):
+                    trades.append((
+                        int(trade.get("timestamp", -1)),
+                        trade.get("symbol", ""),
+                        _to_float(trade.get("price", "nan")),
+                        int(trade.get("quantity", 0)),
+                        trade.get("buyer", ""),
+                        trade.get("seller", ""),
+                    ))
+                    trade = {}
+
+    ticks = len(timestamps)
+    log = ResultLog()
+    log.timestamps = np.frombuffer(timestamps, dtype=np.int64).copy()
+    log.rounds = np.frombuffer(rounds, dtype=np.int64).copy()
+    log.cash = cash.aligned(ticks)
+    log.pnl = pnl.aligned(ticks)
+    log.products = {
+        product: {field: series.aligned(ticks, index) for index, field in enumerate(PRODUCT_FIELDS)}
+        for product, series in products.items()
+    }
+    log.observations = {name: series.aligned(ticks) for name, series in observations.items()}
+    log.activities = {
+        product: {
+            "timestamp": np.frombuffer(columns[0], dtype=np.int64).copy(),
+            "mid_price": np.frombuffer(columns[1], dtype=np.float64).copy(),
+            "profit_and_loss": np.frombuffer(columns[2], dtype=np.float64).copy(),
+        }
+        for product, columns in activities.items()
+    }
+    log.trades = np.array(trades, dtype=TRADE_DTYPE)
+    return log
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="result log of the exchange")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    log = parse_log(args.log)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(log)} ticks, {len(log.trades)} trades parsed in {elapsed:.2f}s")
+    if len(log):
+        print(f"Final PnL {log.pnl[-1]}")
+    for product, series in log.products.items():
+        print(f"{product:<14} final position {series['position'][-1]:>6.0f}  final mid {series['mid_price'][-1]:>10.1f}")
+    for product, columns in log.activities.items():
+        if len(columns["profit_and_loss"]):
+            print(f"{product:<14} exchange PnL {columns['profit_and_loss'][-1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
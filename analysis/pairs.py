@@ -0,0 +1,325 @@
+"""Scans every pair of products for mean reverting spreads.
+
+For every ordered pair ``(y, x)`` and every day, with NumPy over whole
+batches of pairs at once:
+
+* correlation of the mid prices and of their tick to tick changes
+* hedge ratio ``b`` of the regression ``y = a + b x``, the spread being
+  ``y - b x`` as the ``Spread`` of the pair trade
+* Engle-Granger test: augmented Dickey-Fuller statistic of the regression
+  residuals, compared with the MacKinnon critical values of two variables
+* half-life of mean reversion of the spread, in ticks
+
+Days and batches of pairs are processed in parallel by a process pool. Each
+unordered pair keeps the direction with the lowest mean ADF statistic, and
+pairs are ranked by the number of days they are cointegrated, then by that
+statistic. Hedge ratios are printed with small integer legs ready for
+``RoundConfig.pair_legs``, or without legs when the ratio is too small for
+legs of at most ``MAX_LEG`` units, which would drop the ``x`` leg.
+
+Usage:
+    python -m analysis.pairs data/round*/prices_round_*_day_*.csv --top 10
+    python -m analysis.pairs data/round4/prices_round_4_day_*.csv --lags 2 --workers 4 -o pairs.json
+"""
+import argparse
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analysis.prices import load_mid_prices
+from backtest.data import OBSERVATIONS
+from prosperity.products import PRODUCTS
+
+# Asymptotic Engle-Granger critical values, two variables with a constant
+# (MacKinnon, 2010)
+CRITICAL_VALUES = {0.01: -3.90, 0.05: -3.34, 0.10: -3.04}
+SIGNIFICANCE = 0.05
+
+# Lagged differences of the augmented Dickey-Fuller regression
+LAGS = 1
+
+# Ordered pairs per task of the pool
+BATCH = 256
+
+# Largest leg of the integer approximation of a hedge ratio
+MAX_LEG = 10
+
+STATISTICS = ("correlation", "return_correlation", "hedge_ratio", "adf", "half_life", "spread_mean", "spread_std")
+
+
+class Candidate:
+    """A pair and its statistics over all days.
+
+    Attributes:
+        y (str): product bought when the spread ``y - hedge_ratio * x`` is low
+        x (str): hedging product
+        hedge_ratio (float): median hedge ratio of the days
+        correlation (float): mean correlation of the mid prices
+        return_correlation (float): mean correlation of the mid price changes
+        adf (float): mean Engle-Granger ADF statistic
+        cointegrated_days (int): days on which the ADF statistic is below the
+            critical value
+        days (int): days scanned
+        half_life (float): median half-life of the spread, in ticks
+        spread_mean (float): mean of the spread
+        spread_std (float): standard deviation of the spread around its mean
+    """
+
+    __slots__ = (
+        "y", "x", "hedge_ratio", "correlation", "return_correlation", "adf",
+        "cointegrated_days", "days", "half_life", "spread_mean", "spread_std",
+    )
+
+    def __init__(self, y: str, x: str, values: Dict[str, float], cointegrated_days: int, days: int) -> None:
+        self.y = y
+        self.x = x
+        self.cointegrated_days = cointegrated_days
+        self.days = days
+        for name in STATISTICS:
+            setattr(self, name, values[name])
+
+    @property
+    def spread(self) -> str:
+        sign = "-" if self.hedge_ratio >= 0 else "+"
+        return f"{self.y} {sign} {abs(self.hedge_ratio):.4f} * {self.x}"
+
+    def legs(self, max_leg: int = MAX_LEG) -> Optional[Dict[str, int]]:
+        """Signed quantity of each leg in one unit of the spread, the integer
+        approximation of the hedge ratio. None when the ratio rounds to 0
+        with at most ``max_leg`` units of ``y``, as the spread would then be
+        ``y`` alone, or when it is not finite."""
+        if not math.isfinite(self.hedge_ratio):
+            return None
+        ratio = Fraction(self.hedge_ratio).limit_denominator(max_leg)
+        if ratio.numerator == 0:
+            return None
+        return {self.y: ratio.denominator, self.x: -ratio.numerator}
+
+    def as_dict(self) -> Dict[str, object]:
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["legs"] = self.legs()
+        return values
+
+    def __repr__(self) -> str:
+        return f"Candidate({self.spread}, adf={self.adf:.2f})"
+
+
+def load_days(paths: Sequence[str], workers: Optional[int] = None) -> Tuple[List[str], List[np.ndarray]]:
+    """Products traded on every day and their (products, ticks) mid prices,
+    one array per day. Missing mid prices are carried forward."""
+    with ProcessPoolExecutor(workers) as pool:
+        days = list(pool.map(load_mid_prices, paths))
+
+    common = set.intersection(*(set(day) for day in days)) - set(OBSERVATIONS) if days else set()
+    products = [product for product in PRODUCTS if product in common]
+    products += sorted(common - set(products))
+
+    prices = []
+    for day in days:
+        length = min(len(day[product][1]) for product in products)
+        values = np.vstack([day[product][1][:length] for product in products]).astype(float)
+        values[values <= 0] = np.nan
+        prices.append(_fill_forward(values))
+    return products, prices
+
+
+def _fill_forward(values: np.ndarray) -> np.ndarray:
+    """Carries the last valid value of each row forward, and the first one
+    backward."""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = np.take_along_axis(values, index, axis=1)
+    first = np.argmax(valid, axis=1)
+    head = np.arange(values.shape[1]) < first[:, None]
+    filled[head] = np.broadcast_to(values[np.arange(len(values)), first][:, None], values.shape)[head]
+    return filled
+
+
+def _correlations(values: np.ndarray, y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.corrcoef(values)[y, x]
+
+
+def adf_statistic(residuals: np.ndarray, lags: int = LAGS) -> np.ndarray:
+    """Augmented Dickey-Fuller t statistic of every row, without constant:
+    ``diff(e)[t] = gamma * e[t - 1] + sum_i phi_i * diff(e)[t - i]``."""
+    statistics = np.full(len(residuals), np.nan)
+    # Constant or undefined spreads have no statistic
+    valid = np.isfinite(residuals).all(axis=1) & (residuals.std(axis=1) > 0)
+    if not valid.any():
+        return statistics
+    residuals = residuals[valid]
+
+    changes = np.diff(residuals, axis=1)
+    ticks = residuals.shape[1]
+    target = changes[:, lags:]
+    regressors = np.stack(
+        [residuals[:, lags:-1]] + [changes[:, lags - lag:ticks - 1 - lag] for lag in range(1, lags + 1)],
+        axis=2
+    )
+
+    gram = np.einsum("nti,ntj->nij", regressors, regressors)
+    coefficients = np.linalg.solve(gram, np.einsum("nti,nt->ni", regressors, target)[:, :, None])[:, :, 0]
+    errors = target - np.einsum("nti,ni->nt", regressors, coefficients)
+    variance = (errors ** 2).sum(axis=1) / (target.shape[1] - lags - 1)
+    standard_error = np.sqrt(variance * np.linalg.inv(gram)[:, 0, 0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistics[valid] = coefficients[:, 0] / standard_error
+    return statistics
+
+
+def half_life(spreads: np.ndarray) -> np.ndarray:
+    """Half-life in ticks of every row, from ``diff(s)[t] = c + l * s[t - 1]``;
+    infinite when the spread does not revert."""
+    lagged = spreads[:, :-1]
+    changes = np.diff(spreads, axis=1)
+    lagged = lagged - lagged.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = (lagged * changes).sum(axis=1) / (lagged ** 2).sum(axis=1)
+        return np.where(speed < 0, -np.log(2) / np.log1p(np.maximum(speed, -1 + 1e-12)), np.inf)
+
+
+def pair_statistics(prices: np.ndarray, pairs: np.ndarray, lags: int = LAGS) -> Dict[str, np.ndarray]:
+    """Statistics of the ordered pairs ``(y, x)`` of one day.
+
+    Args:
+        prices (np.ndarray): (products, ticks) mid prices
+        pairs (np.ndarray): (pairs, 2) rows of y and x in ``prices``
+        lags (int): lagged differences of the ADF regression
+
+    Returns:
+        Dict[str, np.ndarray]: each of ``STATISTICS``, one value per pair
+    """
+    y, x = pairs[:, 0], pairs[:, 1]
+    ys, xs = prices[y], prices[x]
+
+    centred = prices - prices.mean(axis=1, keepdims=True)
+    covariance = centred @ centred.T / prices.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hedge_ratio = covariance[y, x] / covariance[x, x]
+
+    spreads = ys - hedge_ratio[:, None] * xs
+    spread_mean = spreads.mean(axis=1)
+    residuals = spreads - spread_mean[:, None]
+
+    return {
+        "correlation": _correlations(prices, y, x),
+        "return_correlation": _correlations(np.diff(prices, axis=1), y, x),
+        "hedge_ratio": hedge_ratio,
+        "adf": adf_statistic(residuals, lags),
+        "half_life": half_life(spreads),
+        "spread_mean": spread_mean,
+        "spread_std": residuals.std(axis=1),
+    }
+
+
+def _task(arguments: Tuple[np.ndarray, np.ndarray, int]) -> Dict[str, np.ndarray]:
+    return pair_statistics(*arguments)
+
+
+def scan(
+        paths: Sequence[str],
+        lags: int = LAGS,
+        significance: float = SIGNIFICANCE,
+        workers: Optional[int] = None,
+        batch: int = BATCH
+    ) -> List[Candidate]:
+    """Ranked pair candidates of the given days.
+
+    Args:
+        paths (Sequence[str]): ``prices_round_*`` files, one per day
+        lags (int): lagged differences of the ADF regression
+        significance (float): level of the cointegration test, a key of
+            ``CRITICAL_VALUES``
+        workers (Optional[int]): processes of the pool, all cores by default
+        batch (int): ordered pairs per task
+
+    Returns:
+        List[Candidate]: one candidate per unordered pair, best first
+    """
+    products, prices = load_days(paths, workers)
+    count = len(products)
+    pairs = np.array([(y, x) for y in range(count) for x in range(count) if y != x], dtype=np.int64).reshape(-1, 2)
+    chunks = [pairs[begin:begin + batch] for begin in range(0, len(pairs), batch)]
+
+    tasks = [(day, chunk, lags) for day in prices for chunk in chunks]
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_task, tasks))
+
+    # statistics[name]: (days, ordered pairs)
+    statistics = {
+        name: np.vstack([
+            np.concatenate([results[day * len(chunks) + index][name] for index in range(len(chunks))])
+            for day in range(len(prices))
+        ]) if prices and chunks else np.empty((len(prices), len(pairs)))
+        for name in STATISTICS
+    }
+
+    critical = CRITICAL_VALUES[significance]
+    # Degenerate pairs rank last
+    adf = np.nan_to_num(statistics["adf"], nan=np.inf).mean(axis=0)
+    cointegrated = (statistics["adf"] < critical).sum(axis=0)
+    summary = {
+        "correlation": statistics["correlation"].mean(axis=0),
+        "return_correlation": statistics["return_correlation"].mean(axis=0),
+        "hedge_ratio": np.median(statistics["hedge_ratio"], axis=0),
+        "adf": adf,
+        "half_life": np.median(statistics["half_life"], axis=0),
+        "spread_mean": statistics["spread_mean"].mean(axis=0),
+        "spread_std": statistics["spread_std"].mean(axis=0),
+    }
+
+    # Direction of each unordered pair with the lowest mean ADF statistic
+    index = {(int(y), int(x)): row for row, (y, x) in enumerate(pairs)}
+    candidates = []
+    for (y, x), row in index.items():
+        reverse = index[(x, y)]
+        if adf[row] > adf[reverse] or (adf[row] == adf[reverse] and y > x):
+            continue
+        candidates.append(Candidate(
+            products[y],
+            products[x],
+            {name: float(values[row]) for name, values in summary.items()},
+            int(cointegrated[row]),
+            len(prices),
+        ))
+
+    candidates.sort(key=lambda candidate: (-candidate.cointegrated_days, candidate.adf))
+    return candidates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files, one per day")
+    parser.add_argument("--lags", type=int, default=LAGS, help="lagged differences of the ADF regression")
+    parser.add_argument("--significance", type=float, default=SIGNIFICANCE, choices=sorted(CRITICAL_VALUES))
+    parser.add_argument("--workers", type=int, help="processes, all cores by default")
+    parser.add_argument("--top", type=int, default=10, help="candidates to print")
+    parser.add_argument("-o", "--output", help="JSON file of all candidates")
+    args = parser.parse_args()
+
+    candidates = scan(args.prices, args.lags, args.significance, args.workers)
+
+    print(
+        f"{'spread':<40}{'days':>6}{'adf':>9}{'corr':>8}{'ret corr':>10}"
+        f"{'half-life':>11}{'std':>9}  legs"
+    )
+    for candidate in candidates[:args.top]:
+        print(
+            f"{candidate.spread:<40}{candidate.cointegrated_days:>3}/{candidate.days:<2}{candidate.adf:>9.2f}"
+            f"{candidate.correlation:>8.3f}{candidate.return_correlation:>10.3f}"
+            f"{candidate.half_life:>11.1f}{candidate.spread_std:>9.2f}  {candidate.legs() or '-'}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([candidate.as_dict() for candidate in candidates], file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Performance analytics of backtests and result logs.
+
+Every run is turned into aligned ``(products, ticks)`` arrays of PnL and
+positions. The metrics are computed with NumPy along the
+tick axis of stacked runs, so a sweep of thousands of runs is analysed in a
+few batched array operations:
+
+* PnL attribution per product, per multi-product strategy (the coconuts and
+  pina coladas pair, the picnic basket legs) and in total
+* Sharpe ratio of the tick to tick PnL changes
+* maximum drawdown
+* hit rate, the share of PnL changes that are gains
+* turnover, the traded volume
+* fill ratio, the filled share of the volume sent (backtests only)
+* inventory: mean and largest absolute position, share of ticks at the limit
+
+Usage:
+    python -m analysis.performance data/results/<id>.log
+"""
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analysis.logs import ResultLog, parse_log
+from backtest.data import OBSERVATIONS
+from prosperity.products import POSITION_LIMITS, SUBMISSION
+from prosperity.rounds import ROUND_5, RoundConfig
+from prosperity.trader import BASKET_LEGS
+
+TOTAL = "TOTAL"
+
+# Scale of the Sharpe ratio, as in notebooks/03-results_analyser.ipynb
+PERIODS = 252
+
+METRICS = [
+    "pnl",
+    "sharpe",
+    "max_drawdown",
+    "hit_rate",
+    "turnover",
+    "fill_ratio",
+    "mean_abs_position",
+    "max_abs_position",
+    "time_at_limit",
+]
+
+
+class Run:
+    """Aligned arrays of one run.
+
+    Args:
+        products (List[str]): products, one row of every array
+        pnl (np.ndarray): (products, ticks) PnL
+        positions (np.ndarray): (products, ticks) positions
+        sent_volume (np.ndarray): volume of the orders sent per product, NaN
+            when unknown
+        filled_volume (np.ndarray): filled volume per product
+    """
+
+    __slots__ = ("products", "pnl", "positions", "sent_volume", "filled_volume")
+
+    def __init__(
+            self,
+            products: List[str],
+            pnl: np.ndarray,
+            positions: np.ndarray,
+            sent_volume: np.ndarray,
+            filled_volume: np.ndarray
+        ) -> None:
+        self.products = products
+        self.pnl = pnl
+        self.positions = positions
+        self.sent_volume = sent_volume
+        self.filled_volume = filled_volume
+
+    @property
+    def ticks(self) -> int:
+        return self.pnl.shape[1]
+
+    @classmethod
+    def from_backtest(cls, result) -> "Run":
+        """Run of a ``backtest.engine.BacktestResult``."""
+        products = list(result.pnl)
+        filled: Dict[str, int] = {}
+        for fill in result.fills:
+            filled[fill.symbol] = filled.get(fill.symbol, 0) + abs(fill.quantity)
+
+        return cls(
+            products,
+            np.array([result.pnl[product] for product in products], dtype=float).reshape(len(products), -1),
+            np.array([result.positions[product] for product in products], dtype=float).reshape(len(products), -1),
+            np.array([result.sent_volume.get(product, 0) for product in products], dtype=float),
+            np.array([filled.get(product, 0) for product in products], dtype=float),
+        )
+
+    @classmethod
+    def from_result_log(cls, log: ResultLog) -> "Run":
+        """Run of a result log of the exchange: the PnL computed by the
+        exchange, the positions printed by the trader and the volume of our
+        trades. The volume sent is not logged."""
+        products = [product for product in log.activities if product not in OBSERVATIONS]
+        ticks = min((len(log.activities[product]["profit_and_loss"]) for product in products), default=0)
+
+        positions = np.zeros((len(products), ticks))
+        for row, product in enumerate(products):
+            series = log.products.get(product)
+            if series is None:
+                continue
+            printed = np.nan_to_num(series["position"])
+            if len(log) and log.timestamps[0] >= 0:
+                # Position printed on the tick of each activity row
+                index = np.searchsorted(log.timestamps, log.activities[product]["timestamp"][:ticks])
+                positions[row] = printed[np.minimum(index, len(printed) - 1)]
+            else:
+                positions[row, :min(ticks, len(printed))] = printed[:ticks]
+
+        trades = log.trades
+        ours = (trades["buyer"] == SUBMISSION) | (trades["seller"] == SUBMISSION)
+        filled = np.array([
+            trades["quantity"][ours & (trades["symbol"] == product)].sum() for product in products
+        ], dtype=float)
+
+        return cls(
+            products,
+            np.array([log.activities[product]["profit_and_loss"][:ticks] for product in products]).reshape(len(products), ticks),
+            positions,
+            np.full(len(products), np.nan),
+            filled,
+        )
+
+
+def strategy_groups(config: RoundConfig = ROUND_5) -> Dict[str, List[str]]:
+    """Products traded together by the multi-product strategies of a round."""
+    groups = {
+        "coconuts_pina_coladas": list(config.pair_legs),
+        "picnic": list(BASKET_LEGS),
+    }
+    return {name: products for name, products in groups.items() if name in config.strategies}
+
+
+def sharpe(pnl: np.ndarray, periods: float = PERIODS) -> np.ndarray:
+    """Sharpe ratio of the PnL changes along the last axis."""
+    returns = np.diff(pnl, axis=-1)
+    std = returns.std(axis=-1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, returns.mean(axis=-1) / std * np.sqrt(periods), np.nan)
+
+
+def max_drawdown(pnl: np.ndarray) -> np.ndarray:
+    """Largest fall of the PnL from its running maximum, along the last axis."""
+    return (np.maximum.accumulate(pnl, axis=-1) - pnl).max(axis=-1)
+
+
+def hit_rate(pnl: np.ndarray) -> np.ndarray:
+    """Share of the non zero PnL changes that are gains."""
+    returns = np.diff(pnl, axis=-1)
+    moves = (returns != 0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(moves > 0, (returns > 0).sum(axis=-1) / moves, np.nan)
+
+
+def turnover(positions: np.ndarray) -> np.ndarray:
+    """Volume traded, from the position changes (starting flat)."""
+    return np.abs(np.diff(positions, axis=-1, prepend=0)).sum(axis=-1)
+
+
+def _aggregation(products: List[str], groups: Dict[str, List[str]]) -> Tuple[List[str], np.ndarray]:
+    """Names of the report rows and the (rows, products) matrix summing
+    products into them: each product, each group and the total."""
+    names = list(products) + list(groups) + [TOTAL]
+    matrix = np.zeros((len(names), len(products)))
+    matrix[:len(products)] = np.eye(len(products))
+    for row, members in enumerate(groups.values(), start=len(products)):
+        for product in members:
+            if product in products:
+                matrix[row, products.index(product)] = 1
+    matrix[-1] = 1
+    return names, matrix
+
+
+class Report:
+    """Metrics of a batch of runs, ``metrics[name]`` being (runs, rows)."""
+
+    def __init__(self, names: List[str], metrics: Dict[str, np.ndarray]) -> None:
+        self.names = names
+        self.metrics = metrics
+
+    def row(self, name: str, run: int = 0) -> Dict[str, float]:
+        column = self.names.index(name)
+        return {metric: float(values[run, column]) for metric, values in self.metrics.items()}
+
+    def table(self, run: int = 0) -> str:
+        lines = [f"{'':<22}" + "".join(f"{metric:>18}" for metric in self.metrics)]
+        for column, name in enumerate(self.names):
+            lines.append(
+                f"{name:<22}"
+                + "".join(f"{values[run, column]:>18.3f}" for values in self.metrics.values())
+            )
+        return "\n".join(lines)
+
+
+def analyse(
+        runs: Sequence[Run],
+        groups: Optional[Dict[str, List[str]]] = None,
+        periods: float = PERIODS,
+        batch: int = 256
+    ) -> Report:
+    """Metrics of every run, per product, strategy group and in total.
+
+    Runs are aligned on the union of their products (missing products are
+    flat) and truncated to the shortest run, then analysed ``batch`` runs at
+    a time.
+
+    Args:
+        runs (Sequence[Run]): runs to analyse
+        groups (Optional[Dict[str, List[str]]]): products of each strategy,
+            by default the multi-product strategies of round 5
+        periods (float): scale of the Sharpe ratio
+        batch (int): runs stacked in one array operation
+
+    Returns:
+        Report: metrics of each run and row
+    """
+    if groups is None:
+        groups = strategy_groups()
+
+    products: List[str] = []
+    for run in runs:
+        products.extend(product for product in run.products if product not in products)
+    ticks = min(run.ticks for run in runs)
+    names, matrix = _aggregation(products, groups)
+    is_product = np.arange(len(names)) < len(products)
+    limits = np.array([POSITION_LIMITS.get(product, np.inf) for product in products])
+
+    metrics = {metric: np.empty((len(runs), len(names))) for metric in METRICS}
+
+    for begin in range(0, len(runs), batch):
+        chunk = runs[begin:begin + batch]
+        pnl = np.zeros((len(chunk), len(products), ticks))
+        positions = np.zeros((len(chunk), len(products), ticks))
+        sent = np.zeros((len(chunk), len(products)))
+        filled = np.zeros((len(chunk), len(products)))
+        for index, run in enumerate(chunk):
+            rows = [products.index(product) for product in run.products]
+            pnl[index, rows] = run.pnl[:, :ticks]
+            positions[index, rows] = run.positions[:, :ticks]
+            sent[index, rows] = run.sent_volume
+            filled[index, rows] = run.filled_volume
+
+        # Products summed into groups and total: (runs, rows, ticks)
+        row_pnl = np.einsum("gp,rpt->rgt", matrix, pnl)
+        row_turnover = turnover(positions) @ matrix.T
+        end = begin + len(chunk)
+
+        metrics["pnl"][begin:end] = row_pnl[:, :, -1]
+        metrics["sharpe"][begin:end] = sharpe(row_pnl, periods)
+        metrics["max_drawdown"][begin:end] = max_drawdown(row_pnl)
+        metrics["hit_rate"][begin:end] = hit_rate(row_pnl)
+        metrics["turnover"][begin:end] = row_turnover
+        with np.errstate(divide="ignore", invalid="ignore"):
+            metrics["fill_ratio"][begin:end] = (filled @ matrix.T) / (sent @ matrix.T)
+
+        # Inventory is only meaningful per product
+        absolute = np.abs(positions)
+        for metric, values in (
+                ("mean_abs_position", absolute.mean(axis=-1)),
+                ("max_abs_position", absolute.max(axis=-1)),
+                ("time_at_limit", (absolute >= limits[:, None]).mean(axis=-1))):
+            metrics[metric][begin:end] = np.nan
+            metrics[metric][begin:end, is_product] = values
+
+    return Report(names, metrics)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="result logs of the exchange")
+    args = parser.parse_args()
+
+    runs = [Run.from_result_log(parse_log(path)) for path in args.logs]
+    report = analyse(runs)
+    for index, path in enumerate(args.logs):
+        print(path)
+        print(report.table(index))
+
+
+if __name__ == "__main__":
+    main()
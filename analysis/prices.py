@@ -0,0 +1,48 @@
+"""Mid prices of the ``prices_round_*`` CSVs as NumPy arrays."""
+import csv
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def load_mid_prices(path: str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Mid price series of every product (observations included) of a
+    prices file.
+
+    Args:
+        path (str): path of a ``prices_round_*`` file
+
+    Returns:
+        Dict[str, Tuple[np.ndarray, np.ndarray]]: timestamps and mid prices
+        of each product
+    """
+    timestamps: Dict[str, List[int]] = {}
+    mid_prices: Dict[str, List[float]] = {}
+
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file, delimiter=";"):
+            product = row["product"]
+            timestamps.setdefault(product, []).append(int(row["timestamp"]))
+            mid_prices.setdefault(product, []).append(float(row["mid_price"]))
+
+    return {
+        product: (np.asarray(timestamps[product], dtype=np.int64), np.asarray(mid_prices[product]))
+        for product in timestamps
+    }
+
+
+def load_product_days(paths: List[str], product: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Mid prices of one product over several days, one row per day.
+
+    Days are truncated to the shortest one so that they can be stacked.
+
+    Args:
+        paths (List[str]): prices files, one per day
+        product (str): product to load
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: timestamps and (days, ticks) mid prices
+    """
+    series = [load_mid_prices(path)[product] for path in paths]
+    length = min(len(timestamps) for timestamps, _ in series)
+    return series[0][0][:length], np.vstack([mid_prices[:length] for _, mid_prices in series])
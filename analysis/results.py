@@ -0,0 +1,179 @@
+"""Results CSVs of several rounds as one (round, product, timestamp) cube.
+
+Each ``results_round*.csv`` (the activities of a submission: ``;``
+separated, one row per product and timestamp) is read once into flat
+columns, which are scattered into contiguous ``(rounds, products,
+timestamps)`` arrays of ``mid_price`` and ``profit_and_loss``. Missing
+values are NaN.
+
+Products are ordered so that the legs of every multi-product strategy are
+adjacent: slicing a product, a round or a strategy group is basic NumPy
+indexing and returns a view, without copying nor filtering rows.
+
+Usage:
+    from analysis.results import load_results
+    cube = load_results(["results/results_round1.csv", "results/results_round2.csv"])
+    cube.product("PEARLS")             # (rounds, timestamps) profit_and_loss
+    cube.group(["COCONUTS", "PINA_COLADAS"], "mid_price")
+
+    python -m analysis.results results/results_round*.csv
+"""
+import argparse
+import csv
+import os
+import re
+from array import array
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from prosperity.products import PRODUCTS
+
+FIELDS = ("mid_price", "profit_and_loss")
+
+
+class ResultCube:
+    """Contiguous ``(rounds, products, timestamps)`` arrays of results.
+
+    Attributes:
+        rounds (List[str]): name of each round, from the file names
+        products (List[str]): products, legs of a strategy being adjacent
+        timestamps (np.ndarray): union of the timestamps of all files
+        mid_price (np.ndarray): (rounds, products, timestamps) mid prices
+        profit_and_loss (np.ndarray): (rounds, products, timestamps) PnL
+    """
+
+    def __init__(
+            self,
+            rounds: List[str],
+            products: List[str],
+            timestamps: np.ndarray,
+            mid_price: np.ndarray,
+            profit_and_loss: np.ndarray
+        ) -> None:
+        self.rounds = rounds
+        self.products = products
+        self.timestamps = timestamps
+        self.mid_price = mid_price
+        self.profit_and_loss = profit_and_loss
+
+    def field(self, name: str) -> np.ndarray:
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field {name}, expected one of {FIELDS}")
+        return getattr(self, name)
+
+    def round(self, name: str, field: str = "profit_and_loss") -> np.ndarray:
+        """(products, timestamps) view of one round."""
+        return self.field(field)[self.rounds.index(name)]
+
+    def product(self, product: str, field: str = "profit_and_loss") -> np.ndarray:
+        """(rounds, timestamps) view of one product."""
+        return self.field(field)[:, self.products.index(product)]
+
+    def group(self, products: Sequence[str], field: str = "profit_and_loss") -> np.ndarray:
+        """(rounds, len(products), timestamps) view of products that are
+        adjacent in ``self.products``, in that order."""
+        start = self.products.index(products[0])
+        if list(self.products[start:start + len(products)]) != list(products):
+            raise ValueError(f"{products} are not adjacent in {self.products}")
+        return self.field(field)[:, start:start + len(products)]
+
+    def combination(self, weights: Dict[str, float], field: str = "profit_and_loss") -> np.ndarray:
+        """(rounds, timestamps) weighted sum of products, such as the PnL of
+        the legs of a spread."""
+        values = np.zeros((len(self.rounds), len(self.timestamps)))
+        for product, weight in weights.items():
+            values += weight * self.product(product, field)
+        return values
+
+
+def round_name(path: str) -> str:
+    """``round3`` for ``.../results_round3.csv``, the file name otherwise."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = re.search(r"round_?\d+", name)
+    return match.group(0).replace("_", "") if match else name
+
+
+def _read_columns(path: str, codes: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Timestamps, product codes, mid prices and PnL of every row."""
+    timestamps = array("q")
+    products = array("l")
+    mid_prices = array("d")
+    pnl = array("d")
+
+    with open(path, newline="") as file:
+        reader = csv.reader(file, delimiter=";")
+        header = next(reader)
+        timestamp_column = header.index("timestamp")
+        product_column = header.index("product")
+        mid_column = header.index("mid_price")
+        pnl_column = header.index("profit_and_loss")
+
+        for row in reader:
+            if not row:
+                continue
+            product = row[product_column]
+            code = codes.get(product)
+            if code is None:
+                code = codes[product] = len(codes)
+            timestamps.append(int(row[timestamp_column]))
+            products.append(code)
+            mid_prices.append(float(row[mid_column] or "nan"))
+            pnl.append(float(row[pnl_column] or "nan"))
+
+    return (
+        np.frombuffer(timestamps, dtype=np.int64),
+        np.array(products, dtype=np.int64),
+        np.frombuffer(mid_prices, dtype=np.float64),
+        np.frombuffer(pnl, dtype=np.float64),
+    )
+
+
+def load_results(paths: Sequence[str]) -> ResultCube:
+    """Reads results CSVs into a cube, one round per file.
+
+    Args:
+        paths (Sequence[str]): ``results_round*.csv`` files, in round order
+
+    Returns:
+        ResultCube: mid prices and PnL of every round, product and timestamp
+    """
+    codes: Dict[str, int] = {}
+    columns = [_read_columns(path, codes) for path in paths]
+
+    # Known products in the order of prosperity.products, others after them
+    products = [product for product in PRODUCTS if product in codes]
+    products += sorted(product for product in codes if product not in products)
+    rows = np.empty(len(codes), dtype=np.int64)
+    for product, code in codes.items():
+        rows[code] = products.index(product)
+
+    timestamps = np.unique(np.concatenate([column[0] for column in columns])) if columns else np.empty(0, dtype=np.int64)
+    shape = (len(paths), len(products), len(timestamps))
+    mid_price = np.full(shape, np.nan)
+    profit_and_loss = np.full(shape, np.nan)
+
+    for index, (row_timestamps, row_products, row_mid_prices, row_pnl) in enumerate(columns):
+        product_rows = rows[row_products]
+        ticks = np.searchsorted(timestamps, row_timestamps)
+        mid_price[index, product_rows, ticks] = row_mid_prices
+        profit_and_loss[index, product_rows, ticks] = row_pnl
+
+    return ResultCube([round_name(path) for path in paths], products, timestamps, mid_price, profit_and_loss)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="results CSVs, one per round")
+    args = parser.parse_args()
+
+    cube = load_results(args.paths)
+    print(f"{len(cube.rounds)} rounds, {len(cube.products)} products, {len(cube.timestamps)} timestamps")
+    print(f"{'':<18}" + "".join(f"{name:>14}" for name in cube.rounds))
+    for product in cube.products:
+        final = cube.product(product)[:, -1]
+        print(f"{product:<18}" + "".join(f"{value:>14.1f}" for value in final))
+
+
+if __name__ == "__main__":
+    main()
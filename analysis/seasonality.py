@@ -0,0 +1,89 @@
+"""Fits the target-position schedule of a seasonal product.
+
+The mid prices of all days are normalised by their first value, averaged and
+smoothed. The schedule buys up to the limit around the low that precedes the
+daily high, and sells down to minus the limit around the high, each move
+being spread over a ramp of ``ramp`` timestamps.
+
+Usage:
+    python -m analysis.seasonality data/round3/prices_round_3_day_*.csv --product BERRIES --limit 250
+"""
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+
+from analysis.prices import load_product_days
+
+Breakpoint = Tuple[int, int]
+
+
+def seasonal_curve(mid_prices: np.ndarray, smoothing: int) -> np.ndarray:
+    """Average of the normalised days, smoothed by a centred moving average."""
+    curve = (mid_prices / mid_prices[:, :1]).mean(axis=0)
+    if smoothing <= 1:
+        return curve
+    padded = np.pad(curve, (smoothing // 2, smoothing - 1 - smoothing // 2), mode="edge")
+    return np.convolve(padded, np.ones(smoothing) / smoothing, mode="valid")
+
+
+def fit_schedule(
+        timestamps: np.ndarray,
+        mid_prices: np.ndarray,
+        limit: int,
+        ramp: int = 10_000,
+        smoothing: int = 50
+    ) -> List[Breakpoint]:
+    """Breakpoints of the target-position schedule.
+
+    Args:
+        timestamps (np.ndarray): timestamps of the ticks
+        mid_prices (np.ndarray): (days, ticks) mid prices
+        limit (int): position limit of the product
+        ramp (int): timestamps over which each position change is spread
+        smoothing (int): ticks of the moving average applied to the curve
+
+    Returns:
+        List[Breakpoint]: (timestamp, target position) breakpoints
+    """
+    curve = seasonal_curve(mid_prices, smoothing)
+    high = int(np.argmax(curve))
+    low = int(np.argmin(curve[:high])) if high > 0 else 0
+
+    start, end = int(timestamps[0]), int(timestamps[-1])
+    half_ramp = ramp // 2
+
+    def clip(timestamp: int) -> int:
+        return max(start, min(end, timestamp))
+
+    low_time, high_time = int(timestamps[low]), int(timestamps[high])
+    return [
+        (start, 0),
+        (clip(low_time - half_ramp), 0),
+        (clip(low_time + half_ramp), limit),
+        (clip(high_time - half_ramp), limit),
+        (clip(high_time + half_ramp), -limit),
+        (end, -limit),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files, one per day")
+    parser.add_argument("--product", default="BERRIES")
+    parser.add_argument("--limit", type=int, default=250)
+    parser.add_argument("--ramp", type=int, default=10_000)
+    parser.add_argument("--smoothing", type=int, default=50)
+    args = parser.parse_args()
+
+    timestamps, mid_prices = load_product_days(args.prices, args.product)
+    breakpoints = fit_schedule(timestamps, mid_prices, args.limit, args.ramp, args.smoothing)
+
+    print(f"{args.product}_SCHEDULE = [")
+    for timestamp, target in breakpoints:
+        print(f"    ({timestamp:_}, {target}),")
+    print("]")
+
+
+if __name__ == "__main__":
+    main()
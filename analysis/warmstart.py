@@ -0,0 +1,119 @@
+"""Builds the warm-start file of the traders from the previous day.
+
+The file is a snapshot (see ``prosperity.snapshot``) holding the rolling
+windows of the traders filled with the end of the day: the pair and basket
+spreads and the diving gear returns, along with the closing mid price of
+each product, used as its EMA and as the last diving gear price, and the
+last dolphin sightings. Spreads and EMAs are in the traders' fixed-point
+units (see ``prosperity.prices``).
+
+A warm-start file must be built from the day before the one it is used on:
+built from that day or a later one, it leaks the future into the backtest.
+``write_warm_starts`` builds the file of every day of a sequence from the
+previous one, for the backtests over several days.
+
+Usage:
+    python -m analysis.warmstart data/round4/prices_round_4_day_2.csv -o warm_start.txt
+"""
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analysis.prices import load_mid_prices
+from prosperity.prices import HALF_TICKS
+from prosperity.products import DOLPHIN_SIGHTINGS
+from prosperity.snapshot import encode_snapshot
+from prosperity.trader import BASKET_LEGS, PAIR_HEDGE_RATIO, WINDOW
+
+
+def half_ticks(mid_prices: np.ndarray) -> np.ndarray:
+    """Mid prices in half ticks."""
+    return np.rint(mid_prices * HALF_TICKS).astype(np.int64)
+
+
+def build_histories(
+        mid_prices: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        window: int = WINDOW
+    ) -> Dict[str, list]:
+    """Last ``window`` values of every rolling window the traders keep.
+
+    Args:
+        mid_prices (Dict[str, Tuple[np.ndarray, np.ndarray]]): timestamps and
+            mid prices of each product of the day
+        window (int): size of the rolling windows
+
+    Returns:
+        Dict[str, list]: values of each window, oldest first
+    """
+    series: Dict[str, np.ndarray] = {}
+
+    if "COCONUTS" in mid_prices and "PINA_COLADAS" in mid_prices:
+        series["Spread"] = (
+            PAIR_HEDGE_RATIO.denominator * half_ticks(mid_prices["PINA_COLADAS"][1])
+            - PAIR_HEDGE_RATIO.numerator * half_ticks(mid_prices["COCONUTS"][1])
+        )
+
+    if "DIVING_GEAR" in mid_prices:
+        diving_gear = mid_prices["DIVING_GEAR"][1]
+        series["DIVING_GEAR"] = diving_gear[1:] / diving_gear[:-1] - 1
+
+    if all(leg in mid_prices for leg in BASKET_LEGS):
+        series["SPREAD_PICNIC"] = sum(weight * half_ticks(mid_prices[leg][1]) for leg, weight in BASKET_LEGS.items())
+
+    return {name: values[-window:].tolist() for name, values in series.items()}
+
+
+def build_warm_start(path: str, window: int = WINDOW) -> str:
+    """Warm-start snapshot of the day in ``path``."""
+    mid_prices = load_mid_prices(path)
+    closing_prices = {product: float(values[-1]) for product, (_, values) in mid_prices.items()}
+    return encode_snapshot({
+        "ema_prices": {product: int(half_ticks(price)) for product, price in closing_prices.items()},
+        "histories": build_histories(mid_prices, window),
+        "last_diving_gear_price": closing_prices.get("DIVING_GEAR"),
+        "last_dolphin_price": closing_prices.get(DOLPHIN_SIGHTINGS),
+    }, level=9)
+
+
+def write_warm_starts(prices_paths: Sequence[str], directory: str, window: int = WINDOW) -> List[Optional[str]]:
+    """Warm-start files of consecutive days, each built from the day before
+    it and written in ``directory``.
+
+    Args:
+        prices_paths (Sequence[str]): ``prices_round_*`` files, in
+            chronological order
+        directory (str): directory of the files, created when needed
+        window (int): size of the rolling windows
+
+    Returns:
+        List[Optional[str]]: path of the file of each day, None for the
+        first day, which starts cold
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths: List[Optional[str]] = [None]
+    for previous in prices_paths[:-1]:
+        # Named after the day it was built from, so that its fingerprint is stable
+        path = os.path.join(directory, f"warm_start_{os.path.splitext(os.path.basename(previous))[0]}.txt")
+        with open(path, "w") as file:
+            file.write(build_warm_start(previous, window))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", help="prices_round_*.csv file of the previous day")
+    parser.add_argument("-o", "--output", default="warm_start.txt")
+    parser.add_argument("--window", type=int, default=WINDOW)
+    args = parser.parse_args()
+
+    snapshot = build_warm_start(args.prices, args.window)
+    with open(args.output, "w") as file:
+        file.write(snapshot)
+    print(f"Wrote {len(snapshot)} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Offline replay of the IMC price/trade CSVs against a ``Trader``."""
@@ -0,0 +1,291 @@
+"""Content-addressed on-disk cache of backtest results.
+
+Results are stored under the SHA-256 of their key, a JSON-able structure
+that identifies everything the result depends on: the hash of the source
+code of the trader and of the backtest engine, the parameters, the
+fingerprint of the data files and that of the warm-start file the trader
+loads, ``warm_start.txt`` unless the caller gives the one built from the
+previous day (see ``analysis.warmstart.write_warm_starts``). A change to any of them gives a new key, so
+stale results are never read back and nothing needs to be invalidated. The
+source hash covers the modules of this repository imported by the trader,
+directly or not, so editing one round's entry point or an analysis tool
+does not invalidate the results of the other traders.
+
+Entries are compressed pickles of the whole ``BacktestResult``: PnL curves,
+positions, mid prices, fills and sent volumes, from which
+``analysis.performance.Run.from_backtest`` derives the metrics. Reading an
+entry marks it as recently used, and once the cache outgrows its size cap
+the least recently used entries are deleted.
+
+    cache = ResultCache(".backtest_cache")
+    result = cached_backtest("round5_trader", {"window": 100}, prices_path, trades_path, cache)
+
+Usage:
+    python -m backtest.cache
+    python -m backtest.cache --max-bytes 200000000
+"""
+import argparse
+import contextlib
+import functools
+import hashlib
+import importlib
+import importlib.util
+import json
+import modulefinder
+import os
+import pickle
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from backtest.data import load_day
+from backtest.engine import Backtester, BacktestResult
+from prosperity.trader import WARM_START_PATH, TraderParams
+
+CACHE_DIR = ".backtest_cache"
+
+# Size cap of the cache directory, in bytes
+MAX_BYTES = 1 << 30
+
+# Modules whose source every backtest depends on, besides the trader's
+ENGINE_MODULES = ("backtest.engine", "backtest.data")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHUNK = 1 << 20
+_SUFFIX = ".pkl.z"
+
+
+def _hash_files(paths: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(_CHUNK), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _fingerprint(path: str, size: int, mtime: int) -> str:
+    """SHA-256 of a file, read again only when its size or modification
+    time change."""
+    return _hash_files([path])
+
+
+def file_fingerprint(*paths: Optional[str]) -> str:
+    """SHA-256 of the content of data files, such as the prices and trades
+    files of a day. Missing (None) paths are skipped."""
+    digests = []
+    for path in paths:
+        if path is None:
+            continue
+        stat = os.stat(path)
+        digests.append(_fingerprint(os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    return hashlib.sha256("".join(digests).encode()).hexdigest()
+
+
+def source_files(modules: Iterable[str]) -> List[str]:
+    """Source files of ``modules`` and of every module of this repository
+    they import, directly or not."""
+    finder = modulefinder.ModuleFinder(path=[ROOT])
+    # Each script is run as __main__, so their paths are kept aside
+    scripts = [os.path.abspath(importlib.util.find_spec(module).origin) for module in modules]
+    for script in scripts:
+        finder.run_script(script)
+    return sorted(set(scripts) | {
+        os.path.abspath(module.__file__)
+        for module in finder.modules.values()
+        if module.__file__ and os.path.abspath(module.__file__).startswith(ROOT + os.sep)
+    })
+
+
+@functools.lru_cache(maxsize=None)
+def source_hash(trader_module: str) -> str:
+    """SHA-256 of the source of a trader module, of the backtest engine and
+    of the repository modules they import."""
+    return _hash_files(source_files((trader_module,) + ENGINE_MODULES))
+
+
+def warm_start_fingerprint(path: Optional[str]) -> Optional[str]:
+    """Fingerprint of a warm-start file, None when there is none."""
+    return file_fingerprint(path) if path is not None and os.path.exists(path) else None
+
+
+def backtest_key(
+        trader_module: str,
+        params: Optional[Dict[str, float]],
+        prices_path: str,
+        trades_path: Optional[str] = None,
+        ticks: Optional[int] = None,
+        warm_start: Optional[str] = WARM_START_PATH
+    ) -> tuple:
+    """Key of the backtest of a trader with ``params`` on one day, or on its
+    first ``ticks`` ticks. All the parameters are in the key, so that
+    default values given explicitly or left out share their entry, and so
+    is the warm-start file, which moves the first ticks of every day."""
+    values = {
+        name: None if value is None else float(value)
+        for name, value in TraderParams(**(params or {})).as_dict().items()
+    }
+    key = (
+        "backtest",
+        trader_module,
+        source_hash(trader_module),
+        values,
+        file_fingerprint(prices_path, trades_path),
+        warm_start_fingerprint(warm_start),
+    )
+    return key if ticks is None else key + (ticks,)
+
+
+class ResultCache:
+    """Results stored by the hash of their key, with a least recently used
+    eviction.
+
+    Args:
+        directory (str): directory of the cache, created when needed
+        max_bytes (int): size above which the least recently used entries
+            are deleted
+    """
+
+    __slots__ = ("directory", "max_bytes", "_size")
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def digest(key: Any) -> str:
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key: Any) -> str:
+        digest = self.digest(key)
+        return os.path.join(self.directory, digest[:2], digest + _SUFFIX)
+
+    def __contains__(self, key: Any) -> bool:
+        return os.path.exists(self.path(key))
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Result stored under ``key``, None when there is none."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.loads(zlib.decompress(file.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+        with contextlib.suppress(OSError):
+            # Most recently used
+            os.utime(path)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        # Written aside and renamed, so that readers never see a partial file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+        self._size = (self.size() if self._size is None else self._size) + len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self) -> List[os.DirEntry]:
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                entries.extend(entry for entry in os.scandir(bucket.path) if entry.name.endswith(_SUFFIX))
+        return entries
+
+    def size(self) -> int:
+        """Bytes used by the entries."""
+        total = 0
+        for entry in self.entries():
+            with contextlib.suppress(OSError):
+                total += entry.stat().st_size
+        return total
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Deletes the least recently used entries until the cache fits in
+        ``max_bytes``, its cap by default. Returns the number deleted."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for entry in self.entries():
+            with contextlib.suppress(OSError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                # Another process may have evicted it already
+                os.remove(path)
+                deleted += 1
+            total -= size
+        self._size = total
+        return deleted
+
+
+def run_backtest(
+        trader_module: str,
+        params: Optional[Dict[str, float]],
+        prices_path: str,
+        trades_path: Optional[str] = None,
+        ticks: Optional[int] = None,
+        warm_start: Optional[str] = WARM_START_PATH
+    ) -> BacktestResult:
+    """Backtest of a trader module with ``params`` (fields of
+    ``TraderParams``, the defaults if None) on one day, or on its first
+    ``ticks`` ticks, warm-started from the file ``warm_start`` when it
+    exists."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        trader_class = importlib.import_module(trader_module).Trader
+        trader = trader_class(TraderParams(**params) if params else None, warm_start)
+    return Backtester(trader).run(load_day(prices_path, trades_path, ticks))
+
+
+def cached_backtest(
+        trader_module: str,
+        params: Optional[Dict[str, float]],
+        prices_path: str,
+        trades_path: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        ticks: Optional[int] = None,
+        warm_start: Optional[str] = WARM_START_PATH
+    ) -> BacktestResult:
+    """``run_backtest``, read from ``cache`` when it was already run with
+    the same source code, parameters, data and warm start."""
+    if cache is None:
+        return run_backtest(trader_module, params, prices_path, trades_path, ticks, warm_start)
+
+    key = backtest_key(trader_module, params, prices_path, trades_path, ticks, warm_start)
+    result = cache.get(key)
+    if result is None:
+        result = run_backtest(trader_module, params, prices_path, trades_path, ticks, warm_start)
+        cache.put(key, result)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the cache")
+    parser.add_argument("--max-bytes", type=int, help="evict the least recently used entries down to this size")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache_dir)
+    if args.max_bytes is not None:
+        print(f"Evicted {cache.evict(args.max_bytes)} entries")
+    print(f"{len(cache.entries())} entries, {cache.size() / (1 << 20):.1f} MB in {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
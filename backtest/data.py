@@ -0,0 +1,119 @@
+"""Loading of the IMC ``prices_round_*`` and ``trades_round_*`` CSVs.
+
+Both files are ``;`` separated. Every row of a prices file holds the three
+best levels of one product at one timestamp; observation series such as
+DOLPHIN_SIGHTINGS only carry a ``mid_price``.
+"""
+import csv
+from typing import Dict, List, Optional
+
+from datamodel import Listing, OrderDepth, Trade, TradingState
+
+OBSERVATIONS = ["DOLPHIN_SIGHTINGS"]
+
+LEVELS = 3
+
+
+def _to_int(value: str) -> int:
+    return int(float(value))
+
+
+def load_prices(path: str, ticks: Optional[int] = None) -> Dict[int, TradingState]:
+    """Reads a prices CSV into one ``TradingState`` per timestamp, without
+    positions nor trades.
+
+    Args:
+        path (str): path of a ``prices_round_*`` file
+        ticks (Optional[int]): number of timestamps read from the start of
+            the file, all if None
+
+    Returns:
+        Dict[int, TradingState]: states indexed by timestamp, in file order
+    """
+    states: Dict[int, TradingState] = {}
+
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file, delimiter=";"):
+            timestamp = int(row["timestamp"])
+            state = states.get(timestamp)
+            if state is None:
+                if ticks is not None and len(states) == ticks:
+                    # Rows may be grouped by product rather than by timestamp
+                    continue
+                state = TradingState(timestamp, {}, {}, {}, {}, {}, {})
+                states[timestamp] = state
+
+            product = row["product"]
+            if product in OBSERVATIONS:
+                state.observations[product] = _to_int(row["mid_price"])
+                continue
+
+            order_depth = OrderDepth()
+            for level in range(1, LEVELS + 1):
+                bid_price = row.get(f"bid_price_{level}")
+                if bid_price:
+                    order_depth.buy_orders[_to_int(bid_price)] = _to_int(row[f"bid_volume_{level}"])
+                ask_price = row.get(f"ask_price_{level}")
+                if ask_price:
+                    order_depth.sell_orders[_to_int(ask_price)] = -abs(_to_int(row[f"ask_volume_{level}"]))
+
+            state.order_depths[product] = order_depth
+            state.listings[product] = Listing(product, product, "SEASHELLS")
+
+    return states
+
+
+def load_trades(path: str) -> Dict[int, Dict[str, List[Trade]]]:
+    """Reads a trades CSV into the market trades of each timestamp.
+
+    Args:
+        path (str): path of a ``trades_round_*`` file
+
+    Returns:
+        Dict[int, Dict[str, List[Trade]]]: trades by timestamp and symbol
+    """
+    trades: Dict[int, Dict[str, List[Trade]]] = {}
+
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file, delimiter=";"):
+            timestamp = int(row["timestamp"])
+            symbol = row["symbol"]
+            trade = Trade(
+                symbol,
+                _to_int(row["price"]),
+                int(row["quantity"]),
+                row.get("buyer") or None,
+                row.get("seller") or None,
+                timestamp
+            )
+            trades.setdefault(timestamp, {}).setdefault(symbol, []).append(trade)
+
+    return trades
+
+
+def count_ticks(prices_path: str) -> int:
+    """Number of timestamps of a prices file."""
+    with open(prices_path, newline="") as file:
+        return len({row["timestamp"] for row in csv.DictReader(file, delimiter=";")})
+
+
+def load_day(prices_path: str, trades_path: Optional[str] = None, ticks: Optional[int] = None) -> List[TradingState]:
+    """States of one day, with the market trades attached when a trades file
+    is given.
+
+    Args:
+        prices_path (str): path of a ``prices_round_*`` file
+        trades_path (Optional[str]): path of the matching ``trades_round_*``
+        ticks (Optional[int]): number of timestamps loaded from the start of
+            the day, all if None
+
+    Returns:
+        List[TradingState]: states sorted by timestamp
+    """
+    states = load_prices(prices_path, ticks)
+    if trades_path is not None:
+        for timestamp, market_trades in load_trades(trades_path).items():
+            if timestamp in states:
+                states[timestamp].market_trades = market_trades
+
+    return [states[timestamp] for timestamp in sorted(states)]
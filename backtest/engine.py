@@ -0,0 +1,248 @@
+"""Replay of a day of market data against a ``Trader``.
+
+Orders are matched against the book of the tick they were sent on, level by
+level. Whatever is left is matched against the market trades of that tick,
+at the trade price. As on the exchange, all orders of a product are
+cancelled when they could breach its position limit if fully filled.
+
+With ``restart_probability`` set, the trader is replaced at random ticks by
+a fresh instance restored from its ``snapshot()``, which checks that the
+strategies survive a recycled process.
+
+With ``allocations`` set to a ``prosperity.allocations.AllocationMonitor``,
+the allocations of every strategy are measured on each tick, and the run
+fails with an ``AllocationGrowthError`` when they grow with its length.
+"""
+import contextlib
+import os
+import random
+from typing import Dict, Iterable, List, Optional
+
+from datamodel import Order, OrderDepth, Trade, TradingState
+
+from prosperity.allocations import AllocationMonitor
+from prosperity.products import POSITION_LIMITS, SUBMISSION
+
+
+class Fill:
+    """One execution of our orders. ``quantity`` is negative for sells."""
+
+    __slots__ = ("timestamp", "symbol", "price", "quantity", "mid_price")
+
+    def __init__(self, timestamp: int, symbol: str, price: float, quantity: int, mid_price: Optional[float]) -> None:
+        self.timestamp = timestamp
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.mid_price = mid_price
+
+    def __repr__(self) -> str:
+        return f"Fill({self.timestamp}, {self.symbol}, {self.price}, {self.quantity})"
+
+
+class BacktestResult:
+    """Per tick PnL and positions of every product, plus all fills and the
+    volume of the orders sent on each product."""
+
+    def __init__(self) -> None:
+        self.timestamps: List[int] = []
+        self.pnl: Dict[str, List[float]] = {}
+        self.positions: Dict[str, List[int]] = {}
+        self.mid_prices: Dict[str, List[Optional[float]]] = {}
+        self.fills: List[Fill] = []
+        self.sent_volume: Dict[str, int] = {}
+
+    def record(self, product: str, pnl: float, position: int, mid_price: Optional[float]) -> None:
+        if product not in self.pnl:
+            # Products listed late are padded so that all series are aligned
+            missing = len(self.timestamps) - 1
+            self.pnl[product] = [0.0] * missing
+            self.positions[product] = [0] * missing
+            self.mid_prices[product] = [None] * missing
+        self.pnl[product].append(pnl)
+        self.positions[product].append(position)
+        self.mid_prices[product].append(mid_price)
+
+    @property
+    def total_pnl(self) -> List[float]:
+        return [sum(values) for values in zip(*self.pnl.values())]
+
+    def final_pnl(self) -> Dict[str, float]:
+        return {product: values[-1] for product, values in self.pnl.items() if values}
+
+
+def _mid_price(order_depth: OrderDepth) -> Optional[float]:
+    if not order_depth.buy_orders or not order_depth.sell_orders:
+        return None
+    return (max(order_depth.buy_orders) + min(order_depth.sell_orders)) / 2
+
+
+class Backtester:
+    """Drives a trader through a sequence of ``TradingState``.
+
+    Args:
+        trader: object with a ``run(state)`` method
+        position_limits (Dict[str, int]): limits enforced on the orders
+        match_market_trades (bool): fill resting orders against market trades
+        quiet (bool): silence the trader's prints
+        restart_probability (float): probability of restarting the trader
+            from its snapshot after each tick
+        seed (int): seed of the restarts
+        recorder: optional ``backtest.replay.Recorder`` writing every state
+            and the orders returned on it
+        allocations (Optional[AllocationMonitor]): monitor attached to the
+            trader, checked for allocation growth at the end of the run
+    """
+
+    def __init__(
+            self,
+            trader,
+            position_limits: Optional[Dict[str, int]] = None,
+            match_market_trades: bool = True,
+            quiet: bool = True,
+            restart_probability: float = 0.0,
+            seed: int = 0,
+            recorder=None,
+            allocations: Optional[AllocationMonitor] = None
+        ) -> None:
+        self.trader = trader
+        self.position_limits = POSITION_LIMITS if position_limits is None else position_limits
+        self.match_market_trades = match_market_trades
+        self.quiet = quiet
+        self.restart_probability = restart_probability
+        self.random = random.Random(seed)
+        self.restarts = 0
+        self.recorder = recorder
+        self.allocations = allocations
+        if allocations is not None:
+            self.trader.allocations = allocations
+
+        self.positions: Dict[str, int] = {}
+        self.cash: Dict[str, float] = {}
+        self.last_mid_prices: Dict[str, float] = {}
+        self.own_trades: Dict[str, List[Trade]] = {}
+
+    def run(self, states: Iterable[TradingState]) -> BacktestResult:
+        result = BacktestResult()
+
+        with open(os.devnull, "w") as devnull:
+            redirect = contextlib.redirect_stdout(devnull) if self.quiet else contextlib.nullcontext()
+            with redirect:
+                try:
+                    for state in states:
+                        self.step(state, result)
+                        if self.restart_probability and self.random.random() < self.restart_probability:
+                            self.restart()
+                finally:
+                    if self.allocations is not None:
+                        self.allocations.close()
+
+        if self.allocations is not None:
+            self.allocations.check()
+        return result
+
+    def restart(self) -> None:
+        """Replaces the trader by a new instance restored from its snapshot."""
+        snapshot = self.trader.snapshot()
+        self.trader = type(self.trader)()
+        self.trader.restore(snapshot)
+        if self.allocations is not None:
+            self.trader.allocations = self.allocations
+        self.restarts += 1
+
+    def step(self, state: TradingState, result: BacktestResult) -> Dict[str, List[Order]]:
+        """Runs the trader on one state and matches its orders."""
+        self.prepare(state)
+        orders = self.trader.run(state) or {}
+        if self.recorder is not None:
+            self.recorder.write(state, orders)
+        self.settle(state, orders, result)
+        return orders
+
+    def prepare(self, state: TradingState) -> None:
+        """Sets the positions and own trades of the trader on ``state``."""
+        state.position = dict(self.positions)
+        state.own_trades = self.own_trades
+
+    def settle(self, state: TradingState, orders: Dict[str, List[Order]], result: BacktestResult) -> None:
+        """Matches the orders returned on ``state`` and records the tick."""
+        own_trades: Dict[str, List[Trade]] = {}
+        for symbol, symbol_orders in orders.items():
+            order_depth = state.order_depths.get(symbol)
+            if not symbol_orders or order_depth is None:
+                continue
+            result.sent_volume[symbol] = result.sent_volume.get(symbol, 0) + sum(
+                abs(order.quantity) for order in symbol_orders
+            )
+            fills = self.match(state, symbol, symbol_orders, order_depth)
+            for fill in fills:
+                result.fills.append(fill)
+                self.positions[symbol] = self.positions.get(symbol, 0) + fill.quantity
+                self.cash[symbol] = self.cash.get(symbol, 0) - fill.price * fill.quantity
+                own_trades.setdefault(symbol, []).append(Trade(
+                    symbol,
+                    fill.price,
+                    abs(fill.quantity),
+                    SUBMISSION if fill.quantity > 0 else None,
+                    SUBMISSION if fill.quantity < 0 else None,
+                    state.timestamp
+                ))
+        self.own_trades = own_trades
+
+        result.timestamps.append(state.timestamp)
+        for product, order_depth in state.order_depths.items():
+            mid_price = _mid_price(order_depth)
+            if mid_price is not None:
+                self.last_mid_prices[product] = mid_price
+            last_mid = self.last_mid_prices.get(product, 0)
+            position = self.positions.get(product, 0)
+            result.record(product, self.cash.get(product, 0) + position * last_mid, position, mid_price)
+
+    def match(self, state: TradingState, symbol: str, orders: List[Order], order_depth: OrderDepth) -> List[Fill]:
+        """Fills of the orders of one symbol."""
+        position = self.positions.get(symbol, 0)
+        limit = self.position_limits.get(symbol)
+        if limit is not None:
+            buy_quantity = sum(order.quantity for order in orders if order.quantity > 0)
+            sell_quantity = sum(order.quantity for order in orders if order.quantity < 0)
+            if position + buy_quantity > limit or position + sell_quantity < -limit:
+                return []
+
+        mid_price = _mid_price(order_depth)
+        asks = {price: abs(volume) for price, volume in order_depth.sell_orders.items()}
+        bids = {price: abs(volume) for price, volume in order_depth.buy_orders.items()}
+        market_trades = [
+            [trade.price, trade.quantity]
+            for trade in state.market_trades.get(symbol, [])
+        ] if self.match_market_trades else []
+
+        fills: List[Fill] = []
+        for order in orders:
+            if order.quantity == 0:
+                continue
+            buy = order.quantity > 0
+            remaining = abs(order.quantity)
+            book = asks if buy else bids
+
+            for price in sorted(book, reverse=not buy):
+                if remaining == 0 or (price > order.price if buy else price < order.price):
+                    break
+                volume = min(remaining, book[price])
+                book[price] -= volume
+                if book[price] == 0:
+                    del book[price]
+                remaining -= volume
+                fills.append(Fill(state.timestamp, symbol, price, volume if buy else -volume, mid_price))
+
+            for trade in market_trades:
+                if remaining == 0:
+                    break
+                price, volume = trade
+                if volume == 0 or (price > order.price if buy else price < order.price):
+                    continue
+                volume = min(remaining, volume)
+                trade[1] -= volume
+                remaining -= volume
+                fills.append(Fill(state.timestamp, symbol, price, volume if buy else -volume, mid_price))
+
+        return fills
@@ -0,0 +1,256 @@
+"""Successive halving search of the trader parameters.
+
+A grid over the windows, the entry thresholds, the order volume and the
+exits of the spreads grows as the product of their sizes, and backtesting
+every point on every day mostly spends time on parameters that are bad
+from the first thousand ticks. Successive halving samples ``--configs`` points of the search space
+and backtests them on a short slice of the first day, the first
+``--min-ticks`` ticks. The best ``1 / --eta`` of them are promoted to a
+slice ``--eta`` times longer, which may run over the next days, and so on
+until the survivors are backtested on all the days. Bad configurations are
+dropped after the first rung, at a fraction of the cost of a full
+backtest, and only the last few see the whole history.
+
+The backtests of a rung run in a process pool and go through the cache of
+``backtest.cache``, so that a rerun with a larger budget or another seed
+only backtests the configurations and slices it has not seen. Every day is
+warm-started from the day before it, as in ``backtest.walkforward``.
+
+Usage:
+    python -m backtest.search data/round5/prices_round_5_day_*.csv
+    python -m backtest.search data/round5/prices_round_5_day_*.csv --configs 27 --min-ticks 2000 --eta 3
+    python -m backtest.search data/round4/prices_round_4_day_*.csv --trader round4_trader --space window=100,200 basket_entry=1.5,2,2.5 -o search.json
+"""
+import argparse
+import json
+import math
+import random
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backtest.cache import CACHE_DIR, ResultCache, cached_backtest
+from backtest.data import count_ticks
+from backtest.walkforward import (
+    TRADER,
+    Day,
+    Params,
+    default_point,
+    grid_points,
+    objective,
+    parse_grid,
+    warm_start_days
+)
+from prosperity.trader import STOP_LOSS, TAKE_PROFIT, WINDOW
+
+# Values of the TraderParams fields searched by default. The default
+# parameters, without exits, are evaluated along with them.
+SPACE = {
+    "window": [50, 100, 200, 400],
+    "pair_entry": [1.0, 1.5, 2.0, 2.5],
+    "basket_entry": [1.5, 2.0, 2.5, 3.0],
+    "order_volume": [1, 3, 5],
+    "take_profit": [TAKE_PROFIT, 50, 200],
+    "stop_loss": [STOP_LOSS, 200, 800],
+}
+
+# Configurations sampled from the space, evaluated on the first rung
+CONFIGS = 81
+
+# Ticks of the first rung
+MIN_TICKS = 1_000
+
+# Ratio of the ticks of a rung to those of the previous one, and of the
+# configurations of a rung to those promoted from it
+ETA = 3
+
+
+class Rung:
+    """Configurations evaluated on the same ticks.
+
+    Attributes:
+        ticks (int): ticks backtested per configuration, over one or more days
+        configs (List[Params]): configurations, best first
+        scores (List[float]): their PnL on these ticks
+    """
+
+    __slots__ = ("ticks", "configs", "scores")
+
+    def __init__(self, ticks: int, configs: List[Params], scores: List[float]) -> None:
+        self.ticks = ticks
+        self.configs = configs
+        self.scores = scores
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def sample_configs(space: Dict[str, List[float]], count: int, seed: Optional[int] = None) -> List[Params]:
+    """``count`` distinct points of the space drawn at random, the default
+    parameters first. Points are drawn as indices into the grid, which is
+    only built when it has no more than ``count`` points."""
+    axes = {name: list(dict.fromkeys(values)) for name, values in space.items()}
+    sizes = [len(values) for values in axes.values()]
+    if math.prod(sizes) <= count:
+        return grid_points(axes)
+
+    defaults = default_point(axes)
+    points = [defaults]
+    for index in random.Random(seed).sample(range(math.prod(sizes)), count):
+        point = {name: values[int(i)] for (name, values), i in zip(axes.items(), np.unravel_index(index, sizes))}
+        # The defaults may be drawn, in which case one more point is kept
+        if point != defaults and len(points) < count:
+            points.append(point)
+    return points
+
+
+def day_slices(day_ticks: Sequence[int], ticks: int) -> List[Tuple[int, Optional[int]]]:
+    """First ``ticks`` ticks of consecutive days, as (day index, ticks of
+    the day or None for the whole day) pairs."""
+    slices = []
+    for day, length in enumerate(day_ticks):
+        if ticks <= 0:
+            break
+        slices.append((day, None if ticks >= length else ticks))
+        ticks -= length
+    return slices
+
+
+def final_pnl(
+        task: Tuple[str, Params, str, Optional[str], Optional[str], Optional[ResultCache], Optional[int]]
+    ) -> Dict[str, float]:
+    """Final PnL per product of a trader with the given parameters on the
+    first ticks of one day."""
+    trader_module, params, prices_path, trades_path, warm_start, cache, ticks = task
+    return cached_backtest(trader_module, params, prices_path, trades_path, cache, ticks, warm_start).final_pnl()
+
+
+def evaluate(
+        pool: Executor,
+        trader_module: str,
+        configs: List[Params],
+        days: List[Day],
+        slices: List[Tuple[int, Optional[int]]],
+        products: Optional[Sequence[str]] = None,
+        cache: Optional[ResultCache] = None
+    ) -> List[float]:
+    """PnL of every configuration summed over the day slices."""
+    tasks = [(trader_module, config, *days[day], cache, ticks) for config in configs for day, ticks in slices]
+    pnls = [objective(pnl, products) for pnl in pool.map(final_pnl, tasks)]
+    return [sum(pnls[i:i + len(slices)]) for i in range(0, len(pnls), len(slices))]
+
+
+def successive_halving(
+        prices_paths: Sequence[str],
+        trader_module: str = TRADER,
+        space: Optional[Dict[str, List[float]]] = None,
+        configs: int = CONFIGS,
+        min_ticks: int = MIN_TICKS,
+        eta: int = ETA,
+        products: Optional[Sequence[str]] = None,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None
+    ) -> Tuple[List[Rung], float]:
+    """Rungs of a successive halving search.
+
+    Args:
+        prices_paths (Sequence[str]): ``prices_round_*`` files, in
+            chronological order. The trades file of each day is used when
+            it exists.
+        trader_module (str): module defining ``Trader``
+        space (Optional[Dict[str, List[float]]]): values of the
+            ``TraderParams`` fields searched, ``SPACE`` by default
+        configs (int): configurations sampled for the first rung
+        min_ticks (int): ticks of the first rung
+        eta (int): ratio of the ticks of consecutive rungs, and of their
+            configurations
+        products (Optional[Sequence[str]]): products whose PnL is
+            optimized, all of them by default
+        seed (Optional[int]): seed of the sampling of the configurations
+        workers (Optional[int]): processes of the pool, all cores by default
+        cache (Optional[ResultCache]): cache of the backtests
+
+    Returns:
+        Tuple[List[Rung], float]: rungs from the first to the one on every
+        day, and the PnL of the default parameters on every day
+    """
+    space = SPACE if space is None else space
+    day_ticks = [count_ticks(path) for path in prices_paths]
+    total = sum(day_ticks)
+    candidates = sample_configs(space, configs, seed)
+    defaults = default_point(space)
+    # Long enough for the largest window searched
+    window = int(max([WINDOW, *space.get("window", [])]))
+
+    rungs: List[Rung] = []
+    ticks = min(min_ticks, total)
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(workers) as pool:
+        days = warm_start_days(prices_paths, directory, window)
+        while True:
+            scores = evaluate(pool, trader_module, candidates, days, day_slices(day_ticks, ticks), products, cache)
+            order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+            rungs.append(Rung(ticks, [candidates[i] for i in order], [scores[i] for i in order]))
+            print(f"Rung {len(rungs)}: {len(candidates)} configurations on {ticks} ticks, best {scores[order[0]]:.1f}")
+            if ticks == total:
+                break
+            candidates = rungs[-1].configs[:math.ceil(len(candidates) / eta)]
+            # A single survivor goes straight to the full backtest
+            ticks = total if len(candidates) == 1 else min(ticks * eta, total)
+
+        last = rungs[-1]
+        if defaults in last.configs:
+            default_score = last.scores[last.configs.index(defaults)]
+        else:
+            default_score, = evaluate(pool, trader_module, [defaults], days, day_slices(day_ticks, total), products, cache)
+    return rungs, default_score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files, in chronological order")
+    parser.add_argument("--trader", default=TRADER, help="module defining Trader")
+    parser.add_argument("--space", nargs="+", help="name=value,value,... for each TraderParams field searched")
+    parser.add_argument("--configs", type=int, default=CONFIGS, help="configurations of the first rung")
+    parser.add_argument("--min-ticks", type=int, default=MIN_TICKS, help="ticks of the first rung")
+    parser.add_argument("--eta", type=int, default=ETA, help="ratio of the ticks and configurations of consecutive rungs")
+    parser.add_argument("--products", nargs="+", help="products whose PnL is optimized, all by default")
+    parser.add_argument("--seed", type=int, help="seed of the sampling of the configurations")
+    parser.add_argument("--workers", type=int, help="processes, all cores by default")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the cached backtests")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the cache")
+    parser.add_argument("-o", "--output", help="JSON file of the rungs")
+    args = parser.parse_args()
+
+    if args.eta < 2 or args.configs < 1 or args.min_ticks < 1:
+        parser.error("--eta must be at least 2, --configs and --min-ticks at least 1")
+    try:
+        space = parse_grid(args.space) if args.space else None
+    except ValueError as e:
+        parser.error(str(e))
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    rungs, default_score = successive_halving(
+        args.prices, args.trader, space, args.configs, args.min_ticks, args.eta,
+        args.products, args.seed, args.workers, cache,
+    )
+
+    last = rungs[-1]
+    print(f"Best configurations on {last.ticks} ticks:")
+    for config, score in zip(last.configs, last.scores):
+        print(f"{score:>12.1f}  " + ", ".join(f"{name}={value}" for name, value in config.items()))
+    print(f"{default_score:>12.1f}  default parameters")
+
+    simulated = sum(len(rung.configs) * rung.ticks for rung in rungs)
+    exhaustive = len(rungs[0].configs) * last.ticks
+    print(f"Simulated {simulated} ticks, {exhaustive / simulated:.1f} times fewer than full backtests of every configuration")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"rungs": [rung.as_dict() for rung in rungs], "default": default_score}, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Local backtest server running several traders on one shared market feed.
+
+The server streams the ticks of a recorded day to every connected trader
+process over TCP on localhost, as the exchange does: each tick is sent to
+all clients at once and their orders are collected concurrently, with a
+per tick deadline. Every client trades on its own account: it has its own
+positions and own trades, and its orders are matched by its own
+``Backtester``. A client missing the deadline sends no orders on that tick;
+its late answer is discarded.
+
+Messages are JSON lines. A client first sends ``{"name": ...}``, then
+receives one ``backtest.replay.encode_tick`` line per tick and answers
+``[timestamp, {symbol: [[price, quantity], ...]}]``. The server ends with
+``{"done": true}``.
+
+The report gives, per client, the round trip latency percentiles (send of
+the state to receipt of the orders), the timeouts, the ticks per second and
+the final PnL.
+
+Usage:
+    python -m backtest.server serve data/round4/prices_round_4_day_1.csv --spawn round5_trader round4_trader
+    python -m backtest.server serve data/round4/prices_round_4_day_1.csv --port 8765 --clients 2
+    python -m backtest.server client --trader round5_trader --port 8765
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import socket
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from datamodel import Order, TradingState
+
+from backtest.data import load_day
+from backtest.engine import Backtester, BacktestResult
+from backtest.replay import decode_tick, encode_tick, read_recording
+
+HOST = "127.0.0.1"
+
+# Seconds a client has to answer a tick
+DEADLINE = 0.9
+
+# Seconds to wait for all the clients to connect
+CONNECT_TIMEOUT = 30.0
+
+DONE = json.dumps({"done": True}) + "\n"
+
+
+class Client:
+    """A connected trader, with its own account.
+
+    Attributes:
+        name (str): name sent by the client
+        backtester (Backtester): positions and matching of its orders
+        result (BacktestResult): PnL and fills of its account
+        latencies (array): round trip seconds of every answered tick
+        timeouts (int): ticks answered late or not at all
+    """
+
+    def __init__(self, name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.backtester = Backtester(None)
+        self.result = BacktestResult()
+        self.latencies = array("d")
+        self.timeouts = 0
+        self.connected = True
+        self.closed = asyncio.Event()
+
+    def report(self, ticks: int, seconds: float) -> Dict[str, object]:
+        ordered = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1e3 if ordered else None
+
+        final_pnl = self.result.final_pnl()
+        return {
+            "name": self.name,
+            "ticks": ticks,
+            "answered": len(self.latencies),
+            "timeouts": self.timeouts,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+            "max_ms": percentile(1.0),
+            "ticks_per_second": len(self.latencies) / seconds if seconds else 0.0,
+            "pnl": sum(final_pnl.values()),
+        }
+
+
+class BacktestServer:
+    """Streams states to the connected clients and matches their orders.
+
+    Args:
+        states (Iterable[TradingState]): ticks of the shared market feed
+        clients (int): number of clients to wait for before starting
+        host (str): address to listen on
+        port (int): port to listen on, any free port when 0
+        deadline (float): seconds a client has to answer a tick
+        connect_timeout (float): seconds to wait for the clients, after
+            which the run starts with the clients connected so far
+    """
+
+    def __init__(
+            self,
+            states: Iterable[TradingState],
+            clients: int,
+            host: str = HOST,
+            port: int = 0,
+            deadline: float = DEADLINE,
+            connect_timeout: float = CONNECT_TIMEOUT
+        ) -> None:
+        self.states = states
+        self.expected = clients
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+
+        self.clients: List[Client] = []
+        self.ready = asyncio.Event()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.ticks = 0
+        self.seconds = 0.0
+
+    async def start(self) -> int:
+        """Starts listening and returns the port."""
+        self.server = await asyncio.start_server(self.connect, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        hello = json.loads(await reader.readline() or "{}")
+        client = Client(hello.get("name", f"client{len(self.clients)}"), reader, writer)
+        self.clients.append(client)
+        print(f"{client.name} connected")
+        if len(self.clients) >= self.expected:
+            self.ready.set()
+        # The connection stays open until the end of the run
+        await client.closed.wait()
+
+    async def run(self) -> List[Dict[str, object]]:
+        """Waits for the clients, streams every tick and returns the report
+        of each client."""
+        if self.server is None:
+            await self.start()
+
+        try:
+            await asyncio.wait_for(self.ready.wait(), self.connect_timeout)
+        except asyncio.TimeoutError:
+            print(f"Starting with {len(self.clients)} of {self.expected} clients")
+        clients = list(self.clients)
+
+        start = time.perf_counter()
+        for state in self.states:
+            active = [client for client in clients if client.connected]
+            if not active:
+                break
+            sent = {}
+            for client in active:
+                client.backtester.prepare(state)
+                client.writer.write((encode_tick(state, {}) + "\n").encode())
+                sent[client] = time.perf_counter()
+            await asyncio.gather(*(client.writer.drain() for client in active))
+
+            orders = await asyncio.gather(*(
+                self.collect(client, state.timestamp, sent[client]) for client in active
+            ))
+            for client, client_orders in zip(active, orders):
+                client.backtester.settle(state, client_orders, client.result)
+            self.ticks += 1
+        self.seconds = time.perf_counter() - start
+
+        for client in clients:
+            if client.connected:
+                client.writer.write(DONE.encode())
+                await client.writer.drain()
+            client.writer.close()
+            client.closed.set()
+        self.server.close()
+        await self.server.wait_closed()
+
+        return [client.report(self.ticks, self.seconds) for client in clients]
+
+    async def collect(self, client: Client, timestamp: int, sent: float) -> Dict[str, List[Order]]:
+        """Orders of a client for the tick at ``timestamp``, or none if it
+        does not answer in time."""
+        while True:
+            remaining = sent + self.deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                line = await asyncio.wait_for(client.reader.readline(), remaining)
+            except asyncio.TimeoutError:
+                client.timeouts += 1
+                return {}
+
+            if not line:
+                print(f"{client.name} disconnected")
+                client.connected = False
+                return {}
+            answer_timestamp, orders = json.loads(line)
+            if answer_timestamp != timestamp:
+                # Late answer to a previous tick
+                continue
+
+            client.latencies.append(time.perf_counter() - sent)
+            return {
+                symbol: [Order(symbol, price, quantity) for price, quantity in symbol_orders]
+                for symbol, symbol_orders in orders.items()
+            }
+
+
+def run_client(trader_module: str, host: str, port: int, name: Optional[str] = None, quiet: bool = True) -> int:
+    """Connects a ``Trader`` to a server and answers every tick.
+
+    Returns:
+        int: number of ticks answered
+    """
+    ticks = 0
+
+    with socket.create_connection((host, port)) as connection, connection.makefile("rb") as stream:
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        with open(os.devnull, "w") as devnull:
+            redirect = contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()
+            with redirect:
+                trader = importlib.import_module(trader_module).Trader()
+                connection.sendall((json.dumps({"name": name or f"{trader_module}-{os.getpid()}"}) + "\n").encode())
+                for line in stream:
+                    if line.startswith(b"{"):
+                        # {"done": true}
+                        break
+                    state, _ = decode_tick(line)
+                    orders = trader.run(state) or {}
+                    connection.sendall((json.dumps([
+                        state.timestamp,
+                        {
+                            symbol: [[order.price, order.quantity] for order in symbol_orders]
+                            for symbol, symbol_orders in orders.items()
+                        },
+                    ], separators=(",", ":")) + "\n").encode())
+                    ticks += 1
+
+    return ticks
+
+
+async def serve(
+        states: Iterable[TradingState],
+        clients: int,
+        spawn: List[str],
+        host: str,
+        port: int,
+        deadline: float
+    ) -> List[Dict[str, object]]:
+    """Runs a server, with one client process per module of ``spawn`` on
+    top of ``clients`` external ones."""
+    server = BacktestServer(states, clients + len(spawn), host, port, deadline)
+    port = await server.start()
+    print(f"Listening on {host}:{port}")
+
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "backtest.server", "client",
+            "--trader", trader_module, "--host", host, "--port", str(port),
+            "--name", f"{trader_module}#{index}",
+        )
+        for index, trader_module in enumerate(spawn)
+    ]
+    reports = await server.run()
+    for process in processes:
+        await process.wait()
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="stream a day to the connected traders")
+    serve_parser.add_argument("prices", nargs="?", help="prices_round_*.csv file to stream")
+    serve_parser.add_argument("--trades", help="trades_round_*.csv file of the same day")
+    serve_parser.add_argument("--recording", help="backtest.replay recording to stream instead of a day")
+    serve_parser.add_argument("--clients", type=int, default=0, help="external clients to wait for")
+    serve_parser.add_argument("--spawn", nargs="+", default=[], help="modules defining Trader to run as clients")
+    serve_parser.add_argument("--host", default=HOST)
+    serve_parser.add_argument("--port", type=int, default=0)
+    serve_parser.add_argument("--deadline", type=float, default=DEADLINE, help="seconds to answer a tick")
+    serve_parser.add_argument("-o", "--output", help="JSON file of the report")
+
+    client_parser = commands.add_parser("client", help="connect a trader to a server")
+    client_parser.add_argument("--trader", default="round5_trader", help="module defining Trader")
+    client_parser.add_argument("--host", default=HOST)
+    client_parser.add_argument("--port", type=int, required=True)
+    client_parser.add_argument("--name", help="name in the report")
+    client_parser.add_argument("--verbose", action="store_true", help="show the trader's logs")
+
+    args = parser.parse_args()
+
+    if args.command == "client":
+        run_client(args.trader, args.host, args.port, args.name, quiet=not args.verbose)
+        return
+
+    if args.recording:
+        states = (state for state, _ in read_recording(args.recording))
+    elif args.prices:
+        states = load_day(args.prices, args.trades)
+    else:
+        parser.error("serve needs a prices file or --recording")
+    if not args.clients and not args.spawn:
+        parser.error("serve needs --clients or --spawn")
+
+    reports = asyncio.run(serve(states, args.clients, args.spawn, args.host, args.port, args.deadline))
+
+    for report in reports:
+        latency = "  ".join(
+            f"{name} {report[f'{name}_ms']:7.3f}" if report[f"{name}_ms"] is not None else f"{name}       -"
+            for name in ("p50", "p99", "max")
+        )
+        print(
+            f"{report['name']:<22} {report['answered']:>7}/{report['ticks']} ticks  {latency} ms  "
+            f"timeouts {report['timeouts']:>4}  {report['ticks_per_second']:>9.0f} ticks/s  PnL {report['pnl']:>10.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(reports, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Seeded synthetic market, for load and stress tests far beyond the size of
+the competition days.
+
+Every series is generated many ticks at once with NumPy:
+
+* random walks for the products without structure
+* PINA_COLADAS cointegrated with COCONUTS, ``beta * COCONUTS`` plus a mean
+  reverting noise
+* PICNIC_BASKET priced at its components plus a premium and a mean
+  reverting mispricing
+* BERRIES with a daily seasonal cycle peaking at midday
+* DOLPHIN_SIGHTINGS with rare jumps, which DIVING_GEAR follows after a lag
+* multi-level books around each mid price, and market trades between named
+  bots
+
+The arrays are turned into ``TradingState`` objects lazily by ``states``,
+or written as IMC ``prices``/``trades`` CSVs by ``write_csv``.
+
+The arrays of all ten products are generated at about half a million ticks
+per second. Building the states is much slower, about 15k ticks per second,
+as every tick needs an ``OrderDepth`` and two dicts per product; that is
+still faster than the backtester consumes them. Scale tests of the market
+data alone should work on the arrays of ``generate``.
+
+Usage:
+    python -m backtest.synthetic --ticks 1000000 --seed 1 -o data/synthetic
+"""
+import argparse
+import math
+import os
+from typing import Dict, Iterator, List, TextIO
+
+import numpy as np
+
+from datamodel import Listing, OrderDepth, Trade, TradingState
+
+START_PRICES = {
+    "PEARLS": 10_000,
+    "BANANAS": 5_000,
+    "COCONUTS": 8_000,
+    "PINA_COLADAS": 15_000,
+    "BERRIES": 3_900,
+    "DIVING_GEAR": 99_000,
+    "PICNIC_BASKET": 73_000,
+    "UKULELE": 21_000,
+    "DIP": 7_000,
+    "BAGUETTE": 12_000
+}
+
+# Standard deviation of the mid price changes per tick
+VOLATILITIES = {
+    "PEARLS": 0.0,
+    "BANANAS": 1.4,
+    "COCONUTS": 1.8,
+    "PINA_COLADAS": 0.0,
+    "BERRIES": 1.2,
+    "DIVING_GEAR": 6.0,
+    "PICNIC_BASKET": 0.0,
+    "UKULELE": 2.9,
+    "DIP": 1.7,
+    "BAGUETTE": 2.2
+}
+
+OBSERVATIONS = ["DOLPHIN_SIGHTINGS"]
+
+BOTS = ["Olivia", "Peter", "Caesar", "Paris", "Vinnie", "Charlie", "Pablo", "Penelope"]
+
+TICK = 100
+DAY_LENGTH = 1_000_000
+
+PRICE_COLUMNS = [
+    "day", "timestamp", "product",
+    "bid_price_1", "bid_volume_1", "bid_price_2", "bid_volume_2", "bid_price_3", "bid_volume_3",
+    "ask_price_1", "ask_volume_1", "ask_price_2", "ask_volume_2", "ask_price_3", "ask_volume_3",
+    "mid_price", "profit_and_loss"
+]
+
+TRADE_COLUMNS = ["timestamp", "buyer", "seller", "symbol", "currency", "price", "quantity"]
+
+
+def ar1(shocks: np.ndarray, rho: float, start: float = 0.0) -> np.ndarray:
+    """Vectorized ``x[t] = rho * x[t-1] + shocks[t]``.
+
+    Within a block, ``x[j] = rho^j * (rho * x[-1] + cumsum(shocks * rho^-k))``.
+    Blocks are short enough for ``rho^-k`` to stay far from overflowing.
+    """
+    if rho == 1.0:
+        return start + np.cumsum(shocks)
+
+    block = int(max(1, min(4096, 30 / -math.log(rho)))) if 0 < rho < 1 else 1
+    powers = rho ** np.arange(block)
+    inverse_powers = 1 / powers if 0 < rho < 1 else powers
+
+    values = np.empty(len(shocks))
+    last = start
+    for begin in range(0, len(shocks), block):
+        chunk = shocks[begin:begin + block]
+        size = len(chunk)
+        if block == 1:
+            last = rho * last + chunk[0]
+            values[begin] = last
+            continue
+        block_values = powers[:size] * (rho * last + np.cumsum(chunk * inverse_powers[:size]))
+        values[begin:begin + size] = block_values
+        last = block_values[-1]
+    return values
+
+
+class MarketData:
+    """Arrays of a synthetic run. Books are ``(ticks, products, levels)``,
+    trades are indexed by ``(tick, product)`` pairs."""
+
+    def __init__(
+            self,
+            products: List[str],
+            timestamps: np.ndarray,
+            mid_prices: np.ndarray,
+            bid_prices: np.ndarray,
+            bid_volumes: np.ndarray,
+            ask_prices: np.ndarray,
+            ask_volumes: np.ndarray,
+            observations: Dict[str, np.ndarray],
+            trade_ticks: np.ndarray,
+            trade_products: np.ndarray,
+            trade_prices: np.ndarray,
+            trade_quantities: np.ndarray,
+            trade_buyers: np.ndarray,
+            trade_sellers: np.ndarray
+        ) -> None:
+        self.products = products
+        self.timestamps = timestamps
+        self.mid_prices = mid_prices
+        self.bid_prices = bid_prices
+        self.bid_volumes = bid_volumes
+        self.ask_prices = ask_prices
+        self.ask_volumes = ask_volumes
+        self.observations = observations
+        self.trade_ticks = trade_ticks
+        self.trade_products = trade_products
+        self.trade_prices = trade_prices
+        self.trade_quantities = trade_quantities
+        self.trade_buyers = trade_buyers
+        self.trade_sellers = trade_sellers
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class SyntheticMarket:
+    """Generator of synthetic market data.
+
+    Args:
+        seed (int): seed of the generator
+        levels (int): levels on each side of the books
+        pair_beta (float): PINA_COLADAS units per COCONUTS unit
+        pair_noise (float): standard deviation of the pair's noise shocks
+        basket_premium (float): mean premium of PICNIC_BASKET over its parts
+        basket_noise (float): standard deviation of the mispricing shocks
+        mean_reversion (float): AR(1) coefficient of the pair noise and of
+            the basket mispricing
+        berries_amplitude (float): height of the BERRIES daily cycle
+        dolphin_jump_probability (float): probability of a jump per tick
+        dolphin_jump_size (float): standard deviation of the jumps
+        diving_gear_beta (float): DIVING_GEAR move per dolphin sighting
+        diving_gear_lag (int): ticks before DIVING_GEAR follows the dolphins
+        trade_probability (float): probability of a market trade per tick
+            and product
+    """
+
+    def __init__(
+            self,
+            seed: int = 0,
+            levels: int = 3,
+            pair_beta: float = 1.875,
+            pair_noise: float = 6.0,
+            basket_premium: float = 400.0,
+            basket_noise: float = 25.0,
+            mean_reversion: float = 0.97,
+            berries_amplitude: float = 150.0,
+            dolphin_jump_probability: float = 0.002,
+            dolphin_jump_size: float = 40.0,
+            diving_gear_beta: float = 30.0,
+            diving_gear_lag: int = 5,
+            trade_probability: float = 0.1
+        ) -> None:
+        self.seed = seed
+        self.levels = levels
+        self.pair_beta = pair_beta
+        self.pair_noise = pair_noise
+        self.basket_premium = basket_premium
+        self.basket_noise = basket_noise
+        self.mean_reversion = mean_reversion
+        self.berries_amplitude = berries_amplitude
+        self.dolphin_jump_probability = dolphin_jump_probability
+        self.dolphin_jump_size = dolphin_jump_size
+        self.diving_gear_beta = diving_gear_beta
+        self.diving_gear_lag = diving_gear_lag
+        self.trade_probability = trade_probability
+        self.products = list(START_PRICES)
+        self.reset()
+
+    def reset(self) -> None:
+        """Restarts the run from its first tick."""
+        self.rng = np.random.default_rng(self.seed)
+        self.tick = 0
+        self.walks = np.array([START_PRICES[product] for product in self.products], dtype=float)
+        self.dolphins = np.full(max(self.diving_gear_lag, 1), 3_050.0)
+        self.pair_noise_last = 0.0
+        self.mispricing_last = 0.0
+
+    def generate(self, ticks: int) -> MarketData:
+        """Arrays of the next ``ticks`` ticks of the run. Successive calls
+        continue the same run."""
+        rng = self.rng
+        products = self.products
+        index = {product: column for column, product in enumerate(products)}
+        timestamps = (self.tick + np.arange(ticks, dtype=np.int64)) * TICK
+        self.tick += ticks
+
+        volatilities = np.array([VOLATILITIES[product] for product in products])
+        mid_prices = self.walks + np.cumsum(rng.standard_normal((ticks, len(products))) * volatilities, axis=0)
+        self.walks = mid_prices[-1].copy()
+
+        # Dolphins jump from time to time and diving gear follows them
+        jumps = rng.standard_normal(ticks) * self.dolphin_jump_size * (rng.random(ticks) < self.dolphin_jump_probability)
+        dolphins = self.dolphins[-1] + np.cumsum(jumps + rng.standard_normal(ticks))
+        history = np.concatenate([self.dolphins, dolphins])
+        lagged = history[len(self.dolphins) - self.diving_gear_lag:][:ticks]
+        self.dolphins = history[-len(self.dolphins):]
+        mid_prices[:, index["DIVING_GEAR"]] += self.diving_gear_beta * (lagged - 3_050)
+
+        # Daily cycle of berries, lowest at the open and the close
+        day_fraction = (timestamps % DAY_LENGTH) / DAY_LENGTH
+        mid_prices[:, index["BERRIES"]] += self.berries_amplitude * np.sin(np.pi * day_fraction)
+
+        pair_noise = ar1(rng.standard_normal(ticks) * self.pair_noise, self.mean_reversion, self.pair_noise_last)
+        self.pair_noise_last = pair_noise[-1]
+        mid_prices[:, index["PINA_COLADAS"]] = self.pair_beta * mid_prices[:, index["COCONUTS"]] + pair_noise
+
+        mispricing = ar1(rng.standard_normal(ticks) * self.basket_noise, self.mean_reversion, self.mispricing_last)
+        self.mispricing_last = mispricing[-1]
+        mid_prices[:, index["PICNIC_BASKET"]] = (
+            mid_prices[:, index["UKULELE"]]
+            + 2 * mid_prices[:, index["BAGUETTE"]]
+            + 4 * mid_prices[:, index["DIP"]]
+            + self.basket_premium
+            + mispricing
+        )
+
+        # Books: 1 to 3 ticks wide, one tick between levels
+        half_spreads = rng.integers(1, 4, (ticks, len(products)), dtype=np.uint8) / 2
+        best_bids = np.floor(mid_prices - half_spreads).astype(np.int32)
+        best_asks = np.maximum(np.ceil(mid_prices + half_spreads).astype(np.int32), best_bids + 1)
+        steps = np.arange(self.levels, dtype=np.int32)
+        bid_prices = best_bids[:, :, None] - steps
+        ask_prices = best_asks[:, :, None] + steps
+        bid_volumes = rng.integers(1, 31, (ticks, len(products), self.levels), dtype=np.int16)
+        ask_volumes = rng.integers(1, 31, (ticks, len(products), self.levels), dtype=np.int16)
+
+        # Market trades at the touch between two different bots
+        trade_ticks, trade_products = np.nonzero(rng.random((ticks, len(products)), dtype=np.float32) < self.trade_probability)
+        count = len(trade_ticks)
+        at_ask = rng.random(count) < 0.5
+        trade_prices = np.where(
+            at_ask,
+            best_asks[trade_ticks, trade_products],
+            best_bids[trade_ticks, trade_products]
+        )
+        trade_buyers = rng.integers(0, len(BOTS), count)
+        trade_sellers = (trade_buyers + rng.integers(1, len(BOTS), count)) % len(BOTS)
+
+        return MarketData(
+            products,
+            timestamps,
+            (best_bids + best_asks) / 2,
+            bid_prices,
+            bid_volumes,
+            ask_prices,
+            ask_volumes,
+            {"DOLPHIN_SIGHTINGS": np.rint(dolphins).astype(np.int64)},
+            trade_ticks,
+            trade_products,
+            trade_prices,
+            rng.integers(1, 6, count, dtype=np.int16),
+            trade_buyers,
+            trade_sellers
+        )
+
+    def states(self, ticks: int, chunk: int = 100_000) -> Iterator[TradingState]:
+        """``TradingState`` of the next ``ticks`` ticks, generated ``chunk``
+        ticks at a time so that memory stays bounded. Positions and own
+        trades are left empty for the backtester to fill."""
+        listings = {product: Listing(product, product, "SEASHELLS") for product in self.products}
+        for begin in range(0, ticks, chunk):
+            yield from _to_states(self.generate(min(chunk, ticks - begin)), listings)
+
+    def write_csv(self, ticks: int, prices_path: str, trades_path: str, day: int = 0, chunk: int = 100_000) -> None:
+        """Writes the next ``ticks`` ticks as IMC ``prices`` and ``trades``
+        CSVs, readable by ``backtest.data.load_day``."""
+        with open(prices_path, "w") as prices_file, open(trades_path, "w") as trades_file:
+            prices_file.write(";".join(PRICE_COLUMNS) + "\n")
+            trades_file.write(";".join(TRADE_COLUMNS) + "\n")
+            for begin in range(0, ticks, chunk):
+                data = self.generate(min(chunk, ticks - begin))
+                write_prices(data, prices_file, day)
+                write_trades(data, trades_file)
+
+
+def _to_states(data: MarketData, listings: Dict[str, Listing]) -> Iterator[TradingState]:
+    products = data.products
+    timestamps = data.timestamps.tolist()
+    levels = data.bid_prices.shape[2]
+    # Price to volume dicts of each (tick, product) row, built by C loops
+    bids = map(dict, map(
+        zip, data.bid_prices.reshape(-1, levels).tolist(), data.bid_volumes.reshape(-1, levels).tolist()
+    ))
+    asks = map(dict, map(
+        zip, data.ask_prices.reshape(-1, levels).tolist(), (-data.ask_volumes).reshape(-1, levels).tolist()
+    ))
+    observations = {name: values.tolist() for name, values in data.observations.items()}
+
+    trades: Dict[int, Dict[str, List[Trade]]] = {}
+    for tick, product, price, quantity, buyer, seller in zip(
+            data.trade_ticks.tolist(),
+            data.trade_products.tolist(),
+            data.trade_prices.tolist(),
+            data.trade_quantities.tolist(),
+            data.trade_buyers.tolist(),
+            data.trade_sellers.tolist()):
+        symbol = products[product]
+        trades.setdefault(tick, {}).setdefault(symbol, []).append(
+            Trade(symbol, price, quantity, BOTS[buyer], BOTS[seller], timestamps[tick])
+        )
+
+    for tick, timestamp in enumerate(timestamps):
+        order_depths: Dict[str, OrderDepth] = {}
+        for product in products:
+            order_depth = OrderDepth()
+            order_depth.buy_orders = next(bids)
+            order_depth.sell_orders = next(asks)
+            order_depths[product] = order_depth
+
+        yield TradingState(
+            timestamp,
+            listings,
+            order_depths,
+            {},
+            trades.get(tick, {}),
+            {},
+            {name: values[tick] for name, values in observations.items()}
+        )
+
+
+def _join_columns(columns: List[np.ndarray]) -> np.ndarray:
+    lines = columns[0].astype(str)
+    for column in columns[1:]:
+        lines = np.char.add(np.char.add(lines, ";"), column.astype(str))
+    return lines
+
+
+def write_prices(data: MarketData, file: TextIO, day: int = 0) -> None:
+    """Appends the rows of ``data`` to an IMC ``prices`` CSV (at most three
+    levels are written)."""
+    ticks = len(data)
+    levels = min(data.bid_prices.shape[2], 3)
+    days = np.full(ticks, day)
+    empty = np.full(ticks, "")
+
+    for column, product in enumerate(data.products):
+        fields = [days, data.timestamps, np.full(ticks, product)]
+        for side_prices, side_volumes in ((data.bid_prices, data.bid_volumes), (data.ask_prices, data.ask_volumes)):
+            for level in range(levels):
+                fields.append(side_prices[:, column, level])
+                fields.append(side_volumes[:, column, level])
+            fields.extend([empty] * (2 * (3 - levels)))
+        fields.append(data.mid_prices[:, column])
+        fields.append(np.full(ticks, 0.0))
+        file.write("\n".join(_join_columns(fields).tolist()) + "\n")
+
+    for name, values in data.observations.items():
+        fields = [days, data.timestamps, np.full(ticks, name)] + [empty] * 12 + [values, np.full(ticks, 0.0)]
+        file.write("\n".join(_join_columns(fields).tolist()) + "\n")
+
+
+def write_trades(data: MarketData, file: TextIO) -> None:
+    """Appends the market trades of ``data`` to an IMC ``trades`` CSV."""
+    if not len(data.trade_ticks):
+        return
+
+    bots = np.array(BOTS)
+    fields = [
+        data.timestamps[data.trade_ticks],
+        bots[data.trade_buyers],
+        bots[data.trade_sellers],
+        np.array(data.products)[data.trade_products],
+        np.full(len(data.trade_ticks), "SEASHELLS"),
+        data.trade_prices,
+        data.trade_quantities,
+    ]
+    file.write("\n".join(_join_columns(fields).tolist()) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--day", type=int, default=0)
+    parser.add_argument("-o", "--output", default=".", help="directory of the CSVs")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    prices_path = os.path.join(args.output, f"prices_round_synthetic_day_{args.day}.csv")
+    trades_path = os.path.join(args.output, f"trades_round_synthetic_day_{args.day}.csv")
+    SyntheticMarket(args.seed).write_csv(args.ticks, prices_path, trades_path, args.day)
+    print(f"Wrote {args.ticks} ticks to {prices_path} and {trades_path}")
+
+
+if __name__ == "__main__":
+    main()
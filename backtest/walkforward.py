@@ -0,0 +1,252 @@
+"""Walk-forward optimization of the trader parameters over historical days.
+
+Parameters such as the pair hedge ratio, the rolling window and the spread
+entries were fitted on the days they were evaluated on. Here every day is
+in turn a test day: each point of a parameter grid is backtested on the
+days before it (all of them, or the last ``--train-days``), the point with
+the best total PnL is kept and evaluated on the test day. The sum of these
+out-of-sample PnLs is compared with that of the default parameters. Every
+day is warm-started from the day before it (``analysis.warmstart``), never
+from ``warm_start.txt``, which may hold the future of the folds.
+
+Each (point, day) backtest is shared by several folds but runs once. They
+run in a process pool, and are cached on disk (see ``backtest.cache``)
+under the hash of the trader's source code, the parameters and the
+fingerprint of the day's files, so that a rerun only backtests what
+changed.
+
+Usage:
+    python -m backtest.walkforward data/round*/prices_round_*_day_*.csv
+    python -m backtest.walkforward data/round4/prices_round_4_day_*.csv --trader round4_trader --grid window=100,200 pair_entry=1,1.5,2
+    python -m backtest.walkforward data/round5/prices_round_5_day_*.csv --train-days 1 --products COCONUTS PINA_COLADAS -o walkforward.json
+"""
+import argparse
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from analysis.warmstart import write_warm_starts
+from backtest.cache import CACHE_DIR, ResultCache, backtest_key, cached_backtest
+from benchmarks.execution import trades_path_for
+from prosperity.trader import WINDOW, TraderParams
+
+TRADER = "round5_trader"
+
+# Parameters searched by default, fields of TraderParams
+GRID = {
+    "window": [100, 200, 400],
+    "pair_entry": [1.0, 1.5, 2.0],
+    "basket_entry": [1.5, 2.0, 2.5],
+}
+
+Params = Dict[str, float]
+
+# Prices, trades and warm-start files of a day
+Day = Tuple[str, Optional[str], Optional[str]]
+
+
+class Fold:
+    """Parameters fitted on the training days and their test day.
+
+    Attributes:
+        day (str): prices file of the test day
+        train_days (List[str]): prices files of the training days
+        params (Params): best grid point on the training days
+        train_pnl (float): its total PnL over the training days
+        test_pnl (float): its PnL on the test day, out of sample
+        default_pnl (float): PnL of the default parameters on the test day
+    """
+
+    __slots__ = ("day", "train_days", "params", "train_pnl", "test_pnl", "default_pnl")
+
+    def __init__(
+            self,
+            day: str,
+            train_days: List[str],
+            params: Params,
+            train_pnl: float,
+            test_pnl: float,
+            default_pnl: float
+        ) -> None:
+        self.day = day
+        self.train_days = train_days
+        self.params = params
+        self.train_pnl = train_pnl
+        self.test_pnl = test_pnl
+        self.default_pnl = default_pnl
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def parse_value(text: str) -> float:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_grid(items: Sequence[str]) -> Dict[str, List[float]]:
+    """Grid of ``name=value,value,...`` items."""
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in TraderParams.__slots__ or not values:
+            raise ValueError(f"Expected name=value,... with a name of {TraderParams.__slots__}, got {item}")
+        grid[name] = [parse_value(value) for value in values.split(",")]
+    return grid
+
+
+def default_point(grid: Dict[str, List[float]]) -> Params:
+    """Default parameters of the fields of the grid."""
+    defaults = TraderParams().as_dict()
+    return {name: defaults[name] for name in grid}
+
+
+def grid_points(grid: Dict[str, List[float]]) -> List[Params]:
+    """Every combination of the grid values, the default parameters first."""
+    first = default_point(grid)
+    points = [first]
+    seen = {tuple(first.values())}
+    for values in itertools.product(*grid.values()):
+        if values not in seen:
+            seen.add(values)
+            points.append(dict(zip(grid, values)))
+    return points
+
+
+def final_pnl(task: Tuple[str, Params, str, Optional[str], Optional[str], Optional[ResultCache]]) -> Dict[str, float]:
+    """Final PnL per product of a trader with the given parameters on one
+    day."""
+    trader_module, params, prices_path, trades_path, warm_start, cache = task
+    return cached_backtest(trader_module, params, prices_path, trades_path, cache, warm_start=warm_start).final_pnl()
+
+
+def warm_start_days(prices_paths: Sequence[str], directory: str, window: int = WINDOW) -> List[Day]:
+    """Files of each day, with its warm start built from the previous day
+    in ``directory``."""
+    warm_starts = write_warm_starts(prices_paths, directory, window)
+    return [(path, trades_path_for(path), warm_start) for path, warm_start in zip(prices_paths, warm_starts)]
+
+
+def run_backtests(
+        trader_module: str,
+        points: List[Params],
+        days: List[Day],
+        workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None
+    ) -> Dict[Tuple[int, int], Dict[str, float]]:
+    """Final PnL per product of every (point, day), keyed by their indices.
+    Backtests found in the cache are read back instead of being run."""
+    pairs = [(i, j) for i in range(len(points)) for j in range(len(days))]
+    tasks = [(trader_module, points[i], *days[j], cache) for i, j in pairs]
+    if cache is not None:
+        pending = sum(backtest_key(*task[:4], warm_start=task[4]) not in cache for task in tasks)
+        print(f"Backtesting {pending} of {len(tasks)} (parameters, day) pairs, {len(tasks) - pending} cached")
+
+    with ProcessPoolExecutor(workers) as pool:
+        return dict(zip(pairs, pool.map(final_pnl, tasks)))
+
+
+def objective(pnl: Dict[str, float], products: Optional[Sequence[str]] = None) -> float:
+    """Final PnL summed over ``products``, all of them by default."""
+    return sum(value for product, value in pnl.items() if products is None or product in products)
+
+
+def walk_forward(
+        prices_paths: Sequence[str],
+        trader_module: str = TRADER,
+        grid: Optional[Dict[str, List[float]]] = None,
+        train_days: Optional[int] = None,
+        products: Optional[Sequence[str]] = None,
+        workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None
+    ) -> List[Fold]:
+    """Folds of the walk-forward optimization, one per day after the first.
+
+    Args:
+        prices_paths (Sequence[str]): ``prices_round_*`` files, in
+            chronological order. The trades file of each day is used when
+            it exists.
+        trader_module (str): module defining ``Trader``
+        grid (Optional[Dict[str, List[float]]]): values of the
+            ``TraderParams`` fields searched, ``GRID`` by default
+        train_days (Optional[int]): number of previous days fitted on, all
+            of them if None
+        products (Optional[Sequence[str]]): products whose PnL is
+            optimized, all of them by default
+        workers (Optional[int]): processes of the pool, all cores by default
+        cache (Optional[ResultCache]): cache of the backtests
+
+    Returns:
+        List[Fold]: folds in the order of the test days
+    """
+    grid = GRID if grid is None else grid
+    points = grid_points(grid)
+    # Long enough for the largest window searched
+    window = int(max([WINDOW, *grid.get("window", [])]))
+    with tempfile.TemporaryDirectory() as directory:
+        days = warm_start_days(prices_paths, directory, window)
+        results = run_backtests(trader_module, points, days, workers, cache)
+
+    folds = []
+    for test in range(1, len(days)):
+        train = range(max(test - train_days, 0) if train_days else 0, test)
+        scores = [sum(objective(results[i, day], products) for day in train) for i in range(len(points))]
+        best = max(range(len(points)), key=lambda i: scores[i])
+        folds.append(Fold(
+            prices_paths[test],
+            [prices_paths[day] for day in train],
+            points[best],
+            scores[best],
+            objective(results[best, test], products),
+            objective(results[0, test], products),
+        ))
+    return folds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files, in chronological order")
+    parser.add_argument("--trader", default=TRADER, help="module defining Trader")
+    parser.add_argument("--grid", nargs="+", help="name=value,value,... for each TraderParams field searched")
+    parser.add_argument("--train-days", type=int, help="previous days fitted on, all by default")
+    parser.add_argument("--products", nargs="+", help="products whose PnL is optimized, all by default")
+    parser.add_argument("--workers", type=int, help="processes, all cores by default")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the cached backtests")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the cache")
+    parser.add_argument("-o", "--output", help="JSON file of the folds")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.grid) if args.grid else None
+    except ValueError as e:
+        parser.error(str(e))
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    folds = walk_forward(args.prices, args.trader, grid, args.train_days, args.products, args.workers, cache)
+    if not folds:
+        print("Walk-forward needs at least two days")
+        return
+
+    for fold in folds:
+        params = ", ".join(f"{name}={value}" for name, value in fold.params.items())
+        print(
+            f"{os.path.basename(fold.day):<28} train {len(fold.train_days)} days {fold.train_pnl:>12.1f}  "
+            f"test {fold.test_pnl:>10.1f}  default {fold.default_pnl:>10.1f}  {params}"
+        )
+    print(
+        f"Out of sample PnL {sum(fold.test_pnl for fold in folds):.1f}, "
+        f"default parameters {sum(fold.default_pnl for fold in folds):.1f}"
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([fold.as_dict() for fold in folds], file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Replay benchmark of depth-aware execution against sweep orders.
+
+Every day is replayed twice with the same trader, once sweeping the legs of
+the pair and basket trades (the original behaviour) and once walking the
+books. Spread capture is the signed distance of every fill to the mid price,
+positive when buying below or selling above the mid.
+
+Usage:
+    python -m benchmarks.execution data/round4/prices_round_4_day_*.csv
+"""
+import argparse
+import importlib
+import os
+import time
+from typing import Dict, List, Optional
+
+from backtest.data import load_day
+from backtest.engine import Backtester, BacktestResult
+
+# Legs of every group and the leg whose position defines the group's units
+GROUPS = {
+    "PAIR": ({"COCONUTS": -1, "PINA_COLADAS": 1}, "PINA_COLADAS"),
+    "BASKET": ({"PICNIC_BASKET": 1, "UKULELE": -1, "DIP": -4, "BAGUETTE": -2}, "PICNIC_BASKET"),
+}
+
+
+def trades_path_for(prices_path: str) -> Optional[str]:
+    trades_path = prices_path.replace("prices_", "trades_")
+    return trades_path if trades_path != prices_path and os.path.exists(trades_path) else None
+
+
+def group_report(result: BacktestResult, legs: Dict[str, int], anchor: str) -> Dict[str, float]:
+    fills = [fill for fill in result.fills if fill.symbol in legs]
+    capture = sum(
+        (fill.mid_price - fill.price) * fill.quantity
+        for fill in fills if fill.mid_price is not None
+    )
+    volume = sum(abs(fill.quantity) for fill in fills)
+
+    imbalance = 0.0
+    if anchor in result.positions:
+        for tick, anchor_position in enumerate(result.positions[anchor]):
+            units = anchor_position / legs[anchor]
+            imbalance += sum(
+                abs(result.positions[symbol][tick] - weight * units)
+                for symbol, weight in legs.items() if symbol in result.positions
+            )
+        imbalance /= max(len(result.timestamps), 1)
+
+    final_pnl = result.final_pnl()
+    return {
+        "pnl": sum(final_pnl.get(symbol, 0) for symbol in legs),
+        "fills": len(fills),
+        "volume": volume,
+        "capture": capture,
+        "capture_per_unit": capture / volume if volume else 0.0,
+        "mean_imbalance": imbalance,
+    }
+
+
+def replay(trader_module: str, states_per_day: List[list], depth_aware: bool) -> Dict[str, Dict[str, float]]:
+    module = importlib.import_module(trader_module)
+    totals: Dict[str, Dict[str, float]] = {}
+    elapsed = 0.0
+
+    for states in states_per_day:
+        trader = module.Trader()
+        trader.depth_aware_execution = depth_aware
+        start = time.perf_counter()
+        result = Backtester(trader).run(states)
+        elapsed += time.perf_counter() - start
+
+        for group, (legs, anchor) in GROUPS.items():
+            report = group_report(result, legs, anchor)
+            group_totals = totals.setdefault(group, {})
+            for key, value in report.items():
+                group_totals[key] = group_totals.get(key, 0) + value
+
+    for group_totals in totals.values():
+        group_totals["mean_imbalance"] /= len(states_per_day)
+        volume = group_totals["volume"]
+        group_totals["capture_per_unit"] = group_totals["capture"] / volume if volume else 0.0
+    totals["_"] = {"seconds": elapsed}
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="+", help="prices_round_*.csv files to replay")
+    parser.add_argument("--trader", default="round5_trader", help="module defining Trader")
+    args = parser.parse_args()
+
+    states_per_day = [load_day(path, trades_path_for(path)) for path in args.prices]
+
+    for name, depth_aware in (("sweep", False), ("depth-aware", True)):
+        totals = replay(args.trader, states_per_day, depth_aware)
+        print(f"== {name} ({totals.pop('_')['seconds']:.1f}s)")
+        for group, report in totals.items():
+            print(
+                f"{group:<8} pnl {report['pnl']:>12.1f}  fills {report['fills']:>6.0f}  "
+                f"volume {report['volume']:>7.0f}  capture {report['capture']:>10.1f}  "
+                f"capture/unit {report['capture_per_unit']:>7.3f}  imbalance {report['mean_imbalance']:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Per tick latency of ``Trader.run`` over long histories.
+
+Drives the trader of every round through synthetic (``backtest.synthetic``)
+or recorded market data for increasing numbers of ticks, and reports:
+
+* per tick latency percentiles of ``Trader.run``
+* the scaling curve, i.e. the mean latency over each tenth of the run. It is
+  flat when the cost of a tick does not depend on the length of the
+  history, and grows when it does (as with the former ``pd.concat``
+  histories).
+* peak traced memory (tracemalloc) and net allocated blocks per tick, in a
+  second, traced run of at most ``--memory-ticks`` ticks. The peak includes
+  the chunks of market data being streamed to the trader.
+* with ``--allocations``, the allocations of every strategy per tick
+  (``prosperity.allocations``) in a third run, failing with status 1 when
+  they grow with the length of the run.
+
+Orders are matched by the ``Backtester``, so that positions move as in a
+real run. Results are saved as JSON to compare commits.
+
+Usage:
+    python -m benchmarks.latency --ticks 1000 10000 100000 1000000 -o latency.json
+    python -m benchmarks.latency --prices data/round4/prices_round_4_day_*.csv --traders round4_trader
+    python -m benchmarks.latency --compare latency_before.json latency.json
+    python -m benchmarks.latency --ticks 20000 --allocations --block-budget 50
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from datamodel import TradingState
+
+from backtest.data import load_day
+from backtest.engine import Backtester, BacktestResult
+from backtest.synthetic import SyntheticMarket
+from benchmarks.execution import trades_path_for
+from prosperity.allocations import AllocationGrowthError, AllocationMonitor
+
+TRADERS = ["round1_trader", "round2_trader", "round3_trader", "round4_trader", "round5_trader"]
+
+TICKS = [1_000, 10_000, 100_000, 1_000_000]
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999), ("max", 1.0))
+
+SEGMENTS = 10
+
+
+def recorded_states(days: List[List[TradingState]], ticks: int) -> Iterator[TradingState]:
+    """States of the given days, replayed one after the other and from the
+    start again until ``ticks`` states were produced. Timestamps keep
+    increasing across days."""
+    offset = 0
+    produced = 0
+    while True:
+        for states in days:
+            for state in states:
+                if produced == ticks:
+                    return
+                yield TradingState(
+                    state.timestamp + offset,
+                    state.listings,
+                    state.order_depths,
+                    {},
+                    state.market_trades,
+                    {},
+                    state.observations
+                )
+                produced += 1
+            offset += states[-1].timestamp + 100 if states else 0
+
+
+class StreamResult(BacktestResult):
+    """Backtest result keeping only the last tick, so that memory does not
+    grow with the number of ticks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timestamps = deque(maxlen=1)
+        self.fills = deque(maxlen=1)
+
+    def record(self, product: str, pnl: float, position: int, mid_price: Optional[float]) -> None:
+        pass
+
+
+class TimedTrader:
+    """Trader wrapper timing every call to ``run``."""
+
+    def __init__(self, trader, latencies: array) -> None:
+        self.trader = trader
+        self.latencies = latencies
+
+    def run(self, state: TradingState):
+        start = time.perf_counter()
+        orders = self.trader.run(state)
+        self.latencies.append(time.perf_counter() - start)
+        return orders
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def measure_latency(trader_module: str, states: Iterator[TradingState]) -> Dict[str, object]:
+    latencies = array("d")
+    result = StreamResult()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        trader = importlib.import_module(trader_module).Trader()
+        backtester = Backtester(TimedTrader(trader, latencies))
+        start = time.perf_counter()
+        for state in states:
+            backtester.step(state, result)
+    elapsed = time.perf_counter() - start
+
+    ticks = len(latencies)
+    segment = max(ticks // SEGMENTS, 1)
+    scaling = [
+        sum(latencies[begin:begin + segment]) / len(latencies[begin:begin + segment]) * 1e6
+        for begin in range(0, segment * SEGMENTS, segment) if begin < ticks
+    ]
+    ordered = sorted(latencies)
+    report: Dict[str, object] = {
+        f"{name}_us": percentile(ordered, q) * 1e6 for name, q in PERCENTILES
+    }
+    report["mean_us"] = sum(latencies) / ticks * 1e6
+    report["scaling_us"] = scaling
+    report["growth"] = scaling[-1] / scaling[0] if scaling[0] else None
+    report["seconds"] = elapsed
+    return report
+
+
+def measure_memory(trader_module: str, states: Iterator[TradingState]) -> Dict[str, float]:
+    result = StreamResult()
+    ticks = 0
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        backtester = Backtester(importlib.import_module(trader_module).Trader())
+        tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        for state in states:
+            backtester.step(state, result)
+            ticks += 1
+        blocks = sys.getallocatedblocks() - blocks
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "memory_ticks": ticks,
+        "peak_memory_kb": peak / 1024,
+        "net_blocks_per_tick": blocks / ticks if ticks else 0.0,
+    }
+
+
+def measure_allocations(
+        trader_module: str,
+        states: Iterator[TradingState],
+        block_budget: Optional[int] = None,
+        byte_budget: Optional[int] = None
+    ) -> Dict[str, object]:
+    """Traced run with an ``AllocationMonitor``: allocations of every
+    strategy and whether they grow with the length of the run."""
+    monitor = AllocationMonitor(block_budget, byte_budget, traced=True)
+    error = None
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        backtester = Backtester(importlib.import_module(trader_module).Trader(), allocations=monitor)
+        try:
+            backtester.run(states)
+        except AllocationGrowthError as e:
+            error = str(e)
+
+    return {
+        "allocations": {
+            name: dict(report, **monitor.growth(name)) for name, report in monitor.report().items()
+        },
+        "allocation_error": error,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as file:
+        before = {(row["trader"], row["ticks"]): row for row in json.load(file)["results"]}
+    with open(after_path) as file:
+        after = json.load(file)["results"]
+
+    for row in after:
+        old = before.get((row["trader"], row["ticks"]))
+        if old is None:
+            continue
+        print(
+            f"{row['trader']:<14} {row['ticks']:>8} ticks  "
+            f"p50 {old['p50_us']:9.1f} -> {row['p50_us']:9.1f} us  "
+            f"p99 {old['p99_us']:9.1f} -> {row['p99_us']:9.1f} us  "
+            f"x{old['mean_us'] / row['mean_us']:.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, nargs="+", default=TICKS, help="lengths of the runs")
+    parser.add_argument("--traders", nargs="+", default=TRADERS, help="modules defining Trader")
+    parser.add_argument("--prices", nargs="+", help="prices_round_*.csv files to replay instead of synthetic data")
+    parser.add_argument("--memory-ticks", type=int, default=100_000, help="longest traced run")
+    parser.add_argument("--allocations", action="store_true", help="check the allocations of every strategy")
+    parser.add_argument("--block-budget", type=int, help="net blocks a strategy may keep per tick")
+    parser.add_argument("--byte-budget", type=int, help="peak bytes a strategy may allocate per tick")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="JSON file of the results")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two JSON results")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    days = [load_day(path, trades_path_for(path)) for path in args.prices or []]
+
+    def states(ticks: int) -> Iterator[TradingState]:
+        if days:
+            return recorded_states(days, ticks)
+        return SyntheticMarket(args.seed).states(ticks, chunk=10_000)
+
+    results = []
+    failed = False
+    for trader_module in args.traders:
+        for ticks in args.ticks:
+            report = {"trader": trader_module, "ticks": ticks}
+            report.update(measure_latency(trader_module, states(ticks)))
+            report.update(measure_memory(trader_module, states(min(ticks, args.memory_ticks))))
+            results.append(report)
+
+            print(
+                f"{trader_module:<14} {ticks:>8} ticks  "
+                + "  ".join(f"{name} {report[f'{name}_us']:8.1f}" for name, _ in PERCENTILES)
+                + f" us  growth x{report['growth']:.2f}"
+                + f"  peak {report['peak_memory_kb']:8.0f} kB  blocks/tick {report['net_blocks_per_tick']:.2f}"
+            )
+
+            if args.allocations:
+                report.update(measure_allocations(
+                    trader_module, states(min(ticks, args.memory_ticks)), args.block_budget, args.byte_budget
+                ))
+                for name, allocations in report["allocations"].items():
+                    print(
+                        f"    {name:<22} blocks {allocations['mean_blocks']:6.1f} (max {allocations['max_blocks']:>4})  "
+                        f"peak {allocations['mean_peak_bytes']:8.0f} B (max {allocations['max_peak_bytes']:>7})  "
+                        f"growth {allocations['blocks']:+6.1f} blocks {allocations['peak_bytes']:+8.0f} B  "
+                        f"over budget {allocations['over_budget']}"
+                    )
+                if report["allocation_error"]:
+                    print(f"    Allocations grow with the run: {report['allocation_error']}")
+                    failed = True
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "source": "prices" if args.prices else "synthetic",
+                "results": results,
+            }, file, indent=1)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Latency of the quote engine.
+
+Quotes every product on random three-level books and reports the time spent
+per tick, all products included.
+
+Usage:
+    python -m benchmarks.quoting --ticks 100000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from datamodel import OrderDepth
+from prosperity.quoting import QuoteParams, make_quotes
+
+FAIR_VALUES = {
+    "PEARLS": 10_000,
+    "BANANAS": 5_000,
+    "COCONUTS": 8_000,
+    "PINA_COLADAS": 15_000,
+    "BERRIES": 3_900,
+    "DIVING_GEAR": 99_000,
+    "PICNIC_BASKET": 73_000,
+    "UKULELE": 21_000,
+    "DIP": 7_000,
+    "BAGUETTE": 12_000
+}
+
+LIMIT = 20
+
+
+def random_book(rng: random.Random, fair_value: int) -> OrderDepth:
+    order_depth = OrderDepth()
+    best_bid = fair_value - rng.randint(-1, 3)
+    best_ask = max(best_bid + 1, fair_value + rng.randint(-1, 3))
+    for level in range(3):
+        order_depth.buy_orders[best_bid - level] = rng.randint(1, 30)
+        order_depth.sell_orders[best_ask + level] = -rng.randint(1, 30)
+    return order_depth
+
+
+def percentile(values: List[float], q: float) -> float:
+    return sorted(values)[min(int(q * len(values)), len(values) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--levels", type=int, default=3, help="quotes on each side")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    params = QuoteParams(edge=1, skew=2, levels=args.levels)
+    books = [
+        {product: random_book(rng, fair_value) for product, fair_value in FAIR_VALUES.items()}
+        for _ in range(min(args.ticks, 1_000))
+    ]
+
+    latencies = []
+    for tick in range(args.ticks):
+        tick_books = books[tick % len(books)]
+        position = rng.randint(-LIMIT, LIMIT)
+        start = time.perf_counter()
+        for product, fair_value in FAIR_VALUES.items():
+            make_quotes(product, fair_value, position, LIMIT, tick_books[product], params)
+        latencies.append(time.perf_counter() - start)
+
+    print(f"{len(FAIR_VALUES)} products, {args.ticks} ticks, {args.levels} levels per side")
+    for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)):
+        print(f"{name:>4} {percentile(latencies, q) * 1e6:8.1f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
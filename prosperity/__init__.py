@@ -0,0 +1,5 @@
+"""Building blocks shared by the round traders.
+
+Only the standard library, NumPy and ``datamodel`` may be imported from this
+package, so that everything in here can run inside the exchange sandbox.
+"""
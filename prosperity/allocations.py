@@ -0,0 +1,218 @@
+"""Per tick allocation accounting of the strategies, a debug mode of the trader.
+
+When ``Trader.allocations`` is set to an ``AllocationMonitor``, every call
+to ``Trader.run`` and every strategy inside it are measured:
+
+* the net number of memory blocks they leave allocated
+  (``sys.getallocatedblocks``), which grows when a strategy keeps objects
+  from one tick to the next, as an unbounded history does;
+* with ``traced`` set, the peak number of bytes allocated while they run
+  (``tracemalloc``), which grows when a strategy copies its history on
+  every tick, as ``pd.concat`` of a series does.
+
+Strategies over the budget on a tick are printed in the trader's logs and
+counted. ``check`` raises an ``AllocationGrowthError`` when, once warmed
+up, the allocations of a tick keep growing with the length of the run: a
+bounded history costs the same on every tick, a copied one more and more.
+The growth of the net blocks is only checked for the whole run, as those of
+a strategy include the orders it returns, which outlive it and vary with the
+positions it trades. Strategies are judged on their peak bytes. The orders
+of the run are packed into a string by ``pack_orders`` before its blocks
+are counted, and rebuilt by ``unpack_orders`` after, so that they are not
+counted either.
+"""
+import json
+import sys
+import tracemalloc
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from datamodel import Order
+
+# Name under which the whole call to Trader.run is recorded
+RUN = "run"
+
+# Ticks ignored by the growth check, while rolling windows fill up
+WARMUP_TICKS = 1_000
+
+# Largest increase of the net blocks and of the peak bytes of a tick from
+# the first to the last tenth of the steady state
+MAX_BLOCK_GROWTH = 2.0
+MAX_PEAK_GROWTH = 4_096
+
+SEGMENTS = 10
+
+
+def pack_orders(orders: Dict[str, List[Order]]) -> str:
+    """Orders as one string, whose allocation does not grow with their number."""
+    return json.dumps({
+        symbol: [[order.price, order.quantity] for order in symbol_orders]
+        for symbol, symbol_orders in orders.items()
+    })
+
+
+def unpack_orders(packed: str) -> Dict[str, List[Order]]:
+    return {
+        symbol: [Order(symbol, price, quantity) for price, quantity in symbol_orders]
+        for symbol, symbol_orders in json.loads(packed).items()
+    }
+
+
+class AllocationGrowthError(RuntimeError):
+    """Allocations of a tick grow with the length of the run."""
+
+
+class AllocationMonitor:
+    """Allocations of ``Trader.run`` and of each strategy on every tick.
+
+    Args:
+        block_budget (Optional[int]): net blocks a strategy may keep
+            allocated on one tick
+        byte_budget (Optional[int]): peak bytes a strategy may allocate on
+            one tick, only checked when traced
+        traced (bool): trace the bytes allocated with ``tracemalloc``,
+            which slows every allocation down
+
+    Attributes:
+        timestamps (array): timestamp of every measured tick
+        blocks (Dict[str, array]): net blocks of every tick, by strategy
+            and for the whole run (``RUN``)
+        peak_bytes (Dict[str, array]): peak bytes of every tick when traced
+        over_budget (Dict[str, int]): ticks over budget of each strategy
+    """
+
+    __slots__ = (
+        "block_budget", "byte_budget", "traced", "timestamps", "blocks", "peak_bytes", "over_budget",
+        "_started_tracing", "_tick_blocks", "_tick_bytes", "_tick_peak",
+    )
+
+    def __init__(self, block_budget: Optional[int] = None, byte_budget: Optional[int] = None, traced: bool = False) -> None:
+        self.block_budget = block_budget
+        self.byte_budget = byte_budget
+        self.traced = traced
+        self.timestamps = array("q")
+        self.blocks: Dict[str, array] = {}
+        self.peak_bytes: Dict[str, array] = {}
+        self.over_budget: Dict[str, int] = {}
+        self._started_tracing = False
+        self._tick_blocks = 0
+        self._tick_bytes = 0
+        self._tick_peak = 0
+
+    def _fold_peak(self) -> int:
+        """Current traced bytes, after folding the peak since the last reset
+        into the peak of the tick."""
+        current, peak = tracemalloc.get_traced_memory()
+        self._tick_peak = max(self._tick_peak, peak - self._tick_bytes)
+        tracemalloc.reset_peak()
+        return current
+
+    def _record(self, name: str, blocks: int, peak: int) -> None:
+        if name not in self.blocks:
+            # Strategies measured late are padded so that all series are aligned
+            missing = len(self.timestamps) - 1
+            self.blocks[name] = array("q", [0] * missing)
+            self.peak_bytes[name] = array("q", [0] * missing)
+            self.over_budget[name] = 0
+        self.blocks[name].append(blocks)
+        self.peak_bytes[name].append(peak)
+
+        if name != RUN and (
+            (self.block_budget is not None and blocks > self.block_budget)
+            or (self.traced and self.byte_budget is not None and peak > self.byte_budget)
+        ):
+            self.over_budget[name] += 1
+            print(f"\tAllocation budget exceeded by {name}: {blocks} blocks, {peak} bytes")
+
+    def begin_tick(self, timestamp: int) -> None:
+        if self.traced and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.timestamps.append(timestamp)
+        self._tick_peak = 0
+        if self.traced:
+            self._tick_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._tick_blocks = sys.getallocatedblocks()
+
+    def end_tick(self) -> None:
+        blocks = sys.getallocatedblocks() - self._tick_blocks
+        if self.traced:
+            self._fold_peak()
+        self._record(RUN, blocks, self._tick_peak)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Measures the allocations of the block as those of ``name`` on the
+        current tick."""
+        start = self._fold_peak() if self.traced else 0
+        blocks = sys.getallocatedblocks()
+        try:
+            yield
+        finally:
+            blocks = sys.getallocatedblocks() - blocks
+            peak = 0
+            if self.traced:
+                _, peak = tracemalloc.get_traced_memory()
+                peak -= start
+                self._fold_peak()
+            self._record(name, blocks, peak)
+
+    def close(self) -> None:
+        """Stops tracing if the monitor started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def growth(self, name: str = RUN, warmup: int = WARMUP_TICKS) -> Dict[str, float]:
+        """Increase of the per tick allocations of ``name`` from the first to
+        the last tenth of the ticks after ``warmup``.
+
+        Returns:
+            Dict[str, float]: increase of the mean net blocks
+            (``blocks``) and of the mean peak bytes (``peak_bytes``) of a tick
+        """
+        growth = {}
+        for field, series in (("blocks", self.blocks), ("peak_bytes", self.peak_bytes)):
+            values = series.get(name, array("q"))[warmup:]
+            segment = len(values) // SEGMENTS
+            if not segment:
+                growth[field] = 0.0
+                continue
+            growth[field] = (sum(values[-segment:]) - sum(values[:segment])) / segment
+        return growth
+
+    def check(
+            self,
+            warmup: int = WARMUP_TICKS,
+            max_block_growth: float = MAX_BLOCK_GROWTH,
+            max_peak_growth: float = MAX_PEAK_GROWTH
+        ) -> None:
+        """Raises an ``AllocationGrowthError`` naming the strategies whose
+        steady state peak bytes per tick grow with the length of the run,
+        or when the net blocks of the whole run do."""
+        failures: List[str] = []
+        for name in self.blocks:
+            growth = self.growth(name, warmup)
+            if name == RUN and growth["blocks"] > max_block_growth:
+                failures.append(f"{name} allocates {growth['blocks']:.1f} more blocks per tick")
+            if growth["peak_bytes"] > max_peak_growth:
+                failures.append(f"{name} allocates {growth['peak_bytes']:.0f} more bytes per tick")
+        if failures:
+            raise AllocationGrowthError("; ".join(failures))
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Mean and largest net blocks and peak bytes of each strategy, with
+        the ticks over budget."""
+        report = {}
+        for name, blocks in self.blocks.items():
+            peaks = self.peak_bytes[name]
+            report[name] = {
+                "mean_blocks": sum(blocks) / len(blocks) if blocks else 0.0,
+                "max_blocks": max(blocks, default=0),
+                "mean_peak_bytes": sum(peaks) / len(peaks) if peaks else 0.0,
+                "max_peak_bytes": max(peaks, default=0),
+                "over_budget": self.over_budget.get(name, 0),
+            }
+        return report
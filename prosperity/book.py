@@ -0,0 +1,109 @@
+"""Sorted view over an ``OrderDepth``."""
+from typing import List, Optional, Tuple, Union
+
+from datamodel import OrderDepth
+
+from prosperity.prices import from_half_ticks, mid_half_ticks
+
+Level = Tuple[int, int]
+
+
+class BookView:
+    """Price levels of an order depth sorted from the touch outwards.
+
+    ``bids`` is sorted by descending price and ``asks`` by ascending price.
+    Volumes are always positive, regardless of the sign convention used by
+    ``OrderDepth.sell_orders``.
+    """
+
+    __slots__ = ("bids", "asks")
+
+    def __init__(self, order_depth: Optional[OrderDepth] = None) -> None:
+        if order_depth is None:
+            self.bids: List[Level] = []
+            self.asks: List[Level] = []
+            return
+
+        self.bids = sorted(
+            ((price, abs(volume)) for price, volume in order_depth.buy_orders.items()),
+            reverse=True
+        )
+        self.asks = sorted(
+            (price, abs(volume)) for price, volume in order_depth.sell_orders.items()
+        )
+
+    @classmethod
+    def of(cls, book: Union[OrderDepth, "BookView", None]) -> "BookView":
+        """View of an order depth, or the view itself if it already is one."""
+        if isinstance(book, BookView):
+            return book
+        return cls(book)
+
+    @property
+    def best_bid(self) -> Optional[int]:
+        return self.bids[0][0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[int]:
+        return self.asks[0][0] if self.asks else None
+
+    @property
+    def mid_half_ticks(self) -> Optional[int]:
+        """Exact mid price in half ticks, None when one side is empty."""
+        if not self.bids or not self.asks:
+            return None
+        return mid_half_ticks(self.bids[0][0], self.asks[0][0])
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        mid = self.mid_half_ticks
+        return None if mid is None else from_half_ticks(mid)
+
+    def levels(self, buy: bool) -> List[Level]:
+        """Levels an order of the given side would trade against.
+
+        Args:
+            buy (bool): True for a buy order (walks the asks)
+
+        Returns:
+            List[Level]: (price, volume) levels, best first
+        """
+        return self.asks if buy else self.bids
+
+    def sweep(
+            self,
+            buy: bool,
+            limit_price: float,
+            capacity: int,
+            max_levels: Optional[int] = None
+        ) -> Tuple[int, Optional[int], Optional[int]]:
+        """Walks the levels a marketable order would take, best first.
+
+        Levels are taken while their price is not worse than ``limit_price``,
+        until ``capacity`` is used or ``max_levels`` levels were scanned.
+
+        Args:
+            buy (bool): True to take the asks, False to take the bids
+            limit_price (float): worst price that may be taken
+            capacity (int): largest quantity to take
+            max_levels (Optional[int]): number of levels scanned, all if None
+
+        Returns:
+            Tuple[int, Optional[int], Optional[int]]: quantity taken, worst
+            price taken and best price left on the book
+        """
+        quantity = 0
+        worst_price = None
+        for index, (price, volume) in enumerate(self.levels(buy)):
+            if quantity == capacity \
+                    or (max_levels is not None and index >= max_levels) \
+                    or (price > limit_price if buy else price < limit_price):
+                return quantity, worst_price, price
+
+            taken = min(volume, capacity - quantity)
+            quantity += taken
+            worst_price = price
+            if taken < volume:
+                return quantity, worst_price, price
+
+        return quantity, worst_price, None
@@ -0,0 +1,145 @@
+"""Depth-aware execution of pair and basket trades.
+
+A multi-leg trade is described by ``legs``, a mapping from symbol to the
+signed quantity of that symbol in one unit of the trade. For instance, one
+picnic spread unit is ``{PICNIC_BASKET: 1, UKULELE: -1, DIP: -4,
+BAGUETTE: -2}``. Buying ``n`` units trades ``n * weight`` of every leg and
+selling trades ``-n * weight``.
+"""
+from typing import Dict, List, Optional, Tuple, Union
+
+from datamodel import Order, OrderDepth
+
+from prosperity.book import BookView, Level
+
+Symbol = str
+Legs = Dict[Symbol, int]
+
+# Number of ticks beyond the touch a leg is allowed to walk the book
+MAX_SLIPPAGE = 3
+
+# Price offset used by sweep orders ("take whatever is there")
+SWEEP_OFFSET = 10_000_000
+
+
+def leg_capacity(levels: List[Level], max_slippage: int) -> int:
+    """Volume available on the levels within ``max_slippage`` ticks of the
+    touch.
+    """
+    if not levels:
+        return 0
+
+    best_price = levels[0][0]
+    volume = 0
+    for price, level_volume in levels:
+        if abs(price - best_price) > max_slippage:
+            break
+        volume += level_volume
+    return volume
+
+
+def crossing_price(levels: List[Level], quantity: int) -> int:
+    """Worst level price that has to be crossed to fill ``quantity``.
+
+    Args:
+        levels (List[Level]): levels on the opposite side, best first
+        quantity (int): positive quantity to fill
+
+    Returns:
+        int: limit price of an order filling ``quantity``
+    """
+    remaining = quantity
+    for price, volume in levels:
+        remaining -= volume
+        if remaining <= 0:
+            return price
+    return levels[-1][0]
+
+
+def basket_orders(
+        legs: Legs,
+        units: int,
+        order_depths: Dict[Symbol, Union[OrderDepth, BookView]],
+        positions: Dict[Symbol, int],
+        position_limits: Dict[Symbol, int],
+        max_slippage: int = MAX_SLIPPAGE
+    ) -> Tuple[int, Dict[Symbol, List[Order]]]:
+    """Limit orders trading as many units as can be filled on every leg.
+
+    Each leg's book is walked up to ``max_slippage`` ticks from its touch.
+    The number of units sent is the largest one that every leg can fill
+    within that budget and within its position limit, so the legs stay
+    balanced. Orders are priced at the exact crossing price of each leg.
+
+    Args:
+        legs (Legs): signed quantity of each symbol per unit
+        units (int): units to trade, positive to buy and negative to sell
+        order_depths (Dict[Symbol, Union[OrderDepth, BookView]]): current
+            books
+        positions (Dict[Symbol, int]): current positions
+        position_limits (Dict[Symbol, int]): position limits
+        max_slippage (int): ticks each leg may walk beyond its touch
+
+    Returns:
+        Tuple[int, Dict[Symbol, List[Order]]]: signed units sent and the
+        orders of each leg
+    """
+    orders: Dict[Symbol, List[Order]] = {symbol: [] for symbol in legs}
+    if units == 0:
+        return 0, orders
+
+    sign = 1 if units > 0 else -1
+    fillable = abs(units)
+    leg_levels: Dict[Symbol, List[Level]] = {}
+
+    for symbol, weight in legs.items():
+        quantity = sign * weight
+        levels = BookView.of(order_depths.get(symbol)).levels(quantity > 0)
+        fillable = min(fillable, leg_capacity(levels, max_slippage) // abs(weight))
+
+        limit: Optional[int] = position_limits.get(symbol)
+        if limit is not None:
+            position = positions.get(symbol, 0)
+            room = limit - position if quantity > 0 else limit + position
+            fillable = min(fillable, max(room, 0) // abs(weight))
+
+        if fillable == 0:
+            return 0, orders
+        leg_levels[symbol] = levels
+
+    for symbol, weight in legs.items():
+        quantity = sign * weight * fillable
+        price = crossing_price(leg_levels[symbol], abs(quantity))
+        orders[symbol].append(Order(symbol, price, quantity))
+
+    return sign * fillable, orders
+
+
+def sweep_orders(
+        legs: Legs,
+        units: int,
+        reference_prices: Dict[Symbol, int],
+        offset: int = SWEEP_OFFSET
+    ) -> Tuple[int, Dict[Symbol, List[Order]]]:
+    """Orders sending every leg ``offset`` ticks through its reference price,
+    without looking at the book.
+
+    Args:
+        legs (Legs): signed quantity of each symbol per unit
+        units (int): units to trade, positive to buy and negative to sell
+        reference_prices (Dict[Symbol, int]): price of each leg
+        offset (int): distance of the limit price to the reference price
+
+    Returns:
+        Tuple[int, Dict[Symbol, List[Order]]]: signed units sent and the
+        orders of each leg
+    """
+    orders: Dict[Symbol, List[Order]] = {}
+    for symbol, weight in legs.items():
+        quantity = units * weight
+        if quantity > 0:
+            price = reference_prices[symbol] + offset
+        else:
+            price = max(reference_prices[symbol] - offset, 1)
+        orders[symbol] = [Order(symbol, price, quantity)]
+    return units, orders
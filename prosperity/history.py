@@ -0,0 +1,66 @@
+"""Rolling statistics over the last values of a series, without pandas."""
+import math
+from collections import deque
+from typing import Iterable, List, Optional
+
+
+class RollingWindow:
+    """Last ``size`` values of a series with their running sum and sum of
+    squares, so that the mean and standard deviation are updated in O(1).
+
+    ``mean`` and ``std`` match ``pd.Series.rolling(size).mean()`` and
+    ``.std()`` on the last value: they are None (NaN for pandas) until
+    ``size`` values were pushed, and the standard deviation has ``ddof=1``.
+    Integer values, such as prices in half ticks, keep integer sums, so the
+    statistics do not drift however many values go through the window.
+
+    Args:
+        size (int): number of values of the window
+        values (Iterable[float]): initial values, oldest first
+    """
+
+    __slots__ = ("size", "values", "total", "total_squares")
+
+    def __init__(self, size: int, values: Iterable[float] = ()) -> None:
+        self.size = size
+        self.values: deque = deque(maxlen=size)
+        self.total = 0
+        self.total_squares = 0
+        for value in values:
+            self.push(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.size:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_squares -= oldest * oldest
+        self.values.append(value)
+        self.total += value
+        self.total_squares += value * value
+
+    def mean(self) -> Optional[float]:
+        if not self.full:
+            return None
+        return self.total / self.size
+
+    def std(self) -> Optional[float]:
+        if not self.full or self.size < 2:
+            return None
+        variance = (self.size * self.total_squares - self.total * self.total) / (self.size * (self.size - 1))
+        return math.sqrt(max(variance, 0.0))
+
+    def tail_mean(self, count: int) -> Optional[float]:
+        """Mean of the last ``count`` values, None if there are fewer."""
+        if len(self.values) < count:
+            return None
+        return sum(self.values[-index] for index in range(1, count + 1)) / count
+
+    def to_list(self) -> List[float]:
+        return list(self.values)
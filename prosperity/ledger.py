@@ -0,0 +1,42 @@
+"""Cash and PnL of our own trades."""
+from typing import Callable
+
+from datamodel import TradingState
+
+from prosperity.prices import from_half_ticks
+from prosperity.products import SUBMISSION, TICK
+
+
+class PnLLedger:
+    """Cash accumulated from our trades, marked to market with the positions.
+
+    Args:
+        cash (float): initial cash
+    """
+
+    __slots__ = ("cash",)
+
+    def __init__(self, cash: float = 0) -> None:
+        self.cash = cash
+
+    def update_cash(self, state: TradingState) -> None:
+        """Books the trades we made on the previous tick."""
+        previous_timestamp = state.timestamp - TICK
+        for trades in state.own_trades.values():
+            for trade in trades:
+                if trade.timestamp != previous_timestamp:
+                    # Trade was already analyzed
+                    continue
+
+                if trade.buyer == SUBMISSION:
+                    self.cash -= trade.quantity * trade.price
+                if trade.seller == SUBMISSION:
+                    self.cash += trade.quantity * trade.price
+
+    def pnl(self, state: TradingState, mid_half_ticks: Callable[[str], int]) -> float:
+        """Cash plus the value of every position at its mid price, given in
+        half ticks by ``mid_half_ticks``."""
+        value = 0
+        for product, position in state.position.items():
+            value += position * mid_half_ticks(product)
+        return self.cash + from_half_ticks(value)
@@ -0,0 +1,51 @@
+"""Per tick view of the market shared by all strategies."""
+from typing import Dict, Optional
+
+from datamodel import TradingState
+
+from prosperity.book import BookView
+from prosperity.prices import from_half_ticks, mid_half_ticks
+
+
+class MarketSnapshot:
+    """Books, mid prices and positions of one ``TradingState``.
+
+    Mid prices, kept exact in half ticks, and sorted books are computed the first time a product is
+    asked for and cached for the rest of the tick, so that strategies and
+    logs can look them up as often as they need.
+    """
+
+    __slots__ = ("state", "books", "mid_prices")
+
+    def __init__(self, state: TradingState) -> None:
+        self.state = state
+        self.books: Dict[str, BookView] = {}
+        self.mid_prices: Dict[str, Optional[int]] = {}
+
+    def book(self, product: str) -> BookView:
+        book = self.books.get(product)
+        if book is None:
+            book = BookView(self.state.order_depths.get(product))
+            self.books[product] = book
+        return book
+
+    def mid_half_ticks(self, product: str) -> Optional[int]:
+        """Mid price of the book in half ticks, None when one side is empty."""
+        if product in self.mid_prices:
+            return self.mid_prices[product]
+
+        mid = None
+        order_depth = self.state.order_depths.get(product)
+        if order_depth is not None and order_depth.buy_orders and order_depth.sell_orders:
+            mid = mid_half_ticks(max(order_depth.buy_orders), min(order_depth.sell_orders))
+
+        self.mid_prices[product] = mid
+        return mid
+
+    def mid_price(self, product: str) -> Optional[float]:
+        """Mid price of the book in ticks, None when one side is empty."""
+        mid = self.mid_half_ticks(product)
+        return None if mid is None else from_half_ticks(mid)
+
+    def position(self, product: str) -> int:
+        return self.state.position.get(product, 0)
@@ -0,0 +1,60 @@
+"""Fixed-point prices in half ticks.
+
+Book prices are whole ticks, and a mid price, the average of two of them,
+is a multiple of half a tick. Prices computed from the books are kept as
+integers counting half ticks, so that mid prices, spreads of integer
+weighted legs and their rolling sums are exact, and fit ``int64`` arrays.
+They are converted back to whole ticks only to send an order, rounding
+towards the passive side: down for a buy limit, up for a sell limit. An
+average such as an EMA keeps its fraction of a half tick, and is rounded
+from its exact ratio.
+"""
+from typing import Tuple, Union
+
+# Half ticks per tick
+HALF_TICKS = 2
+
+Price = Union[int, float]
+
+
+def to_half_ticks(price: Price) -> int:
+    """Nearest number of half ticks of a price in ticks."""
+    return round(price * HALF_TICKS)
+
+
+def exact_half_ticks(price: Price) -> Tuple[int, int]:
+    """Price in half ticks as an exact ``(numerator, denominator)`` ratio,
+    for prices such as an EMA that are not whole half ticks."""
+    return (price * HALF_TICKS).as_integer_ratio()
+
+
+def from_half_ticks(half_ticks: Union[int, float]) -> float:
+    """Price in ticks of a number of half ticks."""
+    return half_ticks / HALF_TICKS
+
+
+def mid_half_ticks(best_bid: int, best_ask: int) -> int:
+    """Exact mid price of two whole tick prices, in half ticks."""
+    return best_bid + best_ask
+
+
+def floor_ticks(half_ticks: int, denominator: int = 1) -> int:
+    """Largest whole tick price not above ``half_ticks / denominator`` half
+    ticks, the limit price of a buy order."""
+    return half_ticks // (HALF_TICKS * denominator)
+
+
+def ceil_ticks(half_ticks: int, denominator: int = 1) -> int:
+    """Smallest whole tick price not below ``half_ticks / denominator`` half
+    ticks, the limit price of a sell order."""
+    return -(-half_ticks // (HALF_TICKS * denominator))
+
+
+def ema_half_ticks(previous: Union[int, float], half_ticks: int, alpha: float) -> Union[int, float]:
+    """Exponential moving average update in half ticks.
+
+    The average is not rounded to whole half ticks: with ``alpha = 0.5`` it
+    is a binary fraction that a float holds exactly, and rounding it would
+    move the quotes built on it.
+    """
+    return alpha * half_ticks + (1 - alpha) * previous
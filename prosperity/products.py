@@ -0,0 +1,62 @@
+"""Products of the competition and their exchange constants."""
+
+# storing string as const to avoid typos
+SUBMISSION = "SUBMISSION"
+PEARLS = "PEARLS"
+BANANAS = "BANANAS"
+COCONUTS = "COCONUTS"
+PINA_COLADAS = "PINA_COLADAS"
+BERRIES = "BERRIES"
+DIVING_GEAR = "DIVING_GEAR"
+DOLPHIN_SIGHTINGS = "DOLPHIN_SIGHTINGS"
+PICNIC_BASKET = "PICNIC_BASKET"
+UKULELE = "UKULELE"
+DIP = "DIP"
+BAGUETTE = "BAGUETTE"
+
+# Traders
+OLIVIA = 'Olivia'
+PETER = 'Peter'
+
+PRODUCTS = [
+    PEARLS,
+    BANANAS,
+    COCONUTS,
+    PINA_COLADAS,
+    BERRIES,
+    DIVING_GEAR,
+    PICNIC_BASKET,
+    UKULELE,
+    DIP,
+    BAGUETTE
+]
+
+DEFAULT_PRICES = {
+    PEARLS : 10_000,
+    BANANAS : 5_000,
+    COCONUTS : 8_000,
+    PINA_COLADAS : 15_000,
+    BERRIES : 3_900,
+    DIVING_GEAR : 99_000,
+    DOLPHIN_SIGHTINGS : 3_050,
+    PICNIC_BASKET: 73_000,
+    DIP: 7_000,
+    UKULELE: 21_000,
+    BAGUETTE: 12_000
+}
+
+POSITION_LIMITS = {
+    PEARLS: 20,
+    BANANAS: 20,
+    COCONUTS: 600,
+    PINA_COLADAS: 300,
+    BERRIES: 250,
+    DIVING_GEAR: 50,
+    PICNIC_BASKET: 70,
+    UKULELE: 70,
+    DIP: 300,
+    BAGUETTE: 150
+}
+
+# Time between two ticks
+TICK = 100
@@ -0,0 +1,159 @@
+"""Inventory-skewed market making around a fair value.
+
+Quotes are centred on a reservation price, which moves away from the fair
+value proportionally to the inventory so that fills tend to flatten the
+position. Every tick :func:`make_quotes`
+
+1. takes the resting orders that are through the fair value by at least
+   ``take_edge``, on the touch only or across the whole book when
+   ``sweep`` is set,
+2. quotes a ladder of ``levels`` bids and asks at least ``edge`` away from
+   the reservation price, one tick inside the book when that still keeps
+   the edge,
+
+never sending more than the position limit allows. Prices are worked out
+in half ticks (see ``prosperity.prices``), so the rounding of the quotes
+to whole ticks is exact.
+"""
+from typing import List, Optional, Union
+
+from datamodel import Order, OrderDepth
+
+from prosperity.book import BookView
+from prosperity.prices import ceil_ticks, exact_half_ticks, floor_ticks, to_half_ticks
+
+
+class QuoteParams:
+    """Parameters of the quote engine for one product. Edges and skew are
+    used rounded to half ticks.
+
+    Args:
+        edge (float): minimum distance of quotes to the reservation price
+        skew (float): shift of the reservation price, in ticks, at full
+            position
+        levels (int): number of quotes on each side
+        level_spacing (int): ticks between two quotes of a side
+        take_edge (float): distance through the fair value from which
+            resting orders are taken
+        max_volume (Optional[int]): largest volume sent on each side
+        improve (bool): quote one tick inside the book when profitable
+        sweep (bool): take mispriced orders on every level, not only on
+            the touch
+    """
+
+    __slots__ = ("edge", "skew", "levels", "level_spacing", "take_edge", "max_volume", "improve", "sweep")
+
+    def __init__(
+            self,
+            edge: float = 1,
+            skew: float = 0,
+            levels: int = 1,
+            level_spacing: int = 1,
+            take_edge: float = 1,
+            max_volume: Optional[int] = None,
+            improve: bool = True,
+            sweep: bool = False
+        ) -> None:
+        self.edge = edge
+        self.skew = skew
+        self.levels = levels
+        self.level_spacing = level_spacing
+        self.take_edge = take_edge
+        self.max_volume = max_volume
+        self.improve = improve
+        self.sweep = sweep
+
+
+def split_volume(volume: int, levels: int) -> List[int]:
+    """Splits ``volume`` over ``levels`` quotes, the remainder going to the
+    quote closest to the touch.
+    """
+    share, remainder = divmod(volume, levels)
+    return [share + remainder] + [share] * (levels - 1)
+
+
+def make_quotes(
+        symbol: str,
+        fair_value: float,
+        position: int,
+        limit: int,
+        order_depth: Union[OrderDepth, BookView, None],
+        params: QuoteParams
+    ) -> List[Order]:
+    """Orders of the quote engine for one product.
+
+    Args:
+        symbol (str): product to quote
+        fair_value (float): fair value of the product
+        position (int): current position
+        limit (int): position limit
+        order_depth (Union[OrderDepth, BookView, None]): current book of
+            the product
+        params (QuoteParams): quoting parameters
+
+    Returns:
+        List[Order]: taking orders followed by the bid and ask ladders, none
+        when the limit is not positive
+    """
+    if limit <= 0:
+        return []
+    book = BookView.of(order_depth)
+    orders: List[Order] = []
+
+    buy_capacity = max(limit - position, 0)
+    sell_capacity = max(limit + position, 0)
+    if params.max_volume is not None:
+        buy_capacity = min(buy_capacity, params.max_volume)
+        sell_capacity = min(sell_capacity, params.max_volume)
+
+    # Fair value is fair / denominator half ticks
+    fair, denominator = exact_half_ticks(fair_value)
+    take_edge = to_half_ticks(params.take_edge) * denominator
+    edge = to_half_ticks(params.edge) * denominator
+
+    # Take the resting orders that are mispriced
+    max_levels = None if params.sweep else 1
+    bought, buy_price, best_ask = book.sweep(
+        True, floor_ticks(fair - take_edge, denominator), buy_capacity, max_levels
+    )
+    sold, sell_price, best_bid = book.sweep(
+        False, ceil_ticks(fair + take_edge, denominator), sell_capacity, max_levels
+    )
+
+    if bought > 0:
+        orders.append(Order(symbol, buy_price, bought))
+    if sold > 0:
+        orders.append(Order(symbol, sell_price, -sold))
+
+    buy_capacity -= bought
+    sell_capacity -= sold
+    inventory = position + bought - sold
+
+    # Reservation price in half ticks, times denominator * limit
+    reservation = fair * limit - to_half_ticks(params.skew) * denominator * inventory
+    bid = floor_ticks(reservation - edge * limit, denominator * limit)
+    ask = ceil_ticks(reservation + edge * limit, denominator * limit)
+
+    if params.improve:
+        if best_bid is not None:
+            bid = min(bid, best_bid + 1)
+        if best_ask is not None:
+            ask = max(ask, best_ask - 1)
+
+    # Passive quotes must not cross the book
+    if best_ask is not None:
+        bid = min(bid, best_ask - 1)
+    if best_bid is not None:
+        ask = max(ask, best_bid + 1)
+
+    if buy_capacity > 0:
+        for level, volume in enumerate(split_volume(buy_capacity, params.levels)):
+            if volume > 0:
+                orders.append(Order(symbol, bid - level * params.level_spacing, volume))
+
+    if sell_capacity > 0:
+        for level, volume in enumerate(split_volume(sell_capacity, params.levels)):
+            if volume > 0:
+                orders.append(Order(symbol, ask + level * params.level_spacing, -volume))
+
+    return orders
@@ -0,0 +1,206 @@
+"""Take profit, stop loss and time stop of the positions of each strategy.
+
+A strategy position is counted in units of its trade: one DIVING_GEAR, one
+BERRIES, one pair spread, one basket spread. Units are booked from our own
+fills of an anchor leg that no other strategy trades. For example, PINA_COLADAS
+is the anchor of the pair trade, whose COCONUTS leg is shared with the market
+maker. A fill enters at the value of the unit marked on the tick its order
+was sent, moved by the slippage of the anchor fill from its mid price. For a
+single product, that is the fill price. The average entry is kept as a
+running cost, so the unrealized PnL and the limits are checked in constant
+time per tick, whatever the number of fills.
+
+When a limit is hit, the position is ``exiting`` until it is flat, and new
+entries on its side are blocked until the strategy ``rearm``s it, once its
+entry signal has cleared.
+"""
+from typing import Callable, Dict, List, Optional
+
+from datamodel import TradingState
+
+from prosperity.prices import HALF_TICKS, from_half_ticks
+from prosperity.products import SUBMISSION, TICK
+
+TAKE_PROFIT = "take profit"
+STOP_LOSS = "stop loss"
+TIME_STOP = "time stop"
+
+
+class RiskLimits:
+    """Exit limits of a position, each disabled when None.
+
+    Args:
+        take_profit (Optional[float]): unrealized PnL per unit, in ticks,
+            from which the position is closed
+        stop_loss (Optional[float]): unrealized loss per unit, in ticks,
+            from which the position is closed
+        max_hold (Optional[int]): time after which a position is closed,
+            counted from when it was opened
+    """
+
+    __slots__ = ("take_profit", "stop_loss", "max_hold")
+
+    def __init__(
+            self,
+            take_profit: Optional[float] = None,
+            stop_loss: Optional[float] = None,
+            max_hold: Optional[int] = None
+        ) -> None:
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.max_hold = max_hold
+
+
+class StrategyPosition:
+    """Open units of a strategy, their average entry and their exit state.
+
+    Args:
+        anchor (str): leg whose fills are booked, traded by this strategy only
+        legs (Dict[str, int]): signed quantity of each product in one unit,
+            1 for the anchor
+        limits (RiskLimits): exit limits
+
+    Attributes:
+        units (int): signed units held
+        cost (float): entry value of the units, in half ticks
+        opened (int): timestamp of the fill that opened the position
+        value (int): value of one unit at the mid prices of the last tick,
+            in half ticks
+        anchor_mid (int): mid price of the anchor on the last tick
+        blocked (int): side whose entries are blocked after an exit, 1 for
+            long, -1 for short, 0 when none
+    """
+
+    __slots__ = ("anchor", "legs", "limits", "units", "cost", "opened", "value", "anchor_mid", "blocked")
+
+    def __init__(self, anchor: str, legs: Dict[str, int], limits: RiskLimits) -> None:
+        if legs.get(anchor) != 1:
+            raise ValueError(f"The anchor {anchor} must have a weight of 1 in {legs}")
+        self.anchor = anchor
+        self.legs = legs
+        self.limits = limits
+        self.units = 0
+        self.cost = 0.0
+        self.opened = 0
+        self.value: Optional[int] = None
+        self.anchor_mid: Optional[int] = None
+        self.blocked = 0
+
+    @property
+    def entry(self) -> Optional[float]:
+        """Average entry value of a unit, in half ticks."""
+        return self.cost / self.units if self.units else None
+
+    @property
+    def unrealized(self) -> float:
+        """Unrealized PnL of the units, in half ticks."""
+        return self.units * self.value - self.cost if self.units else 0.0
+
+    def to_list(self) -> List[Optional[float]]:
+        """State of the position, without its legs and limits."""
+        return [self.units, self.cost, self.opened, self.value, self.anchor_mid, self.blocked]
+
+    def restore(self, values: List[Optional[float]]) -> None:
+        units, self.cost, opened, value, anchor_mid, blocked = values
+        # Snapshots may store every number as a float
+        self.units, self.opened, self.blocked = int(units), int(opened), int(blocked)
+        self.value = None if value is None else int(value)
+        self.anchor_mid = None if anchor_mid is None else int(anchor_mid)
+
+    def fill(self, units: int, price: float, timestamp: int) -> None:
+        """Books ``units`` bought (sold when negative) at ``price`` half ticks
+        per unit, with average cost accounting."""
+        remaining = self.units + units
+        if self.units == 0 or (self.units > 0) == (units > 0):
+            if self.units == 0:
+                self.opened = timestamp
+            self.cost += units * price
+        elif abs(units) <= abs(self.units):
+            # Reduced: the units left keep their average entry
+            self.cost *= remaining / self.units
+        else:
+            # Reversed: the new side opens at the fill price
+            self.cost = remaining * price
+            self.opened = timestamp
+        self.units = remaining
+        if remaining == 0:
+            self.cost = 0.0
+
+    def limit_hit(self, timestamp: int) -> Optional[str]:
+        """Limit hit by the open units, None when within all of them."""
+        if not self.units or self.value is None:
+            return None
+        limits = self.limits
+        pnl = self.value - self.cost / self.units
+        if self.units < 0:
+            pnl = -pnl
+        if limits.take_profit is not None and pnl >= limits.take_profit * HALF_TICKS:
+            return TAKE_PROFIT
+        if limits.stop_loss is not None and pnl <= -limits.stop_loss * HALF_TICKS:
+            return STOP_LOSS
+        if limits.max_hold is not None and timestamp - self.opened >= limits.max_hold:
+            return TIME_STOP
+        return None
+
+
+class RiskManager:
+    """Positions of the strategies, updated from our fills on every tick.
+
+    Attributes:
+        positions (Dict[str, StrategyPosition]): positions by strategy
+    """
+
+    __slots__ = ("positions",)
+
+    def __init__(self) -> None:
+        self.positions: Dict[str, StrategyPosition] = {}
+
+    def add(self, name: str, anchor: str, legs: Dict[str, int], limits: RiskLimits) -> StrategyPosition:
+        position = StrategyPosition(anchor, legs, limits)
+        self.positions[name] = position
+        return position
+
+    def update(self, state: TradingState, mid_half_ticks: Callable[[str], int]) -> None:
+        """Books the fills of the anchors on the previous tick, then marks
+        every unit at the mid prices of ``state``, given in half ticks by
+        ``mid_half_ticks``."""
+        previous_timestamp = state.timestamp - TICK
+        for position in self.positions.values():
+            for trade in state.own_trades.get(position.anchor, []):
+                if trade.timestamp != previous_timestamp or position.value is None:
+                    continue
+                units = trade.quantity if trade.buyer == SUBMISSION else -trade.quantity
+                # Slippage of the anchor from its mid price, on the value of the unit
+                price = position.value + HALF_TICKS * trade.price - position.anchor_mid
+                position.fill(units, price, trade.timestamp)
+
+            if all(symbol in state.order_depths for symbol in position.legs):
+                position.value = sum(weight * mid_half_ticks(symbol) for symbol, weight in position.legs.items())
+                position.anchor_mid = mid_half_ticks(position.anchor)
+
+    def units(self, name: str) -> int:
+        return self.positions[name].units
+
+    def exiting(self, name: str, timestamp: int) -> bool:
+        """Whether the position of ``name`` must be closed: a limit is hit on
+        this tick, or was hit before and the position is not flat yet."""
+        position = self.positions[name]
+        if not position.units:
+            return False
+        side = 1 if position.units > 0 else -1
+        if position.blocked == side:
+            return True
+        reason = position.limit_hit(timestamp)
+        if reason is None:
+            return False
+        print(f"\t{reason.capitalize()} of {name}: {position.units} units, unrealized {from_half_ticks(position.unrealized)}")
+        position.blocked = side
+        return True
+
+    def blocks(self, name: str, side: int) -> bool:
+        """Whether entries on ``side`` (1 long, -1 short) are blocked."""
+        return self.positions[name].blocked == side
+
+    def rearm(self, name: str) -> None:
+        """Allows entries on both sides again."""
+        self.positions[name].blocked = 0
@@ -0,0 +1,124 @@
+"""Products and strategies traded in each round of the competition."""
+from typing import Dict, List, Optional, Sequence
+
+from prosperity.products import (
+    BAGUETTE,
+    BANANAS,
+    BERRIES,
+    COCONUTS,
+    DIP,
+    DIVING_GEAR,
+    DOLPHIN_SIGHTINGS,
+    PEARLS,
+    PICNIC_BASKET,
+    PINA_COLADAS,
+    UKULELE
+)
+from prosperity.risk import RiskLimits
+
+
+class RoundConfig:
+    """Selection of products and strategies of one round.
+
+    Args:
+        name (str): name of the round, used in logs
+        products (Sequence[str]): products logged and followed with an EMA
+        strategies (Sequence[str]): strategies to run, in order. Each name
+            refers to the ``<name>_strategy`` method of the trader.
+        observations (Sequence[str]): observations printed every tick
+        pair_legs (Dict[str, int]): signed quantity of each leg in one unit
+            of the coconuts and pina coladas spread
+        order_volume (int): units of the spread traded per signal
+        follow_olivia (bool): whether BERRIES stay long once Olivia buys
+        spread_limits (Optional[RiskLimits]): exits of the pair and basket
+            positions, none by default. Only set once ``backtest.walkforward``
+            validates them; the fields of ``TraderParams`` override them.
+    """
+
+    __slots__ = (
+        "name",
+        "products",
+        "strategies",
+        "observations",
+        "pair_legs",
+        "order_volume",
+        "follow_olivia",
+        "spread_limits"
+    )
+
+    def __init__(
+            self,
+            name: str,
+            products: Sequence[str],
+            strategies: Sequence[str],
+            observations: Sequence[str] = (),
+            pair_legs: Dict[str, int] = None,
+            order_volume: int = 3,
+            follow_olivia: bool = False,
+            spread_limits: Optional[RiskLimits] = None
+        ) -> None:
+        self.name = name
+        self.products: List[str] = list(products)
+        self.strategies: List[str] = list(strategies)
+        self.observations: List[str] = list(observations)
+        self.pair_legs: Dict[str, int] = dict(pair_legs or {COCONUTS: -1, PINA_COLADAS: 1})
+        self.order_volume = order_volume
+        self.follow_olivia = follow_olivia
+        self.spread_limits = spread_limits or RiskLimits()
+
+
+ROUND_1 = RoundConfig(
+    "round1",
+    products=[PEARLS, BANANAS],
+    strategies=["pearls", "bananas"]
+)
+
+ROUND_2 = RoundConfig(
+    "round2",
+    products=[PEARLS, BANANAS, COCONUTS, PINA_COLADAS],
+    strategies=["pearls", "bananas", "coconuts_pina_coladas"],
+    pair_legs={COCONUTS: -2, PINA_COLADAS: 1},
+    order_volume=5
+)
+
+ROUND_3 = RoundConfig(
+    "round3",
+    products=[PEARLS, BANANAS, COCONUTS, PINA_COLADAS, BERRIES, DIVING_GEAR],
+    strategies=["pearls", "bananas", "coconuts_pina_coladas", "berries", "diving_gear"],
+    observations=[DOLPHIN_SIGHTINGS],
+    pair_legs={COCONUTS: -2, PINA_COLADAS: 1},
+    order_volume=5
+)
+
+ROUND_4 = RoundConfig(
+    "round4",
+    products=[
+        PEARLS,
+        BANANAS,
+        COCONUTS,
+        PINA_COLADAS,
+        BERRIES,
+        DIVING_GEAR,
+        PICNIC_BASKET,
+        UKULELE,
+        DIP,
+        BAGUETTE
+    ],
+    strategies=[
+        "pearls",
+        "bananas",
+        "coconuts_pina_coladas",
+        "berries",
+        "diving_gear",
+        "picnic"
+    ],
+    observations=[DOLPHIN_SIGHTINGS]
+)
+
+ROUND_5 = RoundConfig(
+    "round5",
+    products=ROUND_4.products,
+    strategies=ROUND_4.strategies,
+    observations=ROUND_4.observations,
+    follow_olivia=True
+)
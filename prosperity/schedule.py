@@ -0,0 +1,106 @@
+"""Time-indexed target positions for seasonal products.
+
+A schedule is a lookup table with the target position of every time bucket
+of the day, built once from a few breakpoints (see
+``analysis.seasonality`` for fitting them on historical prices). Every tick
+the trader looks up its target and trades towards it, at most
+``max_volume`` per tick and without walking the book further than
+``max_slippage`` ticks, so that moving between two targets is spread over
+the ramp between them.
+"""
+from typing import List, Tuple, Union
+
+from datamodel import Order, OrderDepth
+
+from prosperity.book import BookView
+from prosperity.products import TICK
+
+DAY_LENGTH = 1_000_000
+
+Breakpoint = Tuple[int, int]
+
+
+class PositionSchedule:
+    """Target position by timestamp, stored every ``step`` timestamps.
+
+    Args:
+        targets (List[int]): target position of each bucket
+        step (int): timestamps covered by one bucket
+    """
+
+    __slots__ = ("targets", "step")
+
+    def __init__(self, targets: List[int], step: int = TICK) -> None:
+        self.targets = targets
+        self.step = step
+
+    @classmethod
+    def from_breakpoints(
+            cls,
+            breakpoints: List[Breakpoint],
+            step: int = TICK,
+            day_length: int = DAY_LENGTH
+        ) -> "PositionSchedule":
+        """Schedule interpolating linearly between ``(timestamp, target)``
+        breakpoints, flat before the first and after the last one.
+        """
+        targets = []
+        index = 0
+        for timestamp in range(0, day_length, step):
+            while index < len(breakpoints) - 1 and breakpoints[index + 1][0] <= timestamp:
+                index += 1
+            start_time, start_target = breakpoints[index]
+            if timestamp <= start_time or index == len(breakpoints) - 1:
+                targets.append(start_target)
+                continue
+            end_time, end_target = breakpoints[index + 1]
+            weight = (timestamp - start_time) / (end_time - start_time)
+            targets.append(round(start_target + weight * (end_target - start_target)))
+
+        return cls(targets, step)
+
+    def target(self, timestamp: int) -> int:
+        index = timestamp // self.step
+        if index >= len(self.targets):
+            return self.targets[-1]
+        return self.targets[index]
+
+
+def track_target(
+        symbol: str,
+        target: int,
+        position: int,
+        order_depth: Union[OrderDepth, BookView, None],
+        max_volume: int,
+        max_slippage: int
+    ) -> List[Order]:
+    """Marketable order moving ``position`` towards ``target``.
+
+    Args:
+        symbol (str): product to trade
+        target (int): target position
+        position (int): current position
+        order_depth (Union[OrderDepth, BookView, None]): current book of
+            the product
+        max_volume (int): largest quantity traded per tick
+        max_slippage (int): ticks the order may walk beyond the touch
+
+    Returns:
+        List[Order]: at most one order, priced at the crossing price
+    """
+    quantity = max(-max_volume, min(max_volume, target - position))
+    if quantity == 0:
+        return []
+
+    buy = quantity > 0
+    book = BookView.of(order_depth)
+    levels = book.levels(buy)
+    if not levels:
+        return []
+
+    limit_price = levels[0][0] + max_slippage if buy else levels[0][0] - max_slippage
+    taken, price, _ = book.sweep(buy, limit_price, abs(quantity))
+    if taken == 0:
+        return []
+
+    return [Order(symbol, price, taken if buy else -taken)]
@@ -0,0 +1,92 @@
+"""Compact snapshots of a trader's state.
+
+A snapshot is a base64 string, small enough to be carried from one tick to
+the next (as the exchange's ``traderData``) or written to disk, so that a
+recycled process can resume where the previous one stopped.
+
+The state is a JSON-like structure. Lists of numbers, typically price
+histories, are stored as packed ``int64``/``float64`` arrays next to a JSON
+header instead of being written as text::
+
+    header length (uint32) | JSON header | array bytes ...
+
+and the whole payload is zlib compressed.
+"""
+import base64
+import json
+import struct
+import zlib
+from array import array
+from typing import Any, List, Optional
+
+_ARRAY_KEY = "$a"
+_HEADER = struct.Struct("<I")
+
+
+def _to_array(value: list) -> Optional[array]:
+    """Packed copy of a list of ints or floats, None for any other list."""
+    if isinstance(value[0], bool):
+        return None
+    for typecode in ("q", "d"):
+        try:
+            return array(typecode, value)
+        except (TypeError, OverflowError):
+            continue
+    return None
+
+
+def _pack(value: Any, arrays: List[array]) -> Any:
+    if isinstance(value, list) and value:
+        values = _to_array(value)
+        if values is not None:
+            arrays.append(values)
+            return {_ARRAY_KEY: [values.typecode, len(values)]}
+    if isinstance(value, dict):
+        return {str(key): _pack(item, arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack(item, arrays) for item in value]
+    return value
+
+
+def _unpack(value: Any, payload: memoryview, offset: List[int]) -> Any:
+    if isinstance(value, dict):
+        if _ARRAY_KEY in value and len(value) == 1:
+            typecode, length = value[_ARRAY_KEY]
+            values = array(typecode)
+            end = offset[0] + length * values.itemsize
+            values.frombytes(payload[offset[0]:end])
+            offset[0] = end
+            return values.tolist()
+        return {key: _unpack(item, payload, offset) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unpack(item, payload, offset) for item in value]
+    return value
+
+
+def encode_snapshot(state: Any, level: int = 1) -> str:
+    """Encodes a JSON-like state into a base64 string.
+
+    Args:
+        state (Any): dicts, lists, numbers, strings, booleans and None
+        level (int): zlib compression level
+
+    Returns:
+        str: snapshot of the state
+    """
+    arrays: List[array] = []
+    header = json.dumps(_pack(state, arrays), separators=(",", ":")).encode()
+    payload = b"".join([_HEADER.pack(len(header)), header] + [values.tobytes() for values in arrays])
+    return base64.b64encode(zlib.compress(payload, level)).decode("ascii")
+
+
+def decode_snapshot(snapshot: str) -> Any:
+    """Decodes a snapshot made by :func:`encode_snapshot`.
+
+    Dict keys come back as strings and tuples as lists, as with JSON.
+    """
+    payload = memoryview(zlib.decompress(base64.b64decode(snapshot)))
+    (header_length,) = _HEADER.unpack_from(payload)
+    start = _HEADER.size + header_length
+    header = json.loads(bytes(payload[_HEADER.size:start]))
+    return _unpack(header, payload, [start])
+
@@ -0,0 +1,888 @@
+"""Trader shared by every round.
+
+The strategies of all the rounds live here. A ``RoundConfig`` selects the
+products and strategies of a round, and the ``roundN_trader.py`` files are
+thin entry points around it.
+"""
+import os
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple, Union
+
+from datamodel import Order, TradingState
+
+from prosperity.allocations import AllocationMonitor, pack_orders, unpack_orders
+from prosperity.execution import MAX_SLIPPAGE, SWEEP_OFFSET, basket_orders, sweep_orders
+from prosperity.history import RollingWindow
+from prosperity.ledger import PnLLedger
+from prosperity.market import MarketSnapshot
+from prosperity.prices import (
+    HALF_TICKS,
+    ceil_ticks,
+    ema_half_ticks,
+    floor_ticks,
+    from_half_ticks,
+    to_half_ticks
+)
+from prosperity.products import (
+    BAGUETTE,
+    BANANAS,
+    BERRIES,
+    COCONUTS,
+    DEFAULT_PRICES,
+    DIP,
+    DIVING_GEAR,
+    DOLPHIN_SIGHTINGS,
+    OLIVIA,
+    PEARLS,
+    PICNIC_BASKET,
+    PINA_COLADAS,
+    POSITION_LIMITS,
+    TICK,
+    UKULELE
+)
+from prosperity.quoting import QuoteParams, make_quotes
+from prosperity.risk import RiskLimits, RiskManager
+from prosperity.rounds import ROUND_5, RoundConfig
+from prosperity.schedule import PositionSchedule, track_target
+from prosperity.snapshot import decode_snapshot, encode_snapshot
+
+PCT_CHANGE_SIGNAL = 0.002
+
+# Starting values of the search of the exits of the pair and basket
+# positions, in ticks of PnL per unit of spread. The exits are off by default.
+TAKE_PROFIT = 10
+STOP_LOSS = 30
+WINDOW = 200
+
+# Rolling windows of the previous day, built by analysis.warmstart
+WARM_START_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "warm_start.txt"
+)
+
+# Position of COCONUTS left to the EMA market maker, beside the pair trade
+COCONUTS_EMA_LIMIT = 300
+
+MEAN_SPREAD = DEFAULT_PRICES[PINA_COLADAS] - DEFAULT_PRICES[COCONUTS]
+MEAN_SPREAD_STD = 30
+
+# Spread followed by the pair trade: PINA_COLADAS - PAIR_HEDGE_RATIO * COCONUTS,
+# kept in half ticks times the denominator of the ratio so that it is exact
+PAIR_HEDGE_RATIO = Fraction(1551, 1000)
+
+# Largest denominator of a hedge ratio given as a float
+PAIR_HEDGE_PRECISION = 10_000
+
+# Standard deviations of the spreads from their rolling mean to trade
+PAIR_ENTRY = 1.5
+BASKET_ENTRY = 2
+
+# Ticks through the mid price of the diving gear orders
+DIVING_GEAR_OFFSET = 200
+
+VOLUME_BASKET = 2
+
+BASKET_LEGS = {
+    PICNIC_BASKET: 1,
+    UKULELE: -1,
+    DIP: -4,
+    BAGUETTE: -2
+}
+
+PAIR_SWEEP_OFFSET = 50
+
+BERRIES_SELL_START = 495_000
+
+# Target position of BERRIES over the day: long from the morning low and
+# short from the midday high (fitted with analysis.seasonality)
+BERRIES_SCHEDULE = [
+    (0, 0),
+    (195_000, 0),
+    (205_000, 250),
+    (BERRIES_SELL_START, 250),
+    (505_000, -250),
+    (999_900, -250),
+]
+BERRIES_MAX_VOLUME = 40
+BERRIES_MAX_SLIPPAGE = 3
+
+# Exit limits of the single product positions, in ticks per unit, none by
+# default. Those of the spreads are RoundConfig.spread_limits, overridden by
+# TraderParams.take_profit and stop_loss
+DIVING_GEAR_LIMITS = RiskLimits()
+BERRIES_LIMITS = RiskLimits()
+
+QUOTE_PARAMS = {
+    # The fair value of PEARLS is fixed, so the inventory skew only gives up edge
+    PEARLS: QuoteParams(edge=1, skew=0, sweep=True),
+    BANANAS: QuoteParams(edge=1, skew=2),
+    COCONUTS: QuoteParams(edge=1, skew=2, max_volume=40),
+}
+
+
+class TraderParams:
+    """Fitted parameters of the strategies, the module constants by default.
+
+    Args:
+        window (int): size of the rolling windows of the spreads and of the
+            diving gear returns
+        pair_hedge_ratio (Union[Fraction, float]): COCONUTS per PINA_COLADAS
+            in the pair spread
+        pair_entry (float): standard deviations of the pair spread from its
+            mean to trade
+        basket_entry (float): standard deviations of the basket spread from
+            its mean to trade
+        pct_change_signal (float): dolphin sightings change that opens a
+            diving gear position
+        order_volume (Optional[int]): units of the pair spread traded per
+            signal, those of the round when None
+        take_profit (Optional[float]): PnL per unit of the pair and basket
+            spreads, in ticks, at which their positions are closed, that of
+            the round when None
+        stop_loss (Optional[float]): loss per unit of the pair and basket
+            spreads, in ticks, at which their positions are closed, that of
+            the round when None
+    """
+
+    __slots__ = (
+        "window",
+        "pair_hedge_ratio",
+        "pair_entry",
+        "basket_entry",
+        "pct_change_signal",
+        "order_volume",
+        "take_profit",
+        "stop_loss"
+    )
+
+    def __init__(
+            self,
+            window: int = WINDOW,
+            pair_hedge_ratio: Union[Fraction, float] = PAIR_HEDGE_RATIO,
+            pair_entry: float = PAIR_ENTRY,
+            basket_entry: float = BASKET_ENTRY,
+            pct_change_signal: float = PCT_CHANGE_SIGNAL,
+            order_volume: Optional[int] = None,
+            take_profit: Optional[float] = None,
+            stop_loss: Optional[float] = None
+        ) -> None:
+        self.window = int(window)
+        self.pair_hedge_ratio = Fraction(pair_hedge_ratio).limit_denominator(PAIR_HEDGE_PRECISION)
+        self.pair_entry = pair_entry
+        self.basket_entry = basket_entry
+        self.pct_change_signal = pct_change_signal
+        self.order_volume = None if order_volume is None else int(order_volume)
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+
+    def as_dict(self) -> Dict[str, float]:
+        """Parameters as plain numbers, the hedge ratio as a float."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["pair_hedge_ratio"] = float(self.pair_hedge_ratio)
+        return values
+
+
+class Trader:
+    """Runs the strategies selected by a round configuration.
+
+    Args:
+        config (RoundConfig): products and strategies of the round
+        params (Optional[TraderParams]): parameters of the strategies
+        warm_start (Optional[str]): warm-start file built by
+            ``analysis.warmstart`` from the previous day, loaded when it
+            exists. None starts cold.
+    """
+
+    def __init__(
+            self,
+            config: RoundConfig = ROUND_5,
+            params: Optional[TraderParams] = None,
+            warm_start: Optional[str] = WARM_START_PATH
+        ) -> None:
+
+        print("Initializing Trader... ok")
+
+        self.config = config
+        self.params = params or TraderParams()
+        self.round = 0
+
+        # Cash of our trades, the positions are in state.position
+        self.ledger = PnLLedger()
+
+        # Books and mid prices of the current tick
+        self.market: Optional[MarketSnapshot] = None
+
+        # self.ema_prices keeps an exponential moving average of prices, in
+        # half ticks
+        self.ema_prices = dict()
+        for product in config.products:
+            self.ema_prices[product] = None
+
+        self.ema_param = 0.5
+
+        # Rolling windows of the spreads, in fixed point, and of the diving
+        # gear returns
+        self.histories : Dict[str, RollingWindow] = {
+            "Spread": RollingWindow(self.params.window),
+            DIVING_GEAR: RollingWindow(self.params.window),
+            "SPREAD_PICNIC": RollingWindow(self.params.window),
+        }
+        self.last_diving_gear_price = None
+
+        self.berries_schedule = PositionSchedule.from_breakpoints(BERRIES_SCHEDULE)
+
+        # Walk the books of multi-leg trades instead of sweeping them
+        self.depth_aware_execution = True
+
+        # Debug mode measuring the allocations of every strategy per tick
+        self.allocations: Optional[AllocationMonitor] = None
+
+        # Entry prices and exits of the strategy positions, from our fills
+        self.risk = self.risk_manager()
+
+        self.coconuts_pair_position = 0
+        self.last_dolphin_price = -1
+        self.dolphin_signal = 0 # 0 if closed, 1 long, -1 short
+        self.trend = 0
+
+        self.min_time_hold_position = 20 * TICK
+        self.initial_time_hold_position = 0
+
+        # Olivia
+        self.olivia_buy_trend = False
+        self.memory_olivia = False
+
+        if warm_start is not None and os.path.exists(warm_start):
+            with open(warm_start) as file:
+                self.warm_start(file.read())
+
+    def risk_manager(self) -> RiskManager:
+        """Risk manager of the positions of the strategies of the round,
+        with the limits of the round overridden by those of the parameters."""
+        round_limits = self.config.spread_limits
+        spread_limits = RiskLimits(
+            round_limits.take_profit if self.params.take_profit is None else self.params.take_profit,
+            round_limits.stop_loss if self.params.stop_loss is None else self.params.stop_loss,
+            round_limits.max_hold
+        )
+        risk = RiskManager()
+        for name, anchor, legs, limits in (
+            ("coconuts_pina_coladas", PINA_COLADAS, self.config.pair_legs, spread_limits),
+            ("berries", BERRIES, {BERRIES: 1}, BERRIES_LIMITS),
+            ("diving_gear", DIVING_GEAR, {DIVING_GEAR: 1}, DIVING_GEAR_LIMITS),
+            ("picnic", PICNIC_BASKET, BASKET_LEGS, spread_limits),
+        ):
+            if name in self.config.strategies:
+                risk.add(name, anchor, legs, limits)
+        return risk
+
+    @property
+    def cash(self) -> float:
+        return self.ledger.cash
+
+    # utils
+    def get_market(self, state: TradingState) -> MarketSnapshot:
+        """Market snapshot of ``state``, built once per tick."""
+        if self.market is None or self.market.state is not state:
+            self.market = MarketSnapshot(state)
+        return self.market
+
+    def get_position(self, product, state : TradingState):
+        return state.position.get(product, 0)
+
+    def get_mid_half_ticks(self, product, state : TradingState) -> int:
+        mid = self.get_market(state).mid_half_ticks(product)
+        if mid is not None:
+            return mid
+
+        # There are no orders on one side of the market (mid price undefined)
+        default = self.ema_prices.get(product)
+        if default is None:
+            default = to_half_ticks(DEFAULT_PRICES[product])
+        return default
+
+    def get_mid_price(self, product, state : TradingState) -> float:
+        return from_half_ticks(self.get_mid_half_ticks(product, state))
+
+    def get_value_on_product(self, product, state : TradingState):
+        """
+        Returns the amount of MONEY currently held on the product.
+        """
+        return self.get_position(product, state) * self.get_mid_price(product, state)
+
+    def update_pnl(self, state : TradingState):
+        """
+        Updates the pnl.
+        """
+        self.ledger.update_cash(state)
+        return self.ledger.pnl(state, lambda product: self.get_mid_half_ticks(product, state))
+
+    def update_ema_prices(self, state : TradingState):
+        """
+        Update the exponential moving average of the prices of each product.
+        """
+        for product in self.config.products:
+            mid = self.get_mid_half_ticks(product, state)
+
+            # Update ema price
+            if self.ema_prices[product] is None:
+                self.ema_prices[product] = mid
+            else:
+                self.ema_prices[product] = ema_half_ticks(self.ema_prices[product], mid, self.ema_param)
+
+    def get_ema_price(self, product) -> Optional[float]:
+        ema = self.ema_prices.get(product)
+        return None if ema is None else from_half_ticks(ema)
+
+    def save_prices(self, state: TradingState):
+        price_coconut = self.get_mid_half_ticks(COCONUTS, state)
+        price_pina_colada = self.get_mid_half_ticks(PINA_COLADAS, state)
+
+        hedge_ratio = self.params.pair_hedge_ratio
+        self.histories["Spread"].push(
+            hedge_ratio.denominator * price_pina_colada - hedge_ratio.numerator * price_coconut
+        )
+
+    def save_prices_product(
+            self,
+            product,
+            state: TradingState,
+            price: Union[float, int, None] = None,
+        ):
+        if price is None:
+            price = self.get_mid_half_ticks(product, state)
+
+        self.histories[product].push(price)
+
+    def save_prices_diving_gear(self, state: TradingState):
+        price_diving_gear = self.get_mid_price(DIVING_GEAR, state)
+        if self.last_diving_gear_price is not None:
+            self.histories[DIVING_GEAR].push(price_diving_gear / self.last_diving_gear_price - 1)
+        self.last_diving_gear_price = price_diving_gear
+
+    def get_dolphins_observations(self, state: TradingState):
+        return state.observations[DOLPHIN_SIGHTINGS]
+
+    def execute_legs(
+            self,
+            legs: Dict[str, int],
+            units: int,
+            state: TradingState,
+            reference_prices: Dict[str, int],
+            sweep_offset: int
+        ) -> Tuple[int, Dict[str, List[Order]]]:
+        """Orders for a multi-leg trade. When depth aware execution is
+        disabled, legs are swept ``sweep_offset`` ticks through their
+        reference prices.
+
+        Returns:
+            Tuple[int, Dict[str, List[Order]]]: signed units sent and orders
+        """
+        if not self.depth_aware_execution:
+            return sweep_orders(legs, units, reference_prices, sweep_offset)
+
+        market = self.get_market(state)
+        return basket_orders(
+            legs,
+            units,
+            {symbol: market.book(symbol) for symbol in legs},
+            state.position,
+            POSITION_LIMITS,
+            MAX_SLIPPAGE
+        )
+
+    # Algorithm logic
+    def pearls_strategy(self, state : TradingState) -> Dict[str, List[Order]]:
+        """
+        Returns the orders with trades of pearls.
+        """
+        orders = make_quotes(
+            PEARLS,
+            DEFAULT_PRICES[PEARLS],
+            self.get_position(PEARLS, state),
+            POSITION_LIMITS[PEARLS],
+            self.get_market(state).book(PEARLS),
+            QUOTE_PARAMS[PEARLS]
+        )
+        return {PEARLS: orders}
+
+    def bananas_strategy(self, state : TradingState) -> Dict[str, List[Order]]:
+        """
+        Returns the orders with trades of bananas.
+        """
+        orders = make_quotes(
+            BANANAS,
+            self.get_ema_price(BANANAS),
+            self.get_position(BANANAS, state),
+            POSITION_LIMITS[BANANAS],
+            self.get_market(state).book(BANANAS),
+            QUOTE_PARAMS[BANANAS]
+        )
+        return {BANANAS: orders}
+
+    def coconuts_pina_coladas_strategy(self, state : TradingState) -> Dict[str, List[Order]]:
+        """Performs statistical arbitrage between coconuts and pina coladas.
+        Trades the spread when its last 5 values are ``pair_entry`` (1.5)
+        standard deviations away from its rolling mean.
+
+        Args:
+            state (TradingState): state
+
+        Returns:
+            Dict[str, List[Order]]: coconut and pina coladas orders
+        """
+        pair_legs = self.config.pair_legs
+        order_volume = self.params.order_volume or self.config.order_volume
+        orders : Dict[str, List[Order]] = {COCONUTS: [], PINA_COLADAS: []}
+
+        def create_orders(units: int):
+            # units > 0 buys the spread (buy PINA_COLADAS, sell COCONUTS)
+            executed, leg_orders = self.execute_legs(
+                pair_legs,
+                units,
+                state,
+                {COCONUTS: int_price_coconuts, PINA_COLADAS: int_price_pina_coladas},
+                PAIR_SWEEP_OFFSET
+            )
+            orders[COCONUTS].extend(leg_orders[COCONUTS])
+            orders[PINA_COLADAS].extend(leg_orders[PINA_COLADAS])
+            self.coconuts_pair_position += executed * pair_legs[COCONUTS]
+
+        self.save_prices(state)
+
+        int_price_coconuts = floor_ticks(self.get_mid_half_ticks(COCONUTS, state))
+        int_price_pina_coladas = floor_ticks(self.get_mid_half_ticks(PINA_COLADAS, state))
+
+        coconuts_position = self.coconuts_pair_position
+        pina_coladas_position = self.get_position(PINA_COLADAS, state)
+        pina_coladas_volume = order_volume * abs(pair_legs[PINA_COLADAS])
+
+        spread_history = self.histories["Spread"]
+        entry = self.params.pair_entry
+
+        if self.risk.exiting("coconuts_pina_coladas", state.timestamp):
+            units = self.risk.units("coconuts_pina_coladas")
+            create_orders(max(-order_volume, min(order_volume, -units)))
+            return orders
+
+        if spread_history.full:
+            avg_spread = spread_history.mean()
+            std_spread = spread_history.std()
+            spread_5 = spread_history.tail_mean(5)
+            scale = HALF_TICKS * self.params.pair_hedge_ratio.denominator
+            print(
+                f"Average spread: {avg_spread / scale}, Spread5: {spread_5 / scale}, "
+                f"Std: {std_spread / scale}"
+            )
+
+            buy_signal = spread_5 < avg_spread - entry*std_spread
+            sell_signal = spread_5 > avg_spread + entry*std_spread
+            if not (buy_signal or sell_signal):
+                self.risk.rearm("coconuts_pina_coladas")
+            # No new entry on the side of a position closed by the risk manager
+            buy_signal = buy_signal and not self.risk.blocks("coconuts_pina_coladas", 1)
+            sell_signal = sell_signal and not self.risk.blocks("coconuts_pina_coladas", -1)
+
+            if abs(pina_coladas_position) <= POSITION_LIMITS[PINA_COLADAS]-pina_coladas_volume:
+                if buy_signal: # buy
+                    create_orders(order_volume)
+
+                elif sell_signal: # sell
+                    create_orders(-order_volume)
+
+            else: # only trades that reduce the position
+                if coconuts_position > 0:
+                    if buy_signal:
+                        create_orders(order_volume)
+                else :
+                    if sell_signal:
+                        create_orders(-order_volume)
+
+        return orders
+
+    def coconut_strategy(self, state: TradingState) -> Dict[str, List[Order]]:
+        position_coconuts = self.get_position(COCONUTS, state) - self.coconuts_pair_position
+
+        orders = make_quotes(
+            COCONUTS,
+            self.get_ema_price(COCONUTS),
+            position_coconuts,
+            COCONUTS_EMA_LIMIT,
+            self.get_market(state).book(COCONUTS),
+            QUOTE_PARAMS[COCONUTS]
+        )
+        return {COCONUTS: orders}
+
+    def berries_strategy(self, state: TradingState) -> Dict[str, List[Order]]:
+        """Berries strategy.
+        Trades towards the target position of the BERRIES schedule:
+
+        * Buys up to the limit around timestamp == 2e5
+        * Sells down to minus the limit around timestamp == 5e5
+
+        When the round follows Olivia, stays long from the moment she is
+        seen buying until the selling ramp.
+
+        Args:
+            state (TradingState): state
+
+        Returns:
+            Dict[str, List[Order]]: berries orders
+        """
+        position_berries = self.get_position(BERRIES, state)
+        target = self.berries_schedule.target(state.timestamp)
+
+        ## Olivia
+
+        if self.config.follow_olivia:
+            if not self.memory_olivia:
+                for trade in state.market_trades.get(BERRIES, []):
+                    if trade.buyer == OLIVIA:
+                        self.olivia_buy_trend = True
+                        self.memory_olivia = True
+
+            if state.timestamp >= BERRIES_SELL_START:
+                self.olivia_buy_trend = False
+
+            if self.olivia_buy_trend:
+                target = POSITION_LIMITS[BERRIES]
+
+        ## End Olivia
+
+        # Flat after an exit of the risk manager, until the target changes side
+        side = (target > 0) - (target < 0)
+        if self.risk.exiting("berries", state.timestamp) or self.risk.blocks("berries", side):
+            target = 0
+        else:
+            self.risk.rearm("berries")
+
+        orders = track_target(
+            BERRIES,
+            target,
+            position_berries,
+            self.get_market(state).book(BERRIES),
+            BERRIES_MAX_VOLUME,
+            BERRIES_MAX_SLIPPAGE
+        )
+        return {BERRIES: orders}
+
+    def diving_gear_strategy(self, state: TradingState) -> Dict[str, List[Order]]:
+        """Diving gear strategy. Trades with signal obtained from dolphin's
+        percentage change spike
+
+        Args:
+            state (TradingState): state
+
+        Returns:
+            Dict[str, List[Order]]: diving gears orders
+        """
+        def reset_trend():
+            self.dolphin_signal = 0
+            self.trend = 0
+            self.risk.rearm("diving_gear")
+
+        self.save_prices_diving_gear(state)
+        position_diving_gear = self.get_position(DIVING_GEAR, state)
+
+        orders_diving_gear = []
+        orders = {DIVING_GEAR: orders_diving_gear}
+
+        if self.last_dolphin_price == -1:
+            self.last_dolphin_price = self.get_dolphins_observations(state)
+            return orders
+
+        dolphin_price = self.get_dolphins_observations(state)
+        pct_change_dolphin = (dolphin_price - self.last_dolphin_price) / self.last_dolphin_price
+
+        # Limit prices of the orders, through the mid price
+        diving_gear_mid = self.get_mid_half_ticks(DIVING_GEAR, state)
+        buy_price = floor_ticks(diving_gear_mid + to_half_ticks(DIVING_GEAR_OFFSET))
+        sell_price = ceil_ticks(diving_gear_mid - to_half_ticks(DIVING_GEAR_OFFSET))
+
+        # A limit of the risk manager closes the position as a reversed trend does
+        if self.dolphin_signal != 0 and self.risk.exiting("diving_gear", state.timestamp):
+            self.trend = -3 * self.dolphin_signal
+
+        if (pct_change_dolphin > self.params.pct_change_signal or self.dolphin_signal == 1) and self.dolphin_signal != -1 and abs(self.trend) != 3:
+            if self.dolphin_signal == 0:
+                self.initial_time_hold_position = state.timestamp
+
+            self.dolphin_signal = 1
+            if position_diving_gear < POSITION_LIMITS[DIVING_GEAR]:
+                volume = min(POSITION_LIMITS[DIVING_GEAR] - position_diving_gear, 10)
+                orders_diving_gear.append(
+                    Order(DIVING_GEAR, buy_price, volume)
+                )
+
+        if (pct_change_dolphin < - self.params.pct_change_signal or self.dolphin_signal == -1) and self.dolphin_signal != 1 and abs(self.trend) != 3:
+            if self.dolphin_signal == 0:
+                self.initial_time_hold_position = state.timestamp
+
+            self.dolphin_signal = -1
+            if position_diving_gear > - POSITION_LIMITS[DIVING_GEAR]:
+                volume = max(- POSITION_LIMITS[DIVING_GEAR] - position_diving_gear, -10)
+                orders_diving_gear.append(
+                    Order(DIVING_GEAR, sell_price, volume)
+                )
+
+        self.last_dolphin_price = dolphin_price
+
+        ## Checking closing trend
+        held = state.timestamp - self.initial_time_hold_position > self.min_time_hold_position
+        if self.dolphin_signal != 0 and (held or abs(self.trend) == 3):
+
+            ## Updating trend
+            if abs(self.trend) != 3:
+                if not self.histories[DIVING_GEAR].full:
+                    return orders
+
+                closing_position_signal = self.histories[DIVING_GEAR].mean()
+
+                if self.dolphin_signal == 1 and self.trend > -3:
+                    if closing_position_signal < 0:
+                        self.trend -= 1
+                    else:
+                        self.trend = 0
+                elif self.dolphin_signal == -1 and self.trend < 3:
+                    if closing_position_signal > 0:
+                        self.trend += 1
+                    else:
+                        self.trend = 0
+
+            ## Cancelling order
+            if self.dolphin_signal == -1 and self.trend == 3:
+                if position_diving_gear == 0:
+                    reset_trend()
+                else:
+                    volume_hit = min(POSITION_LIMITS[DIVING_GEAR] - position_diving_gear, 10)
+
+                    orders_diving_gear.append(
+                        Order(DIVING_GEAR, buy_price, volume_hit)
+                    )
+
+            elif self.dolphin_signal == 1 and self.trend == -3:
+                if position_diving_gear == 0:
+                    reset_trend()
+                else:
+                    volume_hit = max(-POSITION_LIMITS[DIVING_GEAR] - position_diving_gear, -10)
+
+                    orders_diving_gear.append(
+                        Order(DIVING_GEAR, sell_price, volume_hit)
+                    )
+
+        return orders
+
+    def picnic_strategy(self, state: TradingState) -> Dict[str, List[Order]]:
+        """Picnic strategy. Trades on spread between picnic basket and
+        1*ukulele + 2* baguette + 4*dip
+
+        Args:
+            state (TradingState): state
+
+        Returns:
+            Dict[str, List[Order]]: baguette, basket, dip and ukulele orders
+        """
+        orders : Dict[str, List[Order]] = {symbol: [] for symbol in BASKET_LEGS}
+
+        def create_orders(units: int):
+            # units > 0 buys the basket and sells its components
+            _, leg_orders = self.execute_legs(
+                BASKET_LEGS,
+                units,
+                state,
+                {symbol: floor_ticks(prices[symbol]) for symbol in BASKET_LEGS},
+                SWEEP_OFFSET
+            )
+
+            for symbol, symbol_orders in leg_orders.items():
+                orders[symbol].extend(symbol_orders)
+
+        prices = {symbol: self.get_mid_half_ticks(symbol, state) for symbol in BASKET_LEGS}
+        position_basket = self.get_position(PICNIC_BASKET, state)
+
+        # PICNIC_BASKET - (UKULELE + 2*BAGUETTE + 4*DIP)
+        spread = sum(weight * prices[symbol] for symbol, weight in BASKET_LEGS.items())
+        self.save_prices_product(
+            "SPREAD_PICNIC",
+            state,
+            spread
+        )
+
+        spread_history = self.histories["SPREAD_PICNIC"]
+        entry = self.params.basket_entry
+
+        if self.risk.exiting("picnic", state.timestamp):
+            units = self.risk.units("picnic")
+            create_orders(max(-VOLUME_BASKET, min(VOLUME_BASKET, -units)))
+            return orders
+
+        if spread_history.full:
+            avg_spread = spread_history.mean()
+            std_spread = spread_history.std()
+            spread_5 = spread_history.tail_mean(5)
+            print(
+                f"Average spread: {from_half_ticks(avg_spread)}, Spread5: {from_half_ticks(spread_5)}, "
+                f"Std: {from_half_ticks(std_spread)}"
+            )
+
+            buy_signal = spread_5 < avg_spread - entry*std_spread
+            sell_signal = spread_5 > avg_spread + entry*std_spread
+            if not (buy_signal or sell_signal):
+                self.risk.rearm("picnic")
+            # No new entry on the side of a position closed by the risk manager
+            buy_signal = buy_signal and not self.risk.blocks("picnic", 1)
+            sell_signal = sell_signal and not self.risk.blocks("picnic", -1)
+
+            if abs(position_basket) <= POSITION_LIMITS[PICNIC_BASKET]-2:
+                if buy_signal:  # buy basket
+                    create_orders(VOLUME_BASKET)
+
+                elif sell_signal: # sell basket
+                    create_orders(-VOLUME_BASKET)
+
+            else: # only trades that reduce the position
+                if position_basket >0 : # sell basket
+                    if sell_signal:
+                        create_orders(-VOLUME_BASKET)
+
+                else: # buy basket
+                    if buy_signal:
+                        create_orders(VOLUME_BASKET)
+
+        return orders
+
+    def snapshot(self) -> str:
+        """
+        Returns a compact snapshot of the state of every strategy, from which
+        a new trader can resume with ``restore``.
+        """
+        return encode_snapshot({
+            "params": self.params.as_dict(),
+            "round": self.round,
+            "cash": self.ledger.cash,
+            "coconuts_pair_position": self.coconuts_pair_position,
+            "last_dolphin_price": self.last_dolphin_price,
+            "dolphin_signal": self.dolphin_signal,
+            "trend": self.trend,
+            "initial_time_hold_position": self.initial_time_hold_position,
+            "last_diving_gear_price": self.last_diving_gear_price,
+            "olivia_buy_trend": self.olivia_buy_trend,
+            "memory_olivia": self.memory_olivia,
+            "risk": {name: position.to_list() for name, position in self.risk.positions.items()},
+            "ema_prices": self.ema_prices,
+            "histories": {
+                name: window.to_list()
+                for name, window in self.histories.items()
+            }
+        })
+
+    def warm_start(self, snapshot: str):
+        """
+        Preloads the rolling windows, EMAs and last prices built by
+        analysis.warmstart, so that the rolling windows are full and the
+        dolphin signal is computed from the first tick.
+        """
+        state = decode_snapshot(snapshot)
+
+        for product, price in state["ema_prices"].items():
+            if product in self.ema_prices:
+                self.ema_prices[product] = price
+
+        for name, values in state["histories"].items():
+            if name == "Spread" and self.params.pair_hedge_ratio != PAIR_HEDGE_RATIO:
+                # Built for the default hedge ratio
+                continue
+            if name in self.histories:
+                self.histories[name] = RollingWindow(self.params.window, values)
+
+        if state.get("last_diving_gear_price") is not None:
+            self.last_diving_gear_price = state["last_diving_gear_price"]
+
+        if state.get("last_dolphin_price") is not None:
+            self.last_dolphin_price = state["last_dolphin_price"]
+
+    def restore(self, snapshot: str):
+        """
+        Restores the state saved by ``snapshot``.
+        """
+        state = decode_snapshot(snapshot)
+
+        if "params" in state:
+            self.params = TraderParams(**state["params"])
+            self.risk = self.risk_manager()
+        self.round = state["round"]
+        self.ledger.cash = state["cash"]
+        self.coconuts_pair_position = state["coconuts_pair_position"]
+        self.last_dolphin_price = state["last_dolphin_price"]
+        self.dolphin_signal = state["dolphin_signal"]
+        self.trend = state["trend"]
+        self.initial_time_hold_position = state["initial_time_hold_position"]
+        self.last_diving_gear_price = state["last_diving_gear_price"]
+        self.olivia_buy_trend = state["olivia_buy_trend"]
+        self.memory_olivia = state["memory_olivia"]
+        for name, values in state.get("risk", {}).items():
+            if name in self.risk.positions:
+                self.risk.positions[name].restore(values)
+        self.ema_prices.update(state["ema_prices"])
+        for name, values in state["histories"].items():
+            self.histories[name] = RollingWindow(self.params.window, values)
+
+    def run(self, state: TradingState) -> Dict[str, List[Order]]:
+        """
+        Only method required. It takes all buy and sell orders for all symbols as an input,
+        and outputs a list of orders to be sent
+        """
+
+        if self.allocations is not None:
+            self.allocations.begin_tick(state.timestamp)
+
+        self.round += 1
+        self.market = MarketSnapshot(state)
+        pnl = self.update_pnl(state)
+        self.update_ema_prices(state)
+        self.risk.update(state, lambda product: self.get_mid_half_ticks(product, state))
+
+        print(f"Log round {self.round}")
+
+        print("TRADES:")
+        for product in state.own_trades:
+            for trade in state.own_trades[product]:
+                if trade.timestamp == state.timestamp - TICK:
+                    print(trade)
+
+        print(f"\tCash {self.cash}")
+        for product in self.config.products:
+            print(f"\tProduct {product}, Position {self.get_position(product, state)}, Midprice {self.get_mid_price(product, state)}, Value {self.get_value_on_product(product, state)}, EMA {self.get_ema_price(product)}")
+        if DOLPHIN_SIGHTINGS in self.config.observations:
+            print(f"\tDolphing observations: {self.get_dolphins_observations(state)}")
+
+        print(f"\tPnL {pnl}")
+
+        # Initialize the method output dict as an empty dict
+        result = {}
+
+        for name in self.config.strategies:
+            try:
+                if self.allocations is None:
+                    orders = getattr(self, f"{name}_strategy")(state)
+                else:
+                    with self.allocations.measure(name):
+                        orders = getattr(self, f"{name}_strategy")(state)
+            except Exception as e:
+                print(f"Error in {name} strategy")
+                print(e)
+                continue
+
+            for symbol, symbol_orders in orders.items():
+                result.setdefault(symbol, []).extend(symbol_orders)
+
+        print("+---------------------------------+")
+
+        if self.allocations is not None:
+            # The orders outlive the tick: only what the trader keeps is counted
+            packed = pack_orders(result)
+            result = orders = symbol_orders = None
+            self.allocations.end_tick()
+            result = unpack_orders(packed)
+
+        return result
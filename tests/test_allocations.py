@@ -0,0 +1,63 @@
+import pytest
+
+import round4_trader
+from backtest.data import load_day
+from backtest.engine import Backtester
+from backtest.synthetic import SyntheticMarket
+from prosperity.allocations import MAX_BLOCK_GROWTH, RUN, AllocationGrowthError, AllocationMonitor
+from prosperity.rounds import ROUND_1, RoundConfig
+from prosperity.trader import Trader
+
+TICKS = 2_000
+
+
+class LeakingTrader(Trader):
+    """Round 1 trader with a strategy keeping more objects on every tick."""
+
+    def __init__(self, copy_history: bool = False) -> None:
+        super().__init__(RoundConfig("leak", ROUND_1.products, ROUND_1.strategies + ["leak"]), warm_start=None)
+        self.copy_history = copy_history
+        self.history = []
+
+    def leak_strategy(self, state):
+        if self.copy_history:
+            # A new copy of the whole history, as pd.concat does
+            self.history = self.history + [state.timestamp]
+        else:
+            self.history.append([object() for _ in range(self.round // 100)])
+        return {}
+
+
+def recorded_day(directory) -> list:
+    prices, trades = directory / "prices.csv", directory / "trades.csv"
+    SyntheticMarket(0).write_csv(TICKS, str(prices), str(trades))
+    return load_day(str(prices), str(trades))
+
+
+def test_clean_trader_passes_on_a_recorded_day(tmp_path):
+    monitor = AllocationMonitor(traced=True)
+    Backtester(round4_trader.Trader(warm_start=None), allocations=monitor).run(recorded_day(tmp_path))
+    assert len(monitor.blocks[RUN]) == TICKS
+
+
+def test_orders_returned_by_a_strategy_are_not_growth():
+    monitor = AllocationMonitor()
+    for tick in range(TICKS):
+        monitor.begin_tick(tick)
+        with monitor.measure("quotes"):
+            # More and more orders, released by the caller after the tick
+            orders = [object() for _ in range(tick // 100)]
+        del orders
+        monitor.end_tick()
+
+    assert monitor.growth("quotes")["blocks"] > MAX_BLOCK_GROWTH
+    monitor.check()
+
+
+def test_leaking_strategy_fails(tmp_path):
+    states = recorded_day(tmp_path)
+    with pytest.raises(AllocationGrowthError, match=RUN):
+        Backtester(LeakingTrader(), allocations=AllocationMonitor()).run(states)
+
+    with pytest.raises(AllocationGrowthError, match="leak allocates .* more bytes"):
+        Backtester(LeakingTrader(copy_history=True), allocations=AllocationMonitor(traced=True)).run(states)
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from backtest import cache
+
+PRICES = "day;timestamp;product;bid_price_1;bid_volume_1;ask_price_1;ask_volume_1;mid_price\n0;0;PEARLS;9999;1;10001;1;10000.0\n"
+
+
+@pytest.fixture
+def prices_path(tmp_path):
+    path = tmp_path / "prices_round_1_day_0.csv"
+    path.write_text(PRICES)
+    return str(path)
+
+
+def test_key_changes_with_warm_start_file(tmp_path, prices_path):
+    warm_start = str(tmp_path / "warm_start.txt")
+
+    missing = cache.backtest_key("round1_trader", None, prices_path, warm_start=warm_start)
+    assert missing == cache.backtest_key("round1_trader", None, prices_path, warm_start=None)
+
+    with open(warm_start, "w") as file:
+        file.write("first")
+    created = cache.backtest_key("round1_trader", None, prices_path, warm_start=warm_start)
+    assert created != missing
+
+    with open(warm_start, "w") as file:
+        file.write("second")
+    # Same size, a later modification time
+    stat = os.stat(warm_start)
+    os.utime(warm_start, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    changed = cache.backtest_key("round1_trader", None, prices_path, warm_start=warm_start)
+    assert changed not in (missing, created)
+
+    os.remove(warm_start)
+    assert cache.backtest_key("round1_trader", None, prices_path, warm_start=warm_start) == missing
+
+
+def test_default_key_follows_warm_start_path(prices_path):
+    assert cache.backtest_key("round1_trader", None, prices_path) == cache.backtest_key(
+        "round1_trader", None, prices_path, warm_start=cache.WARM_START_PATH
+    )
+
+
+def test_key_is_stable(prices_path):
+    assert cache.backtest_key("round1_trader", {"window": 200}, prices_path) == cache.backtest_key("round1_trader", None, prices_path)
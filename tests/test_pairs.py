@@ -0,0 +1,21 @@
+import math
+
+from analysis.pairs import STATISTICS, Candidate
+
+
+def candidate(hedge_ratio: float) -> Candidate:
+    values = {name: 0.0 for name in STATISTICS}
+    values["hedge_ratio"] = hedge_ratio
+    return Candidate("PINA_COLADAS", "COCONUTS", values, 1, 1)
+
+
+def test_legs_approximate_the_hedge_ratio():
+    assert candidate(1.875).legs() == {"PINA_COLADAS": 8, "COCONUTS": -15}
+    assert candidate(-0.5).legs() == {"PINA_COLADAS": 2, "COCONUTS": 1}
+
+
+def test_no_legs_when_the_hedge_leg_rounds_to_zero():
+    assert candidate(0.04).legs() is None
+    assert candidate(0.04).legs(max_leg=100) == {"PINA_COLADAS": 25, "COCONUTS": -1}
+    assert candidate(math.nan).legs() is None
+    assert candidate(0.04).as_dict()["legs"] is None
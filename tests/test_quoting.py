@@ -0,0 +1,19 @@
+from datamodel import OrderDepth
+
+from prosperity.quoting import QuoteParams, make_quotes
+
+
+def book() -> OrderDepth:
+    depth = OrderDepth()
+    depth.buy_orders = {9996: 10, 9995: 5}
+    depth.sell_orders = {10004: -10, 10005: -5}
+    return depth
+
+
+def test_no_quotes_without_a_limit():
+    assert make_quotes("PEARLS", 10000, 0, 0, book(), QuoteParams()) == []
+
+
+def test_quotes_inside_the_book_up_to_the_limit():
+    orders = make_quotes("PEARLS", 10000, 0, 20, book(), QuoteParams())
+    assert sorted((order.price, order.quantity) for order in orders) == [(9997, 20), (10003, -20)]
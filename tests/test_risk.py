@@ -0,0 +1,169 @@
+from datamodel import OrderDepth, Trade, TradingState
+
+import round5_trader
+from backtest.engine import Backtester
+from backtest.synthetic import SyntheticMarket
+from prosperity.products import SUBMISSION
+from prosperity.risk import STOP_LOSS, TAKE_PROFIT, TIME_STOP, RiskLimits, RiskManager, StrategyPosition
+from prosperity.rounds import ROUND_5, RoundConfig
+from prosperity.trader import Trader, TraderParams
+
+PRODUCT = "DIVING_GEAR"
+
+
+def position(limits: RiskLimits = RiskLimits()) -> StrategyPosition:
+    return StrategyPosition(PRODUCT, {PRODUCT: 1}, limits)
+
+
+def test_fills_keep_the_average_entry():
+    book = position()
+    book.fill(2, 200, 100)
+    book.fill(2, 220, 200)
+    assert (book.units, book.entry, book.opened) == (4, 210, 100)
+
+
+def test_partial_close_keeps_the_entry_of_the_units_left():
+    book = position()
+    book.fill(4, 210, 100)
+    book.fill(-3, 300, 200)
+    assert (book.units, book.entry, book.opened) == (1, 210, 100)
+
+    book.fill(-1, 300, 300)
+    assert (book.units, book.cost, book.entry) == (0, 0.0, None)
+
+
+def test_reversal_opens_the_new_side_at_the_fill_price():
+    book = position()
+    book.fill(2, 200, 100)
+    book.fill(-5, 240, 200)
+    assert (book.units, book.entry, book.opened) == (-3, 240, 200)
+
+
+def test_limits_per_unit_in_ticks():
+    book = position(RiskLimits(take_profit=10, stop_loss=30))
+    book.fill(-2, 200, 100)
+
+    # Half ticks: 10 ticks of profit on a short is 20 half ticks lower
+    book.value = 181
+    assert book.limit_hit(200) is None
+    book.value = 180
+    assert book.limit_hit(200) == TAKE_PROFIT
+    book.value = 260
+    assert book.limit_hit(200) == STOP_LOSS
+
+
+def test_time_stop_from_the_opening_fill():
+    book = position(RiskLimits(max_hold=1_000))
+    book.value = 200
+    book.fill(1, 200, 100)
+    book.fill(1, 200, 500)
+    assert book.limit_hit(1_099) is None
+    assert book.limit_hit(1_100) == TIME_STOP
+
+
+def state(timestamp: int, mid: int, own_trades=()) -> TradingState:
+    depth = OrderDepth()
+    depth.buy_orders = {mid - 1: 10}
+    depth.sell_orders = {mid + 1: -10}
+    return TradingState(timestamp, {}, {PRODUCT: depth}, {PRODUCT: list(own_trades)}, {}, {}, {})
+
+
+def update(risk: RiskManager, tick: TradingState) -> None:
+    depth = tick.order_depths[PRODUCT]
+    # Mid price in half ticks
+    mid = max(depth.buy_orders) + min(depth.sell_orders)
+    risk.update(tick, lambda product: mid)
+
+
+def test_exit_blocks_the_side_until_rearmed():
+    risk = RiskManager()
+    risk.add("diving_gear", PRODUCT, {PRODUCT: 1}, RiskLimits(stop_loss=5))
+
+    update(risk, state(0, 100))
+    # Bought 3 at 100, one tick after the order
+    update(risk, state(100, 100, [Trade(PRODUCT, 100, 3, SUBMISSION, "", 0)]))
+    assert risk.units("diving_gear") == 3
+    assert not risk.exiting("diving_gear", 100)
+
+    update(risk, state(200, 94))
+    assert risk.exiting("diving_gear", 200)
+    assert risk.blocks("diving_gear", 1) and not risk.blocks("diving_gear", -1)
+
+    # Still exiting while partly closed, even if the price recovers
+    update(risk, state(300, 100, [Trade(PRODUCT, 94, 2, "", SUBMISSION, 200)]))
+    assert risk.units("diving_gear") == 1
+    assert risk.exiting("diving_gear", 300)
+
+    update(risk, state(400, 100, [Trade(PRODUCT, 100, 1, "", SUBMISSION, 300)]))
+    assert risk.units("diving_gear") == 0
+    assert not risk.exiting("diving_gear", 400)
+    assert risk.blocks("diving_gear", 1)
+
+    risk.rearm("diving_gear")
+    assert not risk.blocks("diving_gear", 1)
+
+
+def test_fills_of_older_ticks_are_not_booked_twice():
+    risk = RiskManager()
+    risk.add("diving_gear", PRODUCT, {PRODUCT: 1}, RiskLimits())
+    update(risk, state(0, 100))
+    fill = Trade(PRODUCT, 101, 2, SUBMISSION, "", 0)
+    update(risk, state(100, 100, [fill]))
+    update(risk, state(200, 100, [fill]))
+    assert risk.units("diving_gear") == 2
+    assert risk.positions["diving_gear"].entry == 202
+
+
+def test_spread_units_from_the_anchor_slippage():
+    risk = RiskManager()
+    legs = {"PINA_COLADAS": 1, "COCONUTS": -2}
+    risk.add("pair", "PINA_COLADAS", legs, RiskLimits())
+
+    def tick(timestamp, pina, coconuts, own_trades=()):
+        depths = {}
+        for product, mid in (("PINA_COLADAS", pina), ("COCONUTS", coconuts)):
+            depth = OrderDepth()
+            depth.buy_orders = {mid - 1: 10}
+            depth.sell_orders = {mid + 1: -10}
+            depths[product] = depth
+        tick_state = TradingState(timestamp, {}, depths, {"PINA_COLADAS": list(own_trades)}, {}, {}, {})
+        risk.update(tick_state, lambda product: 2 * {"PINA_COLADAS": pina, "COCONUTS": coconuts}[product])
+
+    tick(0, 15000, 8000)
+    # Paid 2 ticks above the mid of PINA_COLADAS for one unit of the spread
+    tick(100, 15010, 8000, [Trade("PINA_COLADAS", 15002, 1, SUBMISSION, "", 0)])
+    pair = risk.positions["pair"]
+    assert pair.entry == 2 * (15000 - 2 * 8000) + 4
+    assert pair.unrealized == 2 * 10 - 4
+
+
+def exits(monkeypatch, params=None):
+    """Strategies closed by a risk exit when round5_trader runs on a
+    synthetic market."""
+    closed = []
+    exiting = RiskManager.exiting
+
+    def recorded(self, name, timestamp):
+        if exiting(self, name, timestamp):
+            closed.append(name)
+            return True
+        return False
+
+    monkeypatch.setattr(RiskManager, "exiting", recorded)
+    Backtester(round5_trader.Trader(params, warm_start=None)).run(SyntheticMarket(0).states(2_000))
+    return closed
+
+
+def test_default_trader_sends_no_risk_exits(monkeypatch):
+    assert exits(monkeypatch) == []
+    assert exits(monkeypatch, TraderParams(take_profit=10, stop_loss=30))
+
+
+def test_spread_limits_of_the_round_overridden_by_the_params():
+    config = RoundConfig("exits", ROUND_5.products, ROUND_5.strategies, spread_limits=RiskLimits(10, 30))
+    limits = Trader(config, warm_start=None).risk_manager().positions["picnic"].limits
+    assert (limits.take_profit, limits.stop_loss) == (10, 30)
+
+    limits = Trader(config, TraderParams(stop_loss=200), warm_start=None).risk_manager().positions["picnic"].limits
+    assert (limits.take_profit, limits.stop_loss) == (10, 200)
+    assert Trader(warm_start=None).risk_manager().positions["picnic"].limits.take_profit is None
@@ -0,0 +1,30 @@
+from backtest.search import day_slices, sample_configs
+from backtest.walkforward import default_point, grid_points
+
+SPACE = {"window": [100, 200, 400], "pair_entry": [1.0, 1.5, 2.0], "order_volume": [1, 3, 5]}
+
+
+def test_sample_configs_are_distinct_with_defaults_first():
+    configs = sample_configs(SPACE, 10, seed=0)
+
+    assert len(configs) == 10
+    assert configs[0] == default_point(SPACE)
+    assert len({tuple(config.values()) for config in configs}) == 10
+    assert all(config in grid_points(SPACE) for config in configs)
+
+
+def test_sample_configs_of_a_huge_space():
+    space = {name: list(range(100)) for name in ("window", "pair_entry", "basket_entry", "order_volume", "take_profit")}
+
+    configs = sample_configs(space, 81, seed=1)
+
+    assert len({tuple(config.values()) for config in configs}) == 81
+
+
+def test_small_space_is_the_whole_grid():
+    assert sample_configs({"window": [100, 200, 200]}, 5) == [{"window": 200}, {"window": 100}]
+
+
+def test_day_slices():
+    assert day_slices([1000, 1000, 1000], 1500) == [(0, None), (1, 500)]
+    assert day_slices([1000, 1000], 2000) == [(0, None), (1, None)]
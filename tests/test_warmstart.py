@@ -0,0 +1,40 @@
+import os
+
+from analysis.warmstart import write_warm_starts
+from prosperity.rounds import ROUND_3
+from prosperity.snapshot import decode_snapshot
+from prosperity.trader import Trader
+
+HEADER = "day;timestamp;product;bid_price_1;bid_volume_1;ask_price_1;ask_volume_1;mid_price\n"
+
+
+def write_day(directory, day, dolphins):
+    path = os.path.join(directory, f"prices_round_3_day_{day}.csv")
+    with open(path, "w") as file:
+        file.write(HEADER)
+        for i, sightings in enumerate(dolphins):
+            file.write(f"{day};{i * 100};DIVING_GEAR;99999;1;100001;1;100000.0\n")
+            file.write(f"{day};{i * 100};DOLPHIN_SIGHTINGS;;;;;{sightings}\n")
+    return path
+
+
+def test_each_day_warm_starts_from_the_previous_one(tmp_path):
+    days = [write_day(str(tmp_path), day, [3000 + day, 3010 + day]) for day in range(3)]
+
+    paths = write_warm_starts(days, str(tmp_path / "warm"))
+
+    assert paths[0] is None
+    for day, path in enumerate(paths[1:], start=1):
+        with open(path) as file:
+            state = decode_snapshot(file.read())
+        # Closing sightings of the day before, never of the day itself
+        assert state["last_dolphin_price"] == 3010 + day - 1
+        assert state["last_diving_gear_price"] == 100000
+
+
+def test_trader_loads_the_warm_start_file(tmp_path):
+    days = [write_day(str(tmp_path), day, [3000, 3020]) for day in range(2)]
+    _, warm_start = write_warm_starts(days, str(tmp_path / "warm"))
+
+    assert Trader(ROUND_3, warm_start=warm_start).last_dolphin_price == 3020
+    assert Trader(ROUND_3, warm_start=None).last_dolphin_price == -1